@@ -3,9 +3,11 @@
 Excel to Markdown Converter
 
 このスクリプトは、指定されたディレクトリ配下の全てのExcelファイル(.xlsx)を
-markitdownライブラリを使用してMarkdown形式に変換します。
+Markdown形式に変換します。各シートはMarkdownの表として出力されます。
 画像が含まれるシートがある場合、画像を抽出してファイルとして保存し、
 各シートの末尾に画像を追加します。
+ワークブックはread_onlyで1回だけ読み込み、各シートの表を1行ずつ出力ファイルへ書き込むため、
+シートの行数によらず一定のメモリで変換できます。
 
 画像の保存場所:
     - Excelファイルと同じ階層に「{Excelファイル名}_images」ディレクトリを作成
@@ -25,9 +27,39 @@ markitdownライブラリを使用してMarkdown形式に変換します。
         ※画像ディレクトリは常にExcelファイルと同じ階層に作成されます。
 
     --llm-images
-        LLM（OpenAI）を使用して画像の説明を生成します。
+        LLM（OpenAI）を使用して画像の説明を生成します（markitdownを使用）。
         環境変数 OPENAI_API_KEY が必要です。
 
+    --convert-images <形式,...>
+        指定した形式の画像をPNGに変換して保存します（例: emf,wmf）。
+        指定しない場合、画像は変換せずxlsxファイル内のデータをそのまま保存します。
+
+    --jobs <N>
+        N個のプロセスで並列に変換します（デフォルト: 1）。
+        各ファイルは個別のプロセスで変換され、完了したものから結果を表示します。
+        LLMクライアントは各プロセス内で生成されます。
+
+    --timeout <秒>
+        1ファイルあたりの変換時間の上限を指定します。
+        上限を超えたファイルは変換プロセスを停止し、失敗として扱います。
+
+    --max-rows <N>
+        シートごとに出力する最大行数（見出し行を除く）を指定します。
+        超えた行は省略し、シートの末尾に省略した旨を出力します。
+
+    --force
+        変換キャッシュを使用せず、全てのファイルを変換します。
+
+    --cache-file <path>
+        変換キャッシュの保存先を指定します。
+        指定しない場合、対象ディレクトリ直下の「.excel_to_markdown_cache.json」に保存されます。
+
+変換キャッシュ:
+    変換に成功したファイルのパス・サイズ・更新日時・内容のハッシュ値（SHA-256）と
+    変換時のオプションを記録し、次回以降は変更のないファイルの変換を省略します。
+    更新日時のみが変わった場合（git checkout直後など）はハッシュ値で比較します。
+    生成済みのMarkdownファイルが存在しない場合や、オプションが異なる場合は再変換します。
+
 使用例:
     # 基本的な変換
     python excel_to_markdown.py ./sample_data
@@ -41,6 +73,12 @@ markitdownライブラリを使用してMarkdown形式に変換します。
     # LLMで画像説明を生成
     OPENAI_API_KEY=xxx python excel_to_markdown.py ./sample_data --llm-images
 
+    # 8プロセスで並列変換（1ファイル最大10分）
+    python excel_to_markdown.py ./sample_data --jobs 8 --timeout 600
+
+    # キャッシュを無視して全ファイルを再変換
+    python excel_to_markdown.py ./sample_data --force
+
 出力例:
     sample_data/
     ├── data.xlsx
@@ -50,23 +88,36 @@ markitdownライブラリを使用してMarkdown形式に変換します。
         └── Sheet1_image_2.jpg
 
 必須条件:
-    pip install markitdown openpyxl pillow
+    pip install openpyxl pillow
+    （--llm-images を使用する場合: pip install markitdown openai）
 """
 
 import argparse
+import hashlib
 import io
+import json
+import multiprocessing
+import os
+import posixpath
+import queue
+import shutil
 import sys
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Iterator, NamedTuple, Optional, Sequence, TextIO, Tuple
 
 try:
-    from markitdown import MarkItDown
     from openpyxl import load_workbook
+    from openpyxl.utils import get_column_letter
     from PIL import Image
 except ImportError as e:
     print(f"必要なライブラリがインストールされていません: {e}", file=sys.stderr)
     print("以下のコマンドでインストールしてください:", file=sys.stderr)
-    print("pip install markitdown openpyxl pillow", file=sys.stderr)
+    print("pip install openpyxl pillow", file=sys.stderr)
     sys.exit(1)
 
 
@@ -91,76 +142,431 @@ def find_excel_files(directory: Path) -> List[Path]:
     return sorted(excel_files)
 
 
-def extract_images_from_excel(excel_path: Path, image_dir: Path) -> Dict[str, List[str]]:
+def has_embedded_images(excel_path: Path) -> bool:
+    """
+    xlsxファイル(zip)の格納ファイル一覧のみを確認し、埋め込み画像の有無を判定します。
+    セルのデータは読み込みません。
+
+    Args:
+        excel_path: Excelファイルのパス
+
+    Returns:
+        画像（xl/media）と描画（xl/drawings）の両方が含まれる場合はTrue
+    """
+    with zipfile.ZipFile(excel_path) as archive:
+        names = archive.namelist()
+
+    has_media = any(name.startswith('xl/media/') for name in names)
+    has_drawings = any(name.startswith('xl/drawings/') for name in names)
+    return has_media and has_drawings
+
+
+def format_cell_value(value) -> str:
+    """
+    セルの値をMarkdownの表のセル用の文字列に変換します。
+
+    Args:
+        value: セルの値
+
+    Returns:
+        表のセルに出力する文字列（空のセルは空文字列）
+    """
+    if value is None:
+        return ''
+
+    text = str(value)
+    # 表の区切り文字と改行をエスケープ
+    return text.replace('|', '\\|').replace('\r\n', '<br>').replace('\n', '<br>').replace('\r', '<br>')
+
+
+def write_sheet_markdown(sheet, out: TextIO, max_rows: Optional[int] = None) -> bool:
+    """
+    シートのセル範囲をMarkdownの表として出力先に書き込みます。
+    1行目を見出し行とし、末尾の空の行・列は出力しません。
+
+    read_onlyで読み込んだシートを1行ずつ処理し、シートの大きさによらず一定のメモリで動作します。
+    列数は全ての行を読み終えるまで確定しないため、本文の行は一時ファイルに書き出してから
+    列数をそろえて出力します。
+
+    Args:
+        sheet: openpyxlのワークシート
+        out: 書き込み先
+        max_rows: 出力する最大行数（見出し行を除く）、Noneの場合は無制限
+
+    Returns:
+        最大行数を超えたため、以降の行を省略した場合はTrue
+    """
+    header = None
+    width = 0
+    data_rows = 0
+    pending_empty_rows = 0
+    truncated = False
+
+    # read_onlyでは保存されているシートの範囲（dimension）がそのまま使われ、
+    # 範囲が実際のデータより狭いファイルではセルが欠落するため、範囲を読み直す
+    if hasattr(sheet, 'reset_dimensions'):
+        sheet.reset_dimensions()
+
+    # 改行コードの変換を無効にし、セル内に残ったCRで行が分割されないようにする
+    with tempfile.TemporaryFile('w+', encoding='utf-8', newline='\n') as spool:
+        for row in sheet.iter_rows(values_only=True):
+            cells = [format_cell_value(value) for value in row]
+            # 末尾の空の列を除去
+            while cells and not cells[-1]:
+                cells.pop()
+
+            if header is None:
+                header = cells
+                width = len(cells)
+                continue
+            if not cells:
+                # 空の行は、後に空でない行がある場合のみ出力
+                pending_empty_rows += 1
+                continue
+            if max_rows is not None and data_rows + pending_empty_rows >= max_rows:
+                truncated = True
+                break
+
+            for _ in range(pending_empty_rows):
+                spool.write("1\t\n")
+            data_rows += pending_empty_rows + 1
+            pending_empty_rows = 0
+            width = max(width, len(cells))
+            # 行ごとのセル数と内容を記録（改行はエスケープ済みのため1行に収まる）
+            spool.write(f"{len(cells)}\t{' | '.join(cells)}\n")
+
+        if width == 0:
+            return False
+
+        out.write('| ' + ' | '.join((header + [''] * width)[:width]) + ' |\n')
+        out.write('| ' + ' | '.join(['---'] * width) + ' |\n')
+        spool.seek(0)
+        for line in spool:
+            count, content = line.rstrip('\n').split('\t', 1)
+            out.write('| ' + content + ' | ' * (width - int(count)) + ' |\n')
+
+    if truncated:
+        total = f"（シートの行数: {sheet.max_row}）" if sheet.max_row else ""
+        out.write(f"\n> このシートは{max_rows}行を超えるため、先頭{max_rows}行のみを出力しています{total}\n")
+    return truncated
+
+
+def write_image_section(
+    out: TextIO,
+    images: List["ExtractedImage"],
+    image_dir_name: str,
+    descriptions: Dict[str, str]
+) -> None:
+    """
+    シートの末尾に画像の一覧を書き込みます。
+
+    Args:
+        out: 書き込み先
+        images: シートに配置された画像のリスト
+        image_dir_name: 画像ディレクトリ名
+        descriptions: 画像ファイル名をキーとする画像の説明
+    """
+    if not images:
+        out.write("\n")
+        return
+
+    out.write("\n### 画像\n\n")
+    for image in images:
+        out.write(f"{format_image_link(image_dir_name, image)}\n\n")
+        if image.filename in descriptions:
+            out.write(f"{descriptions[image.filename]}\n\n")
+
+
+def write_workbook_markdown(
+    wb,
+    out: TextIO,
+    images_by_sheet: Dict[str, List["ExtractedImage"]],
+    image_dir_name: str,
+    descriptions: Dict[str, str],
+    max_rows: Optional[int] = None
+) -> None:
+    """
+    ワークブックの全シートをMarkdownとして出力先に書き込みます。
+    各シートは「## シート名」の見出しと表で構成され、画像がある場合は表の後に追加します。
+
+    Args:
+        wb: read_onlyで読み込んだopenpyxlのワークブック
+        out: 書き込み先
+        images_by_sheet: シート名をキーとし、抽出した画像のリストを値とする辞書
+        image_dir_name: 画像ディレクトリ名
+        descriptions: 画像ファイル名をキーとする画像の説明
+        max_rows: シートごとに出力する最大行数、Noneの場合は無制限
+    """
+    written = set()
+    for sheet in wb.worksheets:
+        out.write(f"## {sheet.title}\n")
+        if write_sheet_markdown(sheet, out, max_rows):
+            print(f"  注意: シート「{sheet.title}」は{max_rows}行を超えるため、以降の行を省略しました")
+        write_image_section(out, images_by_sheet.get(sheet.title, []), image_dir_name, descriptions)
+        written.add(sheet.title)
+
+    # ワークシート以外（グラフシートなど）に配置された画像は末尾に追加
+    for sheet_name, images in images_by_sheet.items():
+        if sheet_name not in written:
+            out.write(f"## {sheet_name}\n")
+            write_image_section(out, images, image_dir_name, descriptions)
+
+
+def describe_image(md_converter, image_path: Path) -> Optional[str]:
+    """
+    markitdown（LLM）で画像の説明を生成します。
+
+    Args:
+        md_converter: LLMクライアントを設定したMarkItDown
+        image_path: 画像ファイルのパス
+
+    Returns:
+        画像の説明、生成できない場合はNone
+    """
+    try:
+        result = md_converter.convert(str(image_path))
+    except Exception as e:
+        print(f"  警告: 画像の説明の生成に失敗しました: {e}", file=sys.stderr)
+        return None
+
+    # markitdownの出力から説明部分のみを取り出す
+    marker = '# Description:'
+    text = result.text_content or ''
+    if marker not in text:
+        return None
+    return text.split(marker, 1)[1].strip() or None
+
+
+# 画像形式を判定するための先頭バイト列（マジックナンバー）と拡張子
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'\xd7\xcd\xc6\x9a', 'wmf'),  # Placeable WMF
+    (b'\x01\x00\x09\x00', 'wmf'),
+    (b'\x02\x00\x09\x00', 'wmf'),
+]
+
+
+class ExtractedImage(NamedTuple):
+    """抽出した画像のファイル名と、画像の左上が配置されたセル番地"""
+    filename: str
+    anchor: Optional[str]
+
+
+def detect_image_extension(header: bytes) -> Optional[str]:
+    """
+    画像データの先頭バイト列から拡張子を判定します。
+
+    Args:
+        header: 画像データの先頭（64バイト程度）
+
+    Returns:
+        拡張子（判定できない場合はNone）
+    """
+    for signature, ext in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return ext
+
+    if header[:4] == b'\x01\x00\x00\x00' and header[40:44] == b' EMF':
+        return 'emf'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header.lstrip().startswith((b'<svg', b'<?xml')):
+        return 'svg'
+    return None
+
+
+def _local_name(tag: str) -> str:
+    """XMLの名前空間を除いた要素名・属性名を返します。"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _read_relationships(archive: zipfile.ZipFile, part_path: str) -> Dict[str, Tuple[str, str]]:
+    """
+    パーツのリレーションシップ（_rels/*.rels）を読み込みます。
+
+    Args:
+        archive: xlsxファイルのzip
+        part_path: パーツのパス（例: xl/workbook.xml）
+
+    Returns:
+        リレーションシップIDをキーとし、(種類, zip内の参照先パス) を値とする辞書
+    """
+    folder, name = posixpath.split(part_path)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(folder, '_rels', f"{name}.rels")))
+    except KeyError:
+        return {}
+
+    relationships = {}
+    for rel in root:
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            path = target.lstrip('/')
+        else:
+            path = posixpath.normpath(posixpath.join(folder, target))
+        # 種類はTransitional/Strictの名前空間の違いを無視して末尾のみ使用
+        relationships[rel.get('Id')] = (rel.get('Type', '').rsplit('/', 1)[-1], path)
+    return relationships
+
+
+def _iter_sheet_images(archive: zipfile.ZipFile) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    ワークブック → シート → 描画 → 画像のリレーションシップをたどり、
+    シートに配置された画像を列挙します。
+
+    Yields:
+        (シート名, zip内の画像のパス, 配置先のセル番地) のタプル
+    """
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    workbook_rels = _read_relationships(archive, 'xl/workbook.xml')
+
+    for sheet in workbook.iter():
+        if _local_name(sheet.tag) != 'sheet':
+            continue
+        rel_id = next((value for key, value in sheet.attrib.items() if _local_name(key) == 'id'), None)
+        if rel_id not in workbook_rels:
+            continue
+
+        sheet_path = workbook_rels[rel_id][1]
+        for rel_type, drawing_path in _read_relationships(archive, sheet_path).values():
+            if rel_type != 'drawing':
+                continue
+
+            drawing_rels = _read_relationships(archive, drawing_path)
+            drawing = ET.fromstring(archive.read(drawing_path))
+            # twoCellAnchor / oneCellAnchor / absoluteAnchor を記述順に処理
+            for anchor in drawing:
+                cell = None
+                for child in anchor:
+                    if _local_name(child.tag) == 'from':
+                        position = {_local_name(item.tag): item.text for item in child}
+                        cell = f"{get_column_letter(int(position['col']) + 1)}{int(position['row']) + 1}"
+                        break
+
+                # グループ化された図も含め、アンカー内の全ての画像参照を対象にする
+                for blip in anchor.iter():
+                    if _local_name(blip.tag) != 'blip':
+                        continue
+                    embed = next((value for key, value in blip.attrib.items() if _local_name(key) == 'embed'), None)
+                    rel = drawing_rels.get(embed)
+                    if rel and rel[0] == 'image':
+                        yield sheet.get('name'), rel[1], cell
+
+
+def extract_images_from_excel(
+    excel_path: Path,
+    image_dir: Path,
+    convert_formats: Sequence[str] = ()
+) -> Dict[str, List[ExtractedImage]]:
     """
     Excelファイルから画像を抽出してファイルとして保存します。
 
+    画像はデコードせず、xlsxファイル(zip)内の xl/media のデータをそのまま書き出します。
+    配置先のシートとセルは描画パーツのリレーションシップから求め、
+    拡張子は画像データの先頭バイト列から判定します。
+
     Args:
         excel_path: Excelファイルのパス
         image_dir: 画像の保存先ディレクトリ
+        convert_formats: PNGに変換する画像形式の拡張子（例: emf, wmf）、それ以外は変換しない
 
     Returns:
-        シート名をキーとし、画像ファイルパスのリストを値とする辞書
+        シート名をキーとし、抽出した画像のリストを値とする辞書
     """
     images_by_sheet = {}
+    convert_formats = {ext.lower() for ext in convert_formats}
 
     try:
-        wb = load_workbook(excel_path, data_only=True)
-
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            sheet_images = []
-
-            # シート内の画像を取得
-            if hasattr(sheet, '_images') and sheet._images:
-                for img_idx, img in enumerate(sheet._images, 1):
-                    try:
-                        # 画像データを取得
-                        if hasattr(img, '_data'):
-                            image_data = img._data()
-                        elif hasattr(img, 'ref'):
-                            # 別の方法で画像データを取得
-                            image_data = img.ref
-                        else:
+        with zipfile.ZipFile(excel_path) as archive:
+            for sheet_name, media_path, anchor in _iter_sheet_images(archive):
+                sheet_images = images_by_sheet.setdefault(sheet_name, [])
+                img_idx = len(sheet_images) + 1
+
+                try:
+                    with archive.open(media_path) as src:
+                        header = src.read(64)
+
+                    # ファイル拡張子を決定（判定できない場合は元のファイル名の拡張子）
+                    ext = detect_image_extension(header)
+                    if ext is None:
+                        ext = posixpath.splitext(media_path)[1].lstrip('.').lower() or 'bin'
+
+                    # 画像ファイル名を生成（シート名_画像番号.拡張子）
+                    # ファイル名に使えない文字を置換
+                    safe_sheet_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in sheet_name)
+
+                    if ext in convert_formats:
+                        # 指定された形式のみデコードしてPNGに変換
+                        try:
+                            image_filename = f"{safe_sheet_name}_image_{img_idx}.png"
+                            with Image.open(io.BytesIO(archive.read(media_path))) as pil_image:
+                                pil_image.save(image_dir / image_filename, format='PNG')
+                            sheet_images.append(ExtractedImage(image_filename, anchor))
                             continue
+                        except Exception as e:
+                            print(f"  警告: 画像をPNGに変換できないため、元の形式で保存します: {e}", file=sys.stderr)
 
-                        # PIL Imageに変換
-                        pil_image = Image.open(io.BytesIO(image_data))
-                        image_format = pil_image.format or 'PNG'
+                    # 画像データをそのままコピー
+                    image_filename = f"{safe_sheet_name}_image_{img_idx}.{ext}"
+                    with archive.open(media_path) as src, open(image_dir / image_filename, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    sheet_images.append(ExtractedImage(image_filename, anchor))
 
-                        # ファイル拡張子を決定
-                        ext = image_format.lower()
-                        if ext == 'jpeg':
-                            ext = 'jpg'
+                except Exception as e:
+                    print(f"  警告: 画像の抽出に失敗しました: {e}", file=sys.stderr)
+                    continue
 
-                        # 画像ファイル名を生成（シート名_画像番号.拡張子）
-                        # ファイル名に使えない文字を置換
-                        safe_sheet_name = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in sheet_name)
-                        image_filename = f"{safe_sheet_name}_image_{img_idx}.{ext}"
-                        image_path = image_dir / image_filename
+    except Exception as e:
+        print(f"  警告: Excelファイルの画像抽出中にエラーが発生しました: {e}", file=sys.stderr)
 
-                        # 画像を保存
-                        pil_image.save(image_path, format=image_format)
-                        sheet_images.append(image_filename)
+    return {sheet_name: images for sheet_name, images in images_by_sheet.items() if images}
 
-                    except Exception as e:
-                        print(f"  警告: 画像の抽出に失敗しました: {e}", file=sys.stderr)
-                        continue
 
-            if sheet_images:
-                images_by_sheet[sheet_name] = sheet_images
+def format_image_link(image_dir_name: str, image: ExtractedImage) -> str:
+    """
+    抽出した画像へのMarkdownのリンクを生成します。配置先のセルが分かる場合は代替テキストに含めます。
 
-        wb.close()
-    except Exception as e:
-        print(f"  警告: Excelファイルの画像抽出中にエラーが発生しました: {e}", file=sys.stderr)
+    Args:
+        image_dir_name: 画像ディレクトリ名
+        image: 抽出した画像
+
+    Returns:
+        Markdownの画像リンク
+    """
+    alt = f"{image.filename} ({image.anchor})" if image.anchor else image.filename
+    return f"![{alt}]({image_dir_name}/{image.filename})"
 
-    return images_by_sheet
+
+def get_output_path(excel_path: Path, output_dir: Optional[Path] = None) -> Path:
+    """
+    Excelファイルに対応するMarkdownファイルの出力先を返します。
+
+    Args:
+        excel_path: Excelファイルのパス
+        output_dir: 出力先ディレクトリ（Noneの場合、元のファイルと同じディレクトリ）
+
+    Returns:
+        Markdownファイルのパス
+    """
+    if output_dir:
+        return output_dir / f"{excel_path.stem}.md"
+    return excel_path.with_suffix('.md')
 
 
 def convert_excel_to_markdown(
     excel_path: Path,
     output_dir: Optional[Path] = None,
-    llm_client=None
+    llm_client=None,
+    convert_images: Sequence[str] = (),
+    max_rows: Optional[int] = None
 ) -> Optional[Path]:
     """
     Excelファイルを画像付きMarkdownに変換します。
@@ -170,6 +576,8 @@ def convert_excel_to_markdown(
         excel_path: Excelファイルのパス
         output_dir: 出力先ディレクトリ（Noneの場合、元のファイルと同じディレクトリ）
         llm_client: LLMクライアント（画像説明生成用、オプション）
+        convert_images: PNGに変換する画像形式の拡張子（例: emf, wmf）
+        max_rows: シートごとに出力する最大行数、Noneの場合は無制限
 
     Returns:
         生成されたMarkdownファイルのパス、失敗時はNone
@@ -180,92 +588,44 @@ def convert_excel_to_markdown(
         image_dir = excel_path.parent / image_dir_name
 
         # 画像を抽出（画像が存在する場合のみディレクトリを作成）
+        # 画像の有無はzipの格納ファイル一覧のみで判定し、画像はzipから直接コピーする
         images_by_sheet = {}
-        wb = load_workbook(excel_path, data_only=True)
-        has_images = any(
-            hasattr(wb[sheet_name], '_images') and wb[sheet_name]._images
-            for sheet_name in wb.sheetnames
-        )
-        wb.close()
-
-        if has_images:
+        if has_embedded_images(excel_path):
             image_dir.mkdir(exist_ok=True)
-            images_by_sheet = extract_images_from_excel(excel_path, image_dir)
-
-        # markitdownで基本的な変換
-        if llm_client:
-            md_converter = MarkItDown(llm_client=llm_client, llm_model="gpt-4o")
-        else:
-            md_converter = MarkItDown()
-
-        result = md_converter.convert(str(excel_path))
-
-        # Markdownコンテンツを取得してシートごとに分割・再構築
-        markdown_content = result.text_content
-
-        # 画像が存在する場合、各シートの末尾に画像を追加
-        if images_by_sheet:
-            # シートごとに画像を末尾に追加
-            for sheet_name, image_files in images_by_sheet.items():
-                # シート名をMarkdownから検索して、その末尾に画像を追加
-                sheet_header = f"## {sheet_name}"
-
-                if sheet_header in markdown_content:
-                    # 次のシートの開始位置を探す
-                    lines = markdown_content.split('\n')
-                    new_lines = []
-                    in_target_sheet = False
-                    images_added = False
-
-                    for i, line in enumerate(lines):
-                        new_lines.append(line)
-
-                        # 対象シートの開始
-                        if line.strip() == sheet_header:
-                            in_target_sheet = True
-                        # 次のシートの開始、またはファイル末尾で画像を挿入
-                        elif in_target_sheet and (line.startswith('## ') or i == len(lines) - 1):
-                            if not images_added:
-                                # 画像を挿入
-                                if i == len(lines) - 1 and not line.startswith('## '):
-                                    # 最後のシートの場合、現在の行の後に追加
-                                    pass
-                                else:
-                                    # 次のシートの前に追加（現在の行の前に挿入するため一旦削除）
-                                    new_lines.pop()
-
-                                new_lines.append('')
-                                new_lines.append('### 画像')
-                                new_lines.append('')
-
-                                for img_file in image_files:
-                                    img_path = f"{image_dir_name}/{img_file}"
-                                    new_lines.append(f"![{img_file}]({img_path})")
-                                    new_lines.append('')
-
-                                if i != len(lines) - 1:
-                                    new_lines.append(line)  # 次のシートの開始行を再追加
-
-                                images_added = True
-                                in_target_sheet = False
-
-                    markdown_content = '\n'.join(new_lines)
-                else:
-                    # シートヘッダーが見つからない場合は末尾に追加
-                    markdown_content += f"\n\n## {sheet_name}\n\n### 画像\n\n"
-                    for img_file in image_files:
-                        img_path = f"{image_dir_name}/{img_file}"
-                        markdown_content += f"![{img_file}]({img_path})\n\n"
+            images_by_sheet = extract_images_from_excel(excel_path, image_dir, convert_images)
+
+        # LLMで画像の説明を生成
+        descriptions = {}
+        if llm_client and images_by_sheet:
+            try:
+                from markitdown import MarkItDown
+            except ImportError:
+                print("  警告: markitdownがインストールされていないため、画像の説明を生成しません。", file=sys.stderr)
+            else:
+                md_converter = MarkItDown(llm_client=llm_client, llm_model="gpt-4o")
+                for image_files in images_by_sheet.values():
+                    for image in image_files:
+                        description = describe_image(md_converter, image_dir / image.filename)
+                        if description:
+                            descriptions[image.filename] = description
 
         # 出力先を決定
         if output_dir:
             output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / f"{excel_path.stem}.md"
-        else:
-            output_path = excel_path.with_suffix('.md')
+        output_path = get_output_path(excel_path, output_dir)
 
-        # Markdownファイルを保存
-        output_path.write_text(markdown_content, encoding='utf-8')
+        # ワークブックをread_onlyで1回だけ読み込み、シートごとに表を直接書き込む
+        # 途中で失敗した場合に不完全なファイルを残さないよう、一時ファイルに書き込んでから置き換える
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        wb = load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as out:
+                write_workbook_markdown(wb, out, images_by_sheet, image_dir_name, descriptions, max_rows)
+            os.replace(tmp_path, output_path)
+        finally:
+            wb.close()
+            if tmp_path.exists():
+                tmp_path.unlink()
 
         return output_path
 
@@ -276,6 +636,242 @@ def convert_excel_to_markdown(
         return None
 
 
+def create_llm_client():
+    """
+    LLMクライアント（OpenAI）を生成します。
+
+    Returns:
+        LLMクライアント、生成できない場合はNone
+    """
+    try:
+        from openai import OpenAI
+        return OpenAI()
+    except ImportError:
+        print("警告: openaiライブラリがインストールされていません。", file=sys.stderr)
+        print("pip install openai でインストールしてください。", file=sys.stderr)
+    except Exception as e:
+        print(f"警告: OpenAIクライアントの初期化に失敗しました: {e}", file=sys.stderr)
+    return None
+
+
+def _convert_worker(
+    excel_path: Path,
+    output_dir: Optional[Path],
+    llm_images: bool,
+    convert_images: Sequence[str],
+    max_rows: Optional[int],
+    results
+) -> None:
+    """
+    子プロセスで1ファイルを変換し、結果をキューに返します。
+
+    LLMクライアントはプロセス間で受け渡せないため、子プロセス内で生成します。
+    """
+    llm_client = create_llm_client() if llm_images else None
+    output_path = convert_excel_to_markdown(excel_path, output_dir, llm_client, convert_images, max_rows)
+    results.put((str(excel_path), output_path))
+
+
+def convert_in_parallel(
+    excel_files: List[Path],
+    output_dir: Optional[Path],
+    llm_images: bool,
+    jobs: int,
+    timeout: Optional[float] = None,
+    convert_images: Sequence[str] = (),
+    max_rows: Optional[int] = None
+) -> Iterator[Tuple[Path, Optional[Path], Optional[str]]]:
+    """
+    複数のExcelファイルを子プロセスで並列に変換します。
+
+    同時に実行するプロセスは最大jobs個で、ファイルごとに1プロセスを起動します。
+    timeoutを超えたプロセスは停止し、そのファイルは失敗として扱います。
+
+    Args:
+        excel_files: 変換対象のExcelファイルのパスリスト
+        output_dir: 出力先ディレクトリ（Noneの場合、元のファイルと同じディレクトリ）
+        llm_images: LLMによる画像説明生成を行うかどうか
+        jobs: 同時に実行するプロセス数
+        timeout: 1ファイルあたりの変換時間の上限（秒）、Noneの場合は無制限
+        convert_images: PNGに変換する画像形式の拡張子（例: emf, wmf）
+        max_rows: シートごとに出力する最大行数、Noneの場合は無制限
+
+    Yields:
+        完了した順に (Excelファイルのパス, 生成されたMarkdownファイルのパス, エラー内容) のタプル
+        成功時のエラー内容はNone、失敗時のMarkdownファイルのパスはNone
+    """
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    pending = deque(excel_files)
+    running = {}  # str(excel_path) -> (excel_path, process, 期限)
+
+    try:
+        while pending or running:
+            # 空きがあれば次のファイルの変換を開始
+            while pending and len(running) < max(jobs, 1):
+                excel_path = pending.popleft()
+                process = context.Process(
+                    target=_convert_worker,
+                    args=(excel_path, output_dir, llm_images, convert_images, max_rows, results),
+                    daemon=True
+                )
+                process.start()
+                deadline = time.monotonic() + timeout if timeout else None
+                running[str(excel_path)] = (excel_path, process, deadline)
+
+            # 完了した結果を受け取る（期限の確認のため最大0.5秒で待機を打ち切る）
+            try:
+                key, output_path = results.get(timeout=0.5)
+            except queue.Empty:
+                pass
+            else:
+                # タイムアウトで停止済みのファイルの結果は無視する
+                if key in running:
+                    excel_path, process, _ = running.pop(key)
+                    process.join()
+                    yield excel_path, output_path, None if output_path else "変換に失敗しました"
+
+            # タイムアウトと異常終了を確認
+            now = time.monotonic()
+            for key, (excel_path, process, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    process.terminate()
+                    process.join()
+                    del running[key]
+                    yield excel_path, None, f"タイムアウトしました（{timeout:g}秒）"
+                elif not process.is_alive() and process.exitcode != 0:
+                    del running[key]
+                    yield excel_path, None, f"変換プロセスが異常終了しました（終了コード: {process.exitcode}）"
+    finally:
+        # 中断された場合も子プロセスを残さない
+        for _, process, _ in running.values():
+            process.terminate()
+            process.join()
+
+
+CACHE_FILE_NAME = '.excel_to_markdown_cache.json'
+
+# 出力形式を変更した場合は値を上げ、既存のキャッシュを無効にする
+CACHE_VERSION = 4
+
+
+class ConversionCache:
+    """
+    変換結果のキャッシュ（JSONのサイドカーマニフェスト）。
+
+    Excelファイルごとにサイズ・更新日時・内容のハッシュ値と変換時のオプションを記録し、
+    変更のないファイルの再変換を省略します。
+    """
+
+    def __init__(self, path: Path, base_dir: Path):
+        self.path = path
+        self.base_dir = base_dir
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                if data.get('version') == CACHE_VERSION:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"警告: 変換キャッシュを読み込めないため、全てのファイルを変換します: {e}", file=sys.stderr)
+
+    def relative_path(self, path: Path) -> str:
+        """
+        キャッシュに記録するパスを返します。
+        チェックアウト先が変わっても使えるよう、対象ディレクトリ配下は相対パスで記録します。
+        """
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def _key(self, excel_path: Path) -> str:
+        return self.relative_path(excel_path)
+
+    @staticmethod
+    def _hash(excel_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(excel_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def fingerprint(self, excel_path: Path) -> Dict[str, Any]:
+        """ファイルのサイズ・更新日時・内容のハッシュ値を返します。"""
+        stat = excel_path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': self._hash(excel_path)}
+
+    def check(self, excel_path: Path, options: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        ファイルが前回の変換から変更されていないかを確認します。
+
+        サイズと更新日時が一致すればハッシュ値を計算せずに変更なしと判定します。
+        更新日時のみが異なる場合はハッシュ値で比較します。
+
+        Args:
+            excel_path: Excelファイルのパス
+            options: 変換時のオプション
+
+        Returns:
+            (変更がなく生成済みのファイルを再利用できるか, ファイルのフィンガープリント) のタプル
+        """
+        stat = excel_path.stat()
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        entry = self.entries.get(self._key(excel_path))
+
+        reusable = (
+            entry is not None
+            and entry.get('options') == options
+            and entry.get('size') == stat.st_size
+            and (self.base_dir / entry.get('output', '')).is_file()
+            and (not entry.get('images') or excel_path.with_name(f"{excel_path.stem}_images").is_dir())
+        )
+        if reusable and entry.get('mtime_ns') == stat.st_mtime_ns:
+            fingerprint['sha256'] = entry.get('sha256')
+            self.hits += 1
+            return True, fingerprint
+
+        fingerprint['sha256'] = self._hash(excel_path)
+        if reusable and entry.get('sha256') == fingerprint['sha256']:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self.hits += 1
+            return True, fingerprint
+
+        self.misses += 1
+        return False, fingerprint
+
+    def record(self, excel_path: Path, fingerprint: Dict[str, Any], options: Dict[str, Any], output_path: Path) -> None:
+        """変換に成功したファイルを記録します。"""
+        self.entries[self._key(excel_path)] = {
+            **fingerprint,
+            'options': options,
+            'output': self.relative_path(output_path),
+            'images': excel_path.with_name(f"{excel_path.stem}_images").is_dir(),
+        }
+
+    def discard(self, excel_path: Path) -> None:
+        """変換に失敗したファイルの記録を削除します。"""
+        self.entries.pop(self._key(excel_path), None)
+
+    def prune(self, excel_files: List[Path]) -> None:
+        """存在しなくなったファイルの記録を削除します。"""
+        keys = {self._key(excel_file) for excel_file in excel_files}
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keys}
+
+    def save(self) -> None:
+        """キャッシュを保存します（一時ファイルに書き込んでから置き換えます）。"""
+        data = {'version': CACHE_VERSION, 'files': self.entries}
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"警告: 変換キャッシュを保存できませんでした: {e}", file=sys.stderr)
+
+
 def main():
     """メイン処理"""
     parser = argparse.ArgumentParser(
@@ -308,8 +904,58 @@ def main():
         help='LLM（OpenAI）を使用して画像の説明を生成（OPENAI_API_KEY環境変数が必要）'
     )
 
+    parser.add_argument(
+        '--convert-images',
+        type=lambda value: [ext.strip().lower().lstrip('.') for ext in value.split(',') if ext.strip()],
+        default=[],
+        help='PNGに変換する画像形式をカンマ区切りで指定（例: emf,wmf）。指定しない形式は元のデータのまま保存'
+    )
+
+    parser.add_argument(
+        '--max-rows',
+        type=int,
+        help='シートごとに出力する最大行数（見出し行を除く）。超えた行は省略し、その旨を出力'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='変換キャッシュを使用せず、全てのファイルを変換する'
+    )
+
+    parser.add_argument(
+        '--cache-file',
+        type=Path,
+        help=f'変換キャッシュの保存先（デフォルト: 対象ディレクトリ直下の{CACHE_FILE_NAME}）'
+    )
+
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='並列に変換するプロセス数（デフォルト: 1）'
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        help='1ファイルあたりの変換時間の上限（秒）'
+    )
+
     args = parser.parse_args()
 
+    if args.jobs < 1:
+        print("エラー: --jobs には1以上を指定してください", file=sys.stderr)
+        sys.exit(1)
+
+    if args.max_rows is not None and args.max_rows < 1:
+        print("エラー: --max-rows には1以上を指定してください", file=sys.stderr)
+        sys.exit(1)
+
+    if args.timeout is not None and args.timeout <= 0:
+        print("エラー: --timeout には0より大きい値を指定してください", file=sys.stderr)
+        sys.exit(1)
+
     # ディレクトリの存在確認
     if not args.directory.exists():
         print(f"エラー: ディレクトリが見つかりません: {args.directory}", file=sys.stderr)
@@ -322,15 +968,9 @@ def main():
     # LLMクライアントの設定
     llm_client = None
     if args.llm_images:
-        try:
-            from openai import OpenAI
-            llm_client = OpenAI()
+        llm_client = create_llm_client()
+        if llm_client:
             print("LLMによる画像説明生成が有効です。")
-        except ImportError:
-            print("警告: openaiライブラリがインストールされていません。", file=sys.stderr)
-            print("pip install openai でインストールしてください。", file=sys.stderr)
-        except Exception as e:
-            print(f"警告: OpenAIクライアントの初期化に失敗しました: {e}", file=sys.stderr)
 
     # Excelファイルを検索
     print(f"ディレクトリを検索中: {args.directory}")
@@ -349,32 +989,101 @@ def main():
         print("\n--dry-run モードのため、変換は実行されませんでした。")
         return
 
+    # 変換キャッシュを確認し、変更のないファイルは変換を省略
+    cache = ConversionCache(args.cache_file or args.directory / CACHE_FILE_NAME, args.directory)
+    cache_options = {
+        'output_dir': cache.relative_path(args.output_dir) if args.output_dir else None,
+        'convert_images': sorted(args.convert_images),
+        'llm_images': llm_client is not None,
+        'max_rows': args.max_rows,
+    }
+    fingerprints = {}
+    pending_files = []
+    for excel_file in excel_files:
+        try:
+            if args.force:
+                unchanged, fingerprint = False, cache.fingerprint(excel_file)
+            else:
+                unchanged, fingerprint = cache.check(excel_file, cache_options)
+        except OSError as e:
+            print(f"警告: ファイルを確認できませんでした: {excel_file}: {e}", file=sys.stderr)
+            unchanged, fingerprint = False, None
+        if unchanged:
+            continue
+        fingerprints[excel_file] = fingerprint
+        pending_files.append(excel_file)
+
+    if not args.force:
+        print(f"\n変更のないファイル: {cache.hits}件（変換を省略します）")
+
+    def record_result(excel_file: Path, output_path: Optional[Path]) -> None:
+        if output_path is None:
+            cache.discard(excel_file)
+            return
+        if fingerprints.get(excel_file) is not None:
+            cache.record(excel_file, fingerprints[excel_file], cache_options, output_path)
+
     # 変換処理
     print("\n変換を開始します...")
     successful = 0
     failed = 0
 
-    for excel_file in excel_files:
-        print(f"\n変換中: {excel_file.name}")
-
-        output_path = convert_excel_to_markdown(
-            excel_file,
-            args.output_dir,
-            llm_client
-        )
-
-        if output_path:
-            print(f"  ✓ 成功: {output_path}")
-            successful += 1
+    try:
+        if args.jobs > 1 or args.timeout:
+            # 子プロセスで変換し、完了したものから結果を表示
+            print(f"並列数: {args.jobs}")
+            results = convert_in_parallel(
+                pending_files,
+                args.output_dir,
+                llm_client is not None,
+                args.jobs,
+                args.timeout,
+                args.convert_images,
+                args.max_rows
+            )
+            for index, (excel_file, output_path, error) in enumerate(results, 1):
+                print(f"\n完了 [{index}/{len(pending_files)}]: {excel_file.name}")
+                record_result(excel_file, output_path)
+
+                if output_path:
+                    print(f"  ✓ 成功: {output_path}")
+                    successful += 1
+                else:
+                    print(f"  ✗ 失敗: {error}")
+                    failed += 1
         else:
-            print(f"  ✗ 失敗")
-            failed += 1
+            for excel_file in pending_files:
+                print(f"\n変換中: {excel_file.name}")
+
+                output_path = convert_excel_to_markdown(
+                    excel_file,
+                    args.output_dir,
+                    llm_client,
+                    args.convert_images,
+                    args.max_rows
+                )
+                record_result(excel_file, output_path)
+
+                if output_path:
+                    print(f"  ✓ 成功: {output_path}")
+                    successful += 1
+                else:
+                    print(f"  ✗ 失敗")
+                    failed += 1
+    finally:
+        # 中断された場合も、それまでの変換結果をキャッシュに残す
+        cache.prune(excel_files)
+        cache.save()
 
     # 結果サマリー
     print("\n" + "="*50)
     print("変換完了")
     print(f"成功: {successful}件")
     print(f"失敗: {failed}件")
+    if args.force:
+        print("キャッシュ: 使用しない（--force）")
+    else:
+        print(f"キャッシュ: ヒット {cache.hits}件 / ミス {cache.misses}件")
     print("="*50)
 
 
@@ -0,0 +1,73 @@
+"""Micro-benchmark: per-call re.match loop vs. the precompiled LayerMatcher.
+
+Usage:
+    python benchmarks/bench_layer_matcher.py [key_count]
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from glue_workflow_downloader.config import LayerMatcher  # noqa: E402
+
+PATTERNS = [
+    r"^sales_\d{8}\.csv$",
+    r"^sales_final_\d{8}\.(csv|parquet)$",
+    r"^returns_\d{8}_\d{2}\.csv$",
+    r"^inventory_[A-Z]{3}_\d{8}\.json$",
+]
+FORMATS = ["csv", "parquet", "json"]
+
+
+def synthetic_keys(count: int) -> List[str]:
+    rng = random.Random(42)
+    stems = ["sales_", "sales_final_", "returns_", "inventory_ABC_", "tmp_", "_SUCCESS"]
+    extensions = [".csv", ".parquet", ".json", ".tmp", ""]
+    keys = []
+    for _ in range(count):
+        stem = rng.choice(stems)
+        keys.append(f"raw/sales/{stem}{rng.randint(20200101, 20251231)}{rng.choice(extensions)}")
+    return keys
+
+
+def legacy_match(filename: str) -> Optional[str]:
+    """The original LayerConfig logic: matches_filename followed by get_matched_pattern."""
+    def matched() -> Optional[str]:
+        for pattern in PATTERNS:
+            if re.match(pattern, filename):
+                return pattern
+        return None
+
+    if matched() is None:
+        return None
+    if Path(filename).suffix.lower().lstrip(".") not in FORMATS:
+        return None
+    return matched()
+
+
+def run(label: str, func: Callable[[str], Optional[str]], keys: List[str]) -> float:
+    start = time.perf_counter()
+    hits = sum(1 for key in keys if func(key[key.rfind("/") + 1 :]) is not None)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.3f}s  {len(keys) / elapsed:12,.0f} keys/s  matched={hits}")
+    return elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    keys = synthetic_keys(count)
+    matcher = LayerMatcher(PATTERNS, FORMATS)
+    legacy = run("re.match", legacy_match, keys)
+    compiled = run("LayerMatcher", matcher.match, keys)
+    print(f"speed-up: {legacy / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,40 +3,76 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 import click
 
+from .config import ConfigManager
 from .exceptions import GlueWorkflowDownloaderError
 from .main import GlueWorkflowDownloader
 from .utils import configure_logging
+from .utils.history import RunHistory, format_history
 
 LOGGER = logging.getLogger(__name__)
 
 
-@click.command()
+class DefaultGroup(click.Group):
+    """Command group that falls back to a default subcommand.
+
+    Keeps ``glue_workflow_downloader --config ... --workflow ...`` working by
+    routing arguments that do not start with a subcommand name to ``run``.
+    """
+
+    def __init__(self, *args, default_command: str = "run", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args):
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names + ["--version"]):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
+@click.version_option(version="1.0.0")
+def main() -> None:
+    """Run Glue workflows and download their layers (default), or inspect run history."""
+
+
+@main.command("run")
 @click.option("--config", "-c", "config_path", required=True, type=click.Path(exists=True), help="Path to the YAML configuration file.")
-@click.option("--workflow", "workflow_name", required=True, help="Glue workflow name to execute.")
+@click.option("--workflow", "workflow_names", multiple=True, help="Glue workflow name to execute; repeat to run several concurrently.")
+@click.option("--max-concurrent-workflows", type=int, help="Maximum number of workflows running at once.")
 @click.option("--output", "output_dir", type=click.Path(), help="Override the download output directory.")
 @click.option("--no-execute", "execute", flag_value=False, default=None, help="Do not trigger the workflow run.")
 @click.option("--execution-timeout", type=int, help="Workflow execution timeout in seconds.")
 @click.option("--log-level", type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False), help="Override logging level.")
 @click.option("--max-workers", type=int, help="Number of parallel download workers.")
+@click.option("--max-bandwidth", type=float, help="Cap total transfer bandwidth in MB/s.")
+@click.option("--adaptive", "adaptive_concurrency", is_flag=True, default=None, help="Tune concurrent transfers from observed throughput.")
 @click.option("--overwrite", is_flag=True, default=None, help="Overwrite existing files.")
+@click.option("--sync", "sync", is_flag=True, default=None, help="Download only objects changed since the last run.")
+@click.option("--upload-sync", "upload_sync", is_flag=True, default=None, help="Upload only new or changed local override files.")
+@click.option("--stream", "streaming", is_flag=True, default=None, help="Start downloading while S3 listing is still in progress.")
 @click.option("--dry-run", is_flag=True, help="Preview the run without downloading or executing the workflow.")
 @click.option("--skip-validation", is_flag=True, help="Skip workflow validation steps.")
 @click.option("--wait", "wait_for_completion", flag_value=True, default=None, help="Wait for workflow completion (default from config).")
 @click.option("--polling-interval", type=int, help="Polling interval for workflow status checks.")
-@click.version_option(version="1.0.0")
-def main(
+def run(
     config_path: str,
-    workflow_name: str,
+    workflow_names: Tuple[str, ...],
+    max_concurrent_workflows: Optional[int],
     output_dir: Optional[str],
     execute: Optional[bool],
     execution_timeout: Optional[int],
     log_level: Optional[str],
     max_workers: Optional[int],
+    max_bandwidth: Optional[float],
+    adaptive_concurrency: Optional[bool],
     overwrite: Optional[bool],
+    sync: Optional[bool],
+    upload_sync: Optional[bool],
+    streaming: Optional[bool],
     dry_run: bool,
     skip_validation: bool,
     wait_for_completion: Optional[bool],
@@ -51,15 +87,40 @@ def main(
         config_dict.setdefault("download", {})["local_base_dir"] = output_dir
     if max_workers is not None:
         config_dict.setdefault("download", {})["max_workers"] = max_workers
+    if max_bandwidth is not None:
+        config_dict.setdefault("download", {})["max_bandwidth_mb_per_sec"] = max_bandwidth
+    if adaptive_concurrency is not None:
+        config_dict.setdefault("download", {})["adaptive_concurrency"] = adaptive_concurrency
     if overwrite is not None:
         config_dict.setdefault("download", {})["overwrite"] = overwrite
+    if sync is not None:
+        config_dict.setdefault("download", {})["sync"] = sync
+    if upload_sync is not None:
+        config_dict.setdefault("upload", {})["sync"] = upload_sync
+    if streaming is not None:
+        config_dict.setdefault("download", {})["streaming"] = streaming
     if log_level is not None:
         config_dict.setdefault("logging", {})["level"] = log_level.upper()
         configure_logging(downloader.config.get_logging_config())
 
+    if not workflow_names and not downloader.config.get_workflow_config().get("workflows"):
+        raise click.UsageError("Specify --workflow or list workflows under workflow.workflows.")
+
     try:
+        if len(workflow_names) != 1:
+            downloader.run_many(
+                list(workflow_names) or None,
+                execute=execute,
+                wait_for_completion=wait_for_completion,
+                dry_run=dry_run,
+                skip_validation=skip_validation,
+                execution_timeout=execution_timeout,
+                polling_interval=polling_interval,
+                max_concurrent=max_concurrent_workflows,
+            )
+            return
         downloader.run(
-            workflow_name,
+            workflow_names[0],
             execute=execute,
             wait_for_completion=wait_for_completion,
             dry_run=dry_run,
@@ -72,5 +133,33 @@ def main(
         raise SystemExit(1) from exc
 
 
+@main.command("history")
+@click.option("--config", "-c", "config_path", required=True, type=click.Path(exists=True), help="Path to the YAML configuration file.")
+@click.option("--workflow", "workflow_names", multiple=True, help="Workflow to analyse; defaults to every recorded workflow.")
+@click.option("--limit", type=int, default=20, show_default=True, help="Number of recent runs to analyse.")
+@click.option("--baseline", "baseline_runs", type=int, default=10, show_default=True, help="Runs before the latest used as the regression baseline.")
+@click.option("--threshold", type=float, default=1.25, show_default=True, help="Slowdown ratio reported as a regression.")
+def history(
+    config_path: str,
+    workflow_names: Tuple[str, ...],
+    limit: int,
+    baseline_runs: int,
+    threshold: float,
+) -> None:
+    """Show duration trends, job percentiles, regressions and critical paths."""
+    config = ConfigManager(config_path)
+    config.load()
+    store = RunHistory.from_config(config)
+    if store is None:
+        raise click.ClickException("Run history is disabled (history.enabled: false).")
+    if not store.path.exists():
+        raise click.ClickException(f"No run history found at {store.path}.")
+
+    for index, workflow_name in enumerate(workflow_names or store.workflow_names()):
+        if index:
+            click.echo("")
+        click.echo("\n".join(format_history(store, workflow_name, limit, baseline_runs, threshold)))
+
+
 if __name__ == "__main__":
     main()
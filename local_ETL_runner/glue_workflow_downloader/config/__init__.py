@@ -1,5 +1,6 @@
 """Configuration utilities for the Glue Workflow Downloader."""
 
-from .config_manager import ConfigManager, LayerConfig
+from .config_manager import ConfigManager, LayerConfig, ShardingConfig
+from .pattern_matcher import LayerMatcher
 
-__all__ = ["ConfigManager", "LayerConfig"]
+__all__ = ["ConfigManager", "LayerConfig", "LayerMatcher", "ShardingConfig"]
@@ -11,6 +11,17 @@ import re
 import yaml
 
 from ..exceptions import ConfigurationError, ValidationError
+from .pattern_matcher import LayerMatcher
+
+
+@dataclass
+class ShardingConfig:
+    """Describes how a layer's prefix is split into shards that are listed in parallel."""
+
+    mode: str = "delimiter"
+    delimiter: str = "/"
+    boundaries: List[str] = field(default_factory=list)
+    max_workers: int = 8
 
 
 @dataclass
@@ -30,30 +41,33 @@ class LayerConfig:
     clear_destination_before_upload: bool = False
     allowed_formats: List[str] = field(default_factory=list)
     extract_zip_on_download: bool = False
+    sharding: Optional[ShardingConfig] = None
+    pattern_pushdown: bool = False
+    produced_by: List[str] = field(default_factory=list)
+    matcher: LayerMatcher = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.matcher = LayerMatcher(self.file_patterns, self.allowed_formats)
 
     def get_s3_path(self) -> str:
         """Return the fully qualified S3 path for the layer."""
         return f"s3://{self.s3_bucket}/{self.s3_prefix}".rstrip("/") + "/"
 
+    def match(self, filename: str) -> Optional[str]:
+        """Return the matching pattern if the filename passes pattern and format checks."""
+        return self.matcher.match(filename)
+
     def matches_filename(self, filename: str) -> bool:
         """Return True if the filename matches any configured pattern."""
-        if self.get_matched_pattern(filename) is None:
-            return False
-        return self.matches_format(filename)
+        return self.matcher.match(filename) is not None
 
     def get_matched_pattern(self, filename: str) -> Optional[str]:
         """Return the pattern that matches the filename, if any."""
-        for pattern in self.file_patterns:
-            if re.match(pattern, filename):
-                return pattern
-        return None
+        return self.matcher.match_pattern(filename)
 
     def matches_format(self, filename: str) -> bool:
         """Return True if the filename extension is allowed for this layer."""
-        if not self.allowed_formats:
-            return True
-        suffix = Path(filename).suffix.lower().lstrip(".")
-        return suffix in self.allowed_formats
+        return self.matcher.matches_format(filename)
 
     def validate_file_count(self, file_count: int) -> bool:
         """Return True if the file_count falls within the configured bounds."""
@@ -100,8 +114,24 @@ class ConfigManager:
             raise ValidationError("AWS region must be specified under aws.region.")
 
         workflow_cfg = self.config.get("workflow", {})
-        if not isinstance(workflow_cfg, dict) or not workflow_cfg.get("name"):
+        if not isinstance(workflow_cfg, dict):
+            raise ValidationError("Workflow name must be specified under workflow.name.")
+        self._validate_workflow_targets(workflow_cfg.get("workflows"))
+        if not workflow_cfg.get("name") and not workflow_cfg.get("workflows"):
             raise ValidationError("Workflow name must be specified under workflow.name.")
+        max_concurrent = workflow_cfg.get("max_concurrent_workflows")
+        if max_concurrent is not None and (
+            isinstance(max_concurrent, bool) or not isinstance(max_concurrent, int) or max_concurrent <= 0
+        ):
+            raise ValidationError("workflow.max_concurrent_workflows must be a positive integer if specified.")
+        if not isinstance(workflow_cfg.get("adaptive_polling", True), bool):
+            raise ValidationError("workflow.adaptive_polling must be boolean if specified.")
+        for key in ("min_polling_interval", "polling_history_runs"):
+            value = workflow_cfg.get(key)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise ValidationError(f"workflow.{key} must be a positive number if specified.")
+
+        self._validate_readiness(workflow_cfg.get("readiness"))
 
         layers_cfg = self.config.get("layers")
         if not isinstance(layers_cfg, list) or not layers_cfg:
@@ -184,8 +214,176 @@ class ConfigManager:
                     f"Layer '{layer['name']}' extract_zip_on_download must be boolean if specified."
                 )
 
+            pushdown_flag = layer.get("pattern_pushdown", False)
+            if not isinstance(pushdown_flag, bool):
+                raise ValidationError(
+                    f"Layer '{layer['name']}' pattern_pushdown must be boolean if specified."
+                )
+
+            produced_by = layer.get("produced_by")
+            if produced_by is not None:
+                names = [produced_by] if isinstance(produced_by, str) else produced_by
+                if not isinstance(names, list) or not names or not all(
+                    isinstance(name, str) and name for name in names
+                ):
+                    raise ValidationError(
+                        f"Layer '{layer['name']}' produced_by must be a node name or a list of node names."
+                    )
+                if pre_flag:
+                    raise ValidationError(
+                        f"Layer '{layer['name']}' produced_by cannot be combined with download_before_execution."
+                    )
+
+            sharding = layer.get("sharded_listing")
+            if sharding is not None:
+                self._validate_sharding(layer["name"], sharding)
+
+        download_cfg = self.config.get("download", {})
+        if not isinstance(download_cfg, dict):
+            raise ValidationError("download section must be a mapping if specified.")
+        for key in ("sync", "resume", "streaming", "columnar", "adaptive_concurrency"):
+            if not isinstance(download_cfg.get(key, False), bool):
+                raise ValidationError(f"download.{key} must be boolean if specified.")
+        for key in (
+            "multipart_threshold_mb",
+            "part_size_mb",
+            "max_concurrency_per_file",
+            "stream_queue_size",
+            "listing_workers",
+            "max_bandwidth_mb_per_sec",
+            "adaptive_min_workers",
+            "adaptive_max_workers",
+        ):
+            value = download_cfg.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValidationError(f"download.{key} must be a positive number if specified.")
+
+        upload_cfg = self.config.get("upload", {})
+        if not isinstance(upload_cfg, dict):
+            raise ValidationError("upload section must be a mapping if specified.")
+        if not isinstance(upload_cfg.get("sync", False), bool):
+            raise ValidationError("upload.sync must be boolean if specified.")
+        delete_retries = upload_cfg.get("delete_retries")
+        if delete_retries is not None and (
+            isinstance(delete_retries, bool) or not isinstance(delete_retries, int) or delete_retries < 0
+        ):
+            raise ValidationError("upload.delete_retries must be a non-negative integer if specified.")
+        for key in (
+            "max_workers",
+            "multipart_threshold_mb",
+            "part_size_mb",
+            "max_concurrency_per_file",
+            "delete_workers",
+        ):
+            value = upload_cfg.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValidationError(f"upload.{key} must be a positive number if specified.")
+
+        report_cfg = self.config.get("report", {})
+        if not isinstance(report_cfg, dict):
+            raise ValidationError("report section must be a mapping if specified.")
+        if report_cfg.get("format", "json") not in ("json", "jsonl"):
+            raise ValidationError("report.format must be 'json' or 'jsonl'.")
+        if not isinstance(report_cfg.get("summary_only", False), bool):
+            raise ValidationError("report.summary_only must be boolean if specified.")
+        if report_cfg.get("manifest") not in (None, "csv", "parquet"):
+            raise ValidationError("report.manifest must be 'csv', 'parquet' or null.")
+
+        history_cfg = self.config.get("history", {})
+        if not isinstance(history_cfg, dict):
+            raise ValidationError("history section must be a mapping if specified.")
+        if not isinstance(history_cfg.get("enabled", True), bool):
+            raise ValidationError("history.enabled must be boolean if specified.")
+        if history_cfg.get("path") is not None and not isinstance(history_cfg["path"], str):
+            raise ValidationError("history.path must be a string if specified.")
+
         return True
 
+    @staticmethod
+    def _validate_workflow_targets(targets: Any) -> None:
+        if targets is None:
+            return
+        if not isinstance(targets, list):
+            raise ValidationError("workflow.workflows must be a list if specified.")
+        for index, target in enumerate(targets):
+            if isinstance(target, str) and target:
+                continue
+            if not isinstance(target, dict) or not isinstance(target.get("name"), str) or not target["name"]:
+                raise ValidationError(
+                    f"workflow.workflows entry at index {index} must be a name or a mapping with 'name'."
+                )
+            layer_names = target.get("layers")
+            if layer_names is not None and (
+                not isinstance(layer_names, list) or not all(isinstance(name, str) for name in layer_names)
+            ):
+                raise ValidationError(
+                    f"workflow.workflows entry '{target['name']}' layers must be a list of layer names."
+                )
+
+    @staticmethod
+    def _validate_readiness(readiness: Any) -> None:
+        if readiness is None:
+            return
+        if not isinstance(readiness, dict):
+            raise ValidationError("workflow.readiness must be a mapping if specified.")
+        for key in ("initial_interval", "max_interval", "backoff_multiplier", "full_rescan_every"):
+            value = readiness.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValidationError(f"workflow.readiness.{key} must be a positive number if specified.")
+        source = readiness.get("event_source")
+        if source is None:
+            return
+        if not isinstance(source, dict):
+            raise ValidationError("workflow.readiness.event_source must be a mapping if specified.")
+        source_type = source.get("type")
+        required = {"file": "path", "sqs": "queue_url"}.get(source_type)
+        if required is None:
+            raise ValidationError("workflow.readiness.event_source.type must be 'file' or 'sqs'.")
+        if not isinstance(source.get(required), str) or not source[required]:
+            raise ValidationError(
+                f"workflow.readiness.event_source.{required} is required for type '{source_type}'."
+            )
+
+    @staticmethod
+    def _validate_sharding(layer_name: str, sharding: Any) -> None:
+        if not isinstance(sharding, dict):
+            raise ValidationError(f"Layer '{layer_name}' sharded_listing must be a mapping if specified.")
+        mode = sharding.get("mode", "delimiter")
+        if mode not in ("delimiter", "ranges"):
+            raise ValidationError(
+                f"Layer '{layer_name}' sharded_listing.mode must be 'delimiter' or 'ranges'."
+            )
+        delimiter = sharding.get("delimiter", "/")
+        if not isinstance(delimiter, str) or not delimiter:
+            raise ValidationError(
+                f"Layer '{layer_name}' sharded_listing.delimiter must be a non-empty string."
+            )
+        max_workers = sharding.get("max_workers", 8)
+        if isinstance(max_workers, bool) or not isinstance(max_workers, int) or max_workers < 1:
+            raise ValidationError(
+                f"Layer '{layer_name}' sharded_listing.max_workers must be a positive integer."
+            )
+        if mode == "ranges":
+            boundaries = sharding.get("boundaries")
+            if (
+                not isinstance(boundaries, list)
+                or not boundaries
+                or not all(isinstance(value, str) and value for value in boundaries)
+            ):
+                raise ValidationError(
+                    f"Layer '{layer_name}' sharded_listing.boundaries must be a non-empty list of strings."
+                )
+            if any(left >= right for left, right in zip(boundaries, boundaries[1:])):
+                raise ValidationError(
+                    f"Layer '{layer_name}' sharded_listing.boundaries must be in ascending order."
+                )
+
     def get_layers(self) -> List[LayerConfig]:
         """Return the list of configured layers as LayerConfig instances."""
         if self._layers is None:
@@ -194,6 +392,15 @@ class ConfigManager:
             for layer in layers_cfg:
                 raw_formats = layer.get("file_formats") or []
                 allowed_formats = [fmt.strip().lower().lstrip(".") for fmt in raw_formats if fmt]
+                raw_sharding = layer.get("sharded_listing")
+                sharding = None
+                if raw_sharding is not None:
+                    sharding = ShardingConfig(
+                        mode=raw_sharding.get("mode", "delimiter"),
+                        delimiter=raw_sharding.get("delimiter", "/"),
+                        boundaries=list(raw_sharding.get("boundaries") or []),
+                        max_workers=int(raw_sharding.get("max_workers", 8)),
+                    )
                 layer_objects.append(
                     LayerConfig(
                         name=layer["name"],
@@ -215,12 +422,23 @@ class ConfigManager:
                         extract_zip_on_download=bool(
                             layer.get("extract_zip_on_download", False)
                         ),
+                        sharding=sharding,
+                        pattern_pushdown=bool(layer.get("pattern_pushdown", False)),
+                        produced_by=self._as_name_list(layer.get("produced_by")),
                     )
                 )
             self._layers = layer_objects
             self._layer_map = {layer.name: layer for layer in layer_objects}
         return list(self._layers)
 
+    @staticmethod
+    def _as_name_list(value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return list(value)
+
     def get_layer_by_name(self, name: str) -> Optional[LayerConfig]:
         """Return a single layer configuration by name, if present."""
         if self._layers is None:
@@ -248,9 +466,21 @@ class ConfigManager:
             "execution_timeout": 3600,
             "polling_interval": 30,
             "wait_for_completion": True,
+            "max_concurrent_workflows": 4,
+            "adaptive_polling": True,
+            "min_polling_interval": 5,
+            "polling_history_runs": 10,
+        }
+        readiness_defaults = {
+            "initial_interval": 1,
+            "max_interval": 30,
+            "backoff_multiplier": 2,
+            "full_rescan_every": 10,
+            "event_source": None,
         }
         workflow_cfg = self.config.get("workflow", {})
         merged = {**defaults, **workflow_cfg}
+        merged["readiness"] = {**readiness_defaults, **(workflow_cfg.get("readiness") or {})}
         return merged
 
     def get_download_config(self) -> Dict[str, Any]:
@@ -262,11 +492,62 @@ class ConfigManager:
             "max_workers": 5,
             "retry_count": 3,
             "retry_delay": 5,
+            "multipart_threshold_mb": 64,
+            "part_size_mb": 16,
+            "max_concurrency_per_file": 4,
+            "resume": True,
+            "sync": False,
+            "sync_manifest": None,
+            "streaming": False,
+            "stream_queue_size": 1000,
+            "listing_workers": 4,
+            "columnar": False,
+            "max_bandwidth_mb_per_sec": None,
+            "adaptive_concurrency": False,
+            "adaptive_min_workers": 1,
+            "adaptive_max_workers": None,
         }
         download_cfg = self.config.get("download", {})
         merged = {**defaults, **download_cfg}
         return merged
 
+    def get_upload_config(self) -> Dict[str, Any]:
+        """Return local-override upload configuration values with defaults."""
+        defaults = {
+            "max_workers": 8,
+            "multipart_threshold_mb": 64,
+            "part_size_mb": 16,
+            "max_concurrency_per_file": 4,
+            "sync": False,
+            "hash_index": None,
+            "delete_workers": 4,
+            "delete_retries": 3,
+        }
+        upload_cfg = self.config.get("upload", {})
+        merged = {**defaults, **upload_cfg}
+        return merged
+
+    def get_report_config(self) -> Dict[str, Any]:
+        """Return report-related configuration values with defaults."""
+        defaults = {
+            "format": "json",
+            "summary_only": False,
+            "manifest": None,
+        }
+        report_cfg = self.config.get("report", {})
+        merged = {**defaults, **report_cfg}
+        return merged
+
+    def get_history_config(self) -> Dict[str, Any]:
+        """Return run-history configuration values with defaults."""
+        defaults = {
+            "enabled": True,
+            "path": None,
+        }
+        history_cfg = self.config.get("history", {})
+        merged = {**defaults, **history_cfg}
+        return merged
+
     def get_logging_config(self) -> Dict[str, Any]:
         """Return logging configuration values with defaults."""
         defaults = {
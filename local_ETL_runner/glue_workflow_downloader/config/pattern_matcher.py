@@ -0,0 +1,71 @@
+"""Precompiled file name matching for layer configurations."""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Constructs that change meaning once several patterns share one compiled regex.
+_UNSHAREABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)")
+
+
+class LayerMatcher:
+    """Matches file names against a layer's patterns and allowed formats in one pass.
+
+    All patterns are combined into a single alternation of named groups, so one
+    ``match`` call both tests every pattern and reports which one matched first,
+    exactly like trying ``re.match`` on each pattern in order. Patterns that cannot
+    share a regex (back-references, global inline flags, clashing group names)
+    fall back to a list of individually compiled patterns.
+    """
+
+    def __init__(self, patterns: Sequence[str], allowed_formats: Iterable[str] = ()) -> None:
+        self.patterns = tuple(patterns)
+        self.allowed_formats = frozenset(allowed_formats)
+        self._combined: Optional[re.Pattern[str]] = None
+        self._group_index: Dict[str, int] = {}
+        self._compiled: List[re.Pattern[str]] = []
+
+        if not any(_UNSHAREABLE.search(pattern) for pattern in self.patterns):
+            try:
+                self._combined = re.compile(
+                    "|".join(f"(?P<_p{index}>{pattern})" for index, pattern in enumerate(self.patterns))
+                )
+                self._group_index = {f"_p{index}": index for index in range(len(self.patterns))}
+            except re.error:
+                self._combined = None
+        if self._combined is None:
+            self._compiled = [re.compile(pattern) for pattern in self.patterns]
+
+    def match_pattern(self, filename: str) -> Optional[str]:
+        """Return the first pattern that matches ``filename``, if any."""
+        if self._combined is not None:
+            found = self._combined.match(filename)
+            if found is None:
+                return None
+            return self.patterns[self._group_index[found.lastgroup]]
+        for index, compiled in enumerate(self._compiled):
+            if compiled.match(filename):
+                return self.patterns[index]
+        return None
+
+    def matches_format(self, filename: str) -> bool:
+        """Return True if the filename extension is allowed."""
+        if not self.allowed_formats:
+            return True
+        return file_suffix(filename) in self.allowed_formats
+
+    def match(self, filename: str) -> Optional[str]:
+        """Return the matching pattern if ``filename`` passes both pattern and format checks."""
+        pattern = self.match_pattern(filename)
+        if pattern is None or not self.matches_format(filename):
+            return None
+        return pattern
+
+
+def file_suffix(filename: str) -> str:
+    """Return the lower-cased extension without the dot, as ``Path(filename).suffix`` would."""
+    index = filename.rfind(".")
+    if index <= 0 or index == len(filename) - 1:
+        return ""
+    return filename[index + 1 :].lower()
@@ -1,5 +1,10 @@
 """Custom exception definitions for the Glue Workflow Downloader."""
 
+from typing import TYPE_CHECKING, Mapping, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - typing helper
+    from .workflow.workflow_executor import WorkflowRunResult
+
 
 class GlueWorkflowDownloaderError(Exception):
     """Base exception for the package."""
@@ -36,10 +41,18 @@ class WorkflowExecutionError(GlueWorkflowDownloaderError):
 class WorkflowTimeoutError(GlueWorkflowDownloaderError):
     """Raised when a workflow run does not finish within the timeout."""
 
+    def __init__(self, message: str, result: Optional["WorkflowRunResult"] = None) -> None:
+        super().__init__(message)
+        self.result = result  # WorkflowRunResult of the run so far, when known
+
 
 class WorkflowFailedError(GlueWorkflowDownloaderError):
     """Raised when a workflow run finishes with a failed status."""
 
+    def __init__(self, message: str, result: Optional["WorkflowRunResult"] = None) -> None:
+        super().__init__(message)
+        self.result = result  # WorkflowRunResult of the failed run, when known
+
 
 class DownloadError(GlueWorkflowDownloaderError):
     """Raised when downloading files fails."""
@@ -51,3 +64,12 @@ class S3AccessError(GlueWorkflowDownloaderError):
 
 class LocalOverrideError(GlueWorkflowDownloaderError):
     """Raised when processing local overrides fails."""
+
+
+class LayerCollectionError(GlueWorkflowDownloaderError):
+    """Raised when several layers fail during concurrent collection."""
+
+    def __init__(self, errors: Mapping[str, BaseException]) -> None:
+        self.errors = dict(errors)
+        details = "; ".join(f"{name}: {exc}" for name, exc in self.errors.items())
+        super().__init__(f"{len(self.errors)} layers failed: {details}")
@@ -3,23 +3,97 @@
 from __future__ import annotations
 
 import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
 from .config import ConfigManager, LayerConfig
-from .exceptions import ConfigurationError, GlueWorkflowDownloaderError, LocalOverrideError
+from .exceptions import (
+    ConfigurationError,
+    GlueWorkflowDownloaderError,
+    LocalOverrideError,
+    WorkflowFailedError,
+    WorkflowTimeoutError,
+)
 from .s3 import FileDownloader, S3FileCollector, S3FileInfo, S3Uploader
 from .s3.downloader import DownloadResult
+from .s3.uploader import DeleteStats
+from .s3.file_info import FileGroup, SpooledFileSet, total_size_mb
 from .utils import ProgressTracker, configure_logging
+from .utils.history import RunHistory
 from .utils.report import ReportGenerator
-from .workflow import WorkflowExecutor, WorkflowRunResult, WorkflowValidator
+from .utils.throttle import TokenBucket
+from .workflow import (
+    WorkflowExecutor,
+    WorkflowOrchestrator,
+    WorkflowOutcome,
+    WorkflowRunResult,
+    WorkflowTarget,
+    WorkflowValidator,
+)
+from .workflow.readiness import build_event_source
 
 LOGGER = logging.getLogger(__name__)
 
 
+class _EarlyLayerDownloads:
+    """Downloads post-execution layers once the graph nodes that produce them succeed.
+
+    Layers are handled one at a time on a background thread with their own
+    downloader, so transfers overlap with the rest of the workflow run.
+    """
+
+    def __init__(
+        self,
+        layers: List[LayerConfig],
+        collect: Callable[[List[LayerConfig]], Dict[str, FileGroup]],
+        downloader: FileDownloader,
+    ) -> None:
+        self.layers = layers
+        self.collect = collect
+        self.downloader = downloader
+        self.files: Dict[str, FileGroup] = {}
+        self.started: Set[str] = set()
+        self._waiting = {layer.name: set(layer.produced_by) for layer in layers}
+        self._results: List[DownloadResult] = []
+        self._futures: List[Future] = []
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="early-download")
+
+    @property
+    def watch_nodes(self) -> Set[str]:
+        return {node for layer in self.layers for node in layer.produced_by}
+
+    def on_node_succeeded(self, node_name: str) -> None:
+        for layer in self.layers:
+            waiting = self._waiting[layer.name]
+            waiting.discard(node_name)
+            if not waiting and layer.name not in self.started:
+                LOGGER.info("Node '%s' succeeded; downloading layer '%s' early", node_name, layer.name)
+                self.started.add(layer.name)
+                self._futures.append(self._pool.submit(self._download, layer))
+
+    def finish(self) -> Optional[DownloadResult]:
+        """Wait for early downloads, re-raising the first failure, and return their combined result."""
+        self._pool.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+        result: Optional[DownloadResult] = None
+        for layer_result in self._results:
+            result = GlueWorkflowDownloader._merge_download_results(result, layer_result)
+        return result
+
+    def _download(self, layer: LayerConfig) -> None:
+        files = self.collect([layer])
+        self.files.update(files)
+        self._results.append(self.downloader.download_files(files))
+
+
 class GlueWorkflowDownloader:
     """Coordinates the workflow execution and S3 download process."""
 
@@ -35,13 +109,18 @@ class GlueWorkflowDownloader:
         self.glue_client = self.session.client("glue")
         self.s3_client = self.session.client("s3")
 
-        self.workflow_validator = WorkflowValidator(self.glue_client, self.s3_client, self.config)
+        self.workflow_validator = WorkflowValidator(
+            self.glue_client,
+            self.s3_client,
+            self.config,
+            event_source=build_event_source(self.config.get_workflow_config()["readiness"], self.session),
+        )
         self.workflow_executor = WorkflowExecutor(self.glue_client, self.config)
         self.file_collector = S3FileCollector(self.s3_client, self.config)
         self.progress_tracker = ProgressTracker()
         self.downloader = FileDownloader(self.s3_client, self.config, self.progress_tracker)
         self.report_generator = ReportGenerator()
-        self.uploader = S3Uploader(self.s3_client)
+        self.uploader = S3Uploader(self.s3_client, self.config)
 
     def run(
         self,
@@ -64,10 +143,17 @@ class GlueWorkflowDownloader:
 
         if dry_run:
             should_execute = False
+        streaming = bool(self.config.get_download_config().get("streaming")) and not dry_run
+
+        # One bandwidth budget shared by override uploads and downloads of this run.
+        bandwidth = TokenBucket.from_config(self.config.get_download_config())
+        self.downloader.bandwidth = bandwidth
+        self.uploader.bandwidth = bandwidth
 
         LOGGER.info("Starting download process for workflow '%s'", workflow_name)
 
         local_override_layers = [layer for layer in layers if layer.local_override_path]
+        self.uploader.delete_stats = DeleteStats()
         if local_override_layers:
             self._upload_local_overrides(local_override_layers, dry_run)
 
@@ -78,10 +164,13 @@ class GlueWorkflowDownloader:
         pre_layers = [layer for layer in layers if layer.download_before_execution]
         post_layers = [layer for layer in layers if not layer.download_before_execution]
 
-        pre_files: Dict[str, List[S3FileInfo]] = {}
+        pre_files: Dict[str, FileGroup] = {}
         pre_result: Optional[DownloadResult] = None
 
-        if pre_layers:
+        if pre_layers and streaming:
+            LOGGER.info("Streaming pre-execution files for %s layers prior to workflow run", len(pre_layers))
+            pre_result, pre_files = self._stream_files(pre_layers)
+        elif pre_layers:
             LOGGER.info("Collecting pre-execution files for %s layers", len(pre_layers))
             pre_files = self._collect_files(pre_layers)
             if dry_run:
@@ -90,17 +179,51 @@ class GlueWorkflowDownloader:
                 LOGGER.info("Downloading pre-execution files prior to workflow run")
                 pre_result = self._download_files(pre_files)
 
-        workflow_result: Optional[WorkflowRunResult] = None
-        if should_execute:
-            workflow_result = self._execute_workflow(
-                workflow_name,
-                wait_for_completion=should_wait,
-                timeout=timeout,
-                polling_interval=interval,
+        early: Optional[_EarlyLayerDownloads] = None
+        early_layers = [layer for layer in post_layers if layer.produced_by]
+        if should_execute and should_wait and early_layers:
+            early = _EarlyLayerDownloads(
+                early_layers,
+                self._collect_files,
+                FileDownloader(
+                    self.s3_client,
+                    self.config,
+                    ProgressTracker("Downloading early layers"),
+                    bandwidth=bandwidth,
+                ),
             )
 
-        post_files: Dict[str, List[S3FileInfo]] = {}
-        if post_layers:
+        workflow_result: Optional[WorkflowRunResult] = None
+        early_result: Optional[DownloadResult] = None
+        if should_execute:
+            try:
+                workflow_result = self._execute_workflow(
+                    workflow_name,
+                    wait_for_completion=should_wait,
+                    timeout=timeout,
+                    polling_interval=interval,
+                    early=early,
+                )
+            except (WorkflowFailedError, WorkflowTimeoutError) as exc:
+                # Failed and timed-out runs are the ones the regression view most needs.
+                self._record_history(workflow_name, exc.result, pre_result)
+                self._finish_after_failure(early)
+                raise
+            except BaseException:
+                self._finish_after_failure(early)
+                raise
+            if early is not None:
+                early_result = early.finish()
+                post_layers = [layer for layer in post_layers if layer.name not in early.started]
+                pre_files = self._merge_file_maps(pre_files, early.files)
+                pre_result = self._merge_download_results(pre_result, early_result)
+
+        post_files: Dict[str, FileGroup] = {}
+        post_result: Optional[DownloadResult] = None
+        if post_layers and streaming:
+            LOGGER.info("Streaming post-execution files for %s layers", len(post_layers))
+            post_result, post_files = self._stream_files(post_layers)
+        elif post_layers:
             LOGGER.info("Collecting post-execution files for %s layers", len(post_layers))
             post_files = self._collect_files(post_layers)
 
@@ -109,9 +232,13 @@ class GlueWorkflowDownloader:
         if dry_run:
             return self._generate_dry_run_result(all_files, workflow_result)
 
-        post_result = self._download_files(post_files)
+        if not streaming:
+            post_result = self._download_files(post_files)
         result = self._merge_download_results(pre_result, post_result)
+        result.deleted_objects = self.uploader.delete_stats.deleted
+        result.delete_duration_seconds = self.uploader.delete_stats.duration_seconds
         self._generate_report(result, workflow_result, all_files)
+        self._record_history(workflow_name, workflow_result, result)
         LOGGER.info(
             "Download finished. Success=%s, Failed=%s, Skipped=%s",
             result.successful,
@@ -120,23 +247,186 @@ class GlueWorkflowDownloader:
         )
         return result
 
+    def run_many(
+        self,
+        workflows: Optional[Sequence[Union[str, WorkflowTarget]]] = None,
+        *,
+        execute: Optional[bool] = None,
+        wait_for_completion: Optional[bool] = None,
+        dry_run: bool = False,
+        skip_validation: bool = False,
+        execution_timeout: Optional[int] = None,
+        polling_interval: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ) -> Dict[str, DownloadResult]:
+        """Run several workflows concurrently, downloading each one's layers as it finishes.
+
+        Overrides, validation and pre-execution downloads happen once for the batch.
+        Each target's post-execution layers are listed and downloaded as soon as its
+        run completes while the remaining runs keep being polled; without waiting,
+        every run is started and its layers are downloaded straight away, as in
+        ``run``. ``workflows`` defaults to ``workflow.workflows`` in the configuration.
+        """
+        workflow_config = self.config.get_workflow_config()
+        if workflows is None:
+            workflows = workflow_config.get("workflows") or []
+        targets = [
+            target if isinstance(target, WorkflowTarget) else WorkflowTarget.from_entry(target)
+            for target in workflows
+        ]
+        if not targets:
+            raise ConfigurationError("No workflows specified under workflow.workflows or on the command line.")
+
+        layers = self.config.get_layers()
+        layer_names = {layer.name for layer in layers}
+        for target in targets:
+            unknown = sorted(set(target.layers or []) - layer_names)
+            if unknown:
+                raise ConfigurationError(f"Workflow '{target.name}' refers to unknown layers: {', '.join(unknown)}")
+
+        should_execute = workflow_config["execute"] if execute is None else bool(execute)
+        should_wait = workflow_config["wait_for_completion"] if wait_for_completion is None else bool(wait_for_completion)
+        if dry_run:
+            should_execute = False
+        timeout = execution_timeout or int(workflow_config["execution_timeout"])
+        interval = polling_interval or int(workflow_config["polling_interval"])
+        concurrency = max_concurrent or int(workflow_config["max_concurrent_workflows"])
+
+        bandwidth = TokenBucket.from_config(self.config.get_download_config())
+        self.downloader.bandwidth = bandwidth
+        self.uploader.bandwidth = bandwidth
+
+        LOGGER.info("Starting %s workflows with up to %s running at once", len(targets), concurrency)
+
+        local_override_layers = [layer for layer in layers if layer.local_override_path]
+        self.uploader.delete_stats = DeleteStats()
+        if local_override_layers:
+            self._upload_local_overrides(local_override_layers, dry_run)
+
+        if not skip_validation and workflow_config.get("validate_before_run", True):
+            for target in targets:
+                self._validate_workflow(target.name)
+            self._check_initial_layer()
+
+        # Layers fetched before execution are shared by every workflow in the batch.
+        pre_layers = [layer for layer in layers if layer.download_before_execution]
+        pre_files: Dict[str, FileGroup] = {}
+        pre_result: Optional[DownloadResult] = None
+        if pre_layers:
+            LOGGER.info("Collecting shared pre-execution files for %s layers", len(pre_layers))
+            pre_files = self._collect_files(pre_layers)
+            if not dry_run:
+                pre_result = self._download_files(pre_files)
+
+        post_layers = [layer for layer in layers if not layer.download_before_execution]
+        layer_locks = {layer.name: threading.Lock() for layer in post_layers}
+        manifest_lock = threading.Lock()
+        # Without a run in progress nothing writes to the layers, so targets sharing a
+        # layer reuse its listing; otherwise each completion must list afresh.
+        listings: Dict[str, FileGroup] = {}
+        results: Dict[str, DownloadResult] = {}
+        futures: List[Future] = []
+
+        def download_outputs(target: WorkflowTarget, workflow_result: Optional[WorkflowRunResult]) -> None:
+            wanted = [layer for layer in post_layers if target.layers is None or layer.name in target.layers]
+            # Downloads of the same layer (and of the shared sync manifest) must not overlap.
+            with ExitStack() as stack:
+                if self.config.get_download_config().get("sync"):
+                    stack.enter_context(manifest_lock)
+                for layer in sorted(wanted, key=lambda item: item.name):
+                    stack.enter_context(layer_locks[layer.name])
+                if should_execute:
+                    files = self._collect_files(wanted)
+                else:
+                    missing = [layer for layer in wanted if layer.name not in listings]
+                    if missing:
+                        listings.update(self._collect_files(missing))
+                    files = {layer.name: listings[layer.name] for layer in wanted}
+                all_files = self._merge_file_maps(pre_files, files)
+                if dry_run:
+                    result = self._generate_dry_run_result(all_files, workflow_result, report_suffix=target.name)
+                else:
+                    downloader = FileDownloader(
+                        self.s3_client,
+                        self.config,
+                        ProgressTracker(f"Downloading {target.name}"),
+                        bandwidth=bandwidth,
+                    )
+                    result = self._merge_download_results(pre_result, downloader.download_files(files))
+                    result.deleted_objects = self.uploader.delete_stats.deleted
+                    result.delete_duration_seconds = self.uploader.delete_stats.duration_seconds
+                    self._generate_report(result, workflow_result, all_files, report_suffix=target.name)
+                    self._record_history(target.name, workflow_result, result)
+            results[target.name] = result
+            LOGGER.info(
+                "Downloads for workflow '%s' finished. Success=%s, Failed=%s, Skipped=%s",
+                target.name,
+                result.successful,
+                result.failed,
+                result.skipped,
+            )
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+
+            def on_complete(outcome: WorkflowOutcome) -> None:
+                if outcome.is_successful():
+                    futures.append(pool.submit(download_outputs, outcome.target, outcome.result))
+                elif isinstance(outcome.error, (WorkflowFailedError, WorkflowTimeoutError)):
+                    self._record_history(outcome.target.name, outcome.error.result, pre_result)
+
+            if should_execute and should_wait:
+                orchestrator = WorkflowOrchestrator(
+                    self.workflow_executor,
+                    max_concurrent=concurrency,
+                    timeout=timeout,
+                    polling_interval=interval,
+                )
+                outcomes = orchestrator.run(targets, on_complete)
+            elif should_execute:
+                outcomes = []
+                for target in targets:
+                    outcome = WorkflowOutcome(target)
+                    try:
+                        self._execute_workflow(
+                            target.name, wait_for_completion=False, timeout=timeout, polling_interval=interval
+                        )
+                    except GlueWorkflowDownloaderError as exc:
+                        LOGGER.error("Workflow '%s' could not be started: %s", target.name, exc)
+                        outcome.error = exc
+                    outcomes.append(outcome)
+                    on_complete(outcome)
+            else:
+                outcomes = [WorkflowOutcome(target) for target in targets]
+                for outcome in outcomes:
+                    on_complete(outcome)
+            errors = [future.exception() for future in futures]
+
+        failed = [outcome for outcome in outcomes if not outcome.is_successful()]
+        download_errors = [error for error in errors if error is not None]
+        if download_errors:
+            raise download_errors[0]
+        if failed:
+            names = ", ".join(outcome.target.name for outcome in failed)
+            raise WorkflowFailedError(f"{len(failed)} of {len(targets)} workflows failed: {names}") from failed[0].error
+        return results
+
     def _generate_dry_run_result(
         self,
-        files: Dict[str, List[S3FileInfo]],
+        files: Mapping[str, FileGroup],
         workflow_result: Optional[WorkflowRunResult],
+        report_suffix: Optional[str] = None,
     ) -> DownloadResult:
         total_files = sum(len(layer_files) for layer_files in files.values())
-        total_size_mb = sum(file_info.get_size_mb() for layer_files in files.values() for file_info in layer_files)
         result = DownloadResult(
             total_files=total_files,
             successful=0,
             failed=0,
             skipped=total_files,
-            total_size_mb=total_size_mb,
+            total_size_mb=sum(total_size_mb(layer_files) for layer_files in files.values()),
             duration_seconds=0.0,
             failed_files=[],
         )
-        self._generate_report(result, workflow_result, files)
+        self._generate_report(result, workflow_result, files, report_suffix=report_suffix)
         LOGGER.info("Dry run completed. Files detected: %s", total_files)
         return result
 
@@ -157,6 +447,7 @@ class GlueWorkflowDownloader:
         wait_for_completion: bool,
         timeout: int,
         polling_interval: int,
+        early: Optional[_EarlyLayerDownloads] = None,
     ) -> Optional[WorkflowRunResult]:
         LOGGER.info("Triggering workflow '%s'", workflow_name)
         run_id = self.workflow_executor.execute_workflow(workflow_name)
@@ -167,28 +458,68 @@ class GlueWorkflowDownloader:
 
         try:
             result = self.workflow_executor.wait_for_completion(
-                workflow_name, run_id, timeout=timeout, polling_interval=polling_interval
+                workflow_name,
+                run_id,
+                timeout=timeout,
+                polling_interval=polling_interval,
+                watch_nodes=early.watch_nodes if early is not None else (),
+                on_node_succeeded=early.on_node_succeeded if early is not None else None,
             )
             LOGGER.info("Workflow '%s' completed successfully", workflow_name)
             return result
         except GlueWorkflowDownloaderError as exc:
             LOGGER.error("Workflow '%s' failed: %s", workflow_name, exc)
+            if isinstance(exc, WorkflowTimeoutError) and exc.result is None:
+                exc.result = self.workflow_executor.timeout_result(workflow_name, run_id)
             raise
 
-    def _collect_files(self, layers: Optional[List[LayerConfig]] = None) -> Dict[str, List[S3FileInfo]]:
+    @staticmethod
+    def _finish_after_failure(early: Optional[_EarlyLayerDownloads]) -> None:
+        """Wait for early downloads while the workflow is failing, without masking its error."""
+        if early is None:
+            return
+        try:
+            early.finish()
+        except Exception as exc:  # the workflow error is the one to report
+            LOGGER.error("Early layer downloads failed as well: %s", exc)
+
+    def _collect_files(self, layers: Optional[List[LayerConfig]] = None) -> Dict[str, FileGroup]:
         if layers is None:
             target_layers = self.config.get_layers()
         else:
             target_layers = layers
         LOGGER.info("Collecting files from S3 for %s layers", len(target_layers))
+        if self._use_columnar():
+            return self.file_collector.collect_layer_sets(target_layers)
         if layers is None:
             return self.file_collector.collect_all_layers()
         return self.file_collector.collect_layers(target_layers)
 
-    def _download_files(self, files: Dict[str, List[S3FileInfo]]) -> DownloadResult:
+    def _use_columnar(self) -> bool:
+        return bool(self.config.get_download_config().get("columnar"))
+
+    def _download_files(self, files: Mapping[str, FileGroup]) -> DownloadResult:
         LOGGER.info("Starting downloads for %s layers", len(files))
         return self.downloader.download_files(files)
 
+    def _stream_files(
+        self, layers: List[LayerConfig]
+    ) -> Tuple[DownloadResult, Dict[str, FileGroup]]:
+        # The report still lists every file, but streamed files are spooled to disk
+        # so memory does not grow with the size of the listing.
+        files = {layer.name: SpooledFileSet(layer.s3_bucket, layer.name) for layer in layers}
+
+        def on_file(file_info: S3FileInfo) -> None:
+            files[file_info.layer_name].add(file_info)
+
+        LOGGER.info("Listing and downloading files for %s layers concurrently", len(layers))
+        result = self.downloader.download_stream(
+            self.file_collector.stream_layers(layers),
+            layer_names=list(files),
+            on_file=on_file,
+        )
+        return result, files
+
     def _upload_local_overrides(self, layers: List[LayerConfig], dry_run: bool) -> None:
         if not layers:
             return
@@ -213,11 +544,15 @@ class GlueWorkflowDownloader:
             )
 
     @staticmethod
-    def _merge_file_maps(*file_maps: Dict[str, List[S3FileInfo]]) -> Dict[str, List[S3FileInfo]]:
-        merged: Dict[str, List[S3FileInfo]] = {}
+    def _merge_file_maps(*file_maps: Mapping[str, FileGroup]) -> Dict[str, FileGroup]:
+        merged: Dict[str, FileGroup] = {}
         for mapping in file_maps:
             for layer_name, file_infos in mapping.items():
-                merged.setdefault(layer_name, []).extend(file_infos)
+                existing = merged.get(layer_name)
+                if existing is None:
+                    merged[layer_name] = file_infos  # keep FileSets columnar
+                else:
+                    merged[layer_name] = [*existing, *file_infos]
         return merged
 
     @staticmethod
@@ -230,21 +565,30 @@ class GlueWorkflowDownloader:
             return second if second is not None else DownloadResult(0, 0, 0, 0, 0.0, 0.0, [])
         if second is None:
             return first
+        duration_seconds = first.duration_seconds + second.duration_seconds
+        bytes_transferred = first.bytes_transferred + second.bytes_transferred
         return DownloadResult(
             total_files=first.total_files + second.total_files,
             successful=first.successful + second.successful,
             failed=first.failed + second.failed,
             skipped=first.skipped + second.skipped,
             total_size_mb=first.total_size_mb + second.total_size_mb,
-            duration_seconds=first.duration_seconds + second.duration_seconds,
+            duration_seconds=duration_seconds,
             failed_files=list(first.failed_files) + list(second.failed_files),
+            stale_files=list(first.stale_files) + list(second.stale_files),
+            bytes_transferred=bytes_transferred,
+            throughput_mb_per_sec=(
+                bytes_transferred / duration_seconds / (1024 * 1024) if duration_seconds > 0 else 0.0
+            ),
+            layer_stats={**first.layer_stats, **second.layer_stats},
         )
 
     def _generate_report(
         self,
         result: DownloadResult,
         workflow_result: Optional[WorkflowRunResult],
-        files: Dict[str, List[S3FileInfo]],
+        files: Mapping[str, FileGroup],
+        report_suffix: Optional[str] = None,
     ) -> None:
         try:
             self.report_generator.generate(
@@ -253,10 +597,25 @@ class GlueWorkflowDownloader:
                 self.config,
                 files,
                 str(self.config_path),
+                name_suffix=report_suffix,
             )
         except OSError as exc:
             LOGGER.warning("Failed to generate report: %s", exc)
 
+    def _record_history(
+        self,
+        workflow_name: str,
+        workflow_result: Optional[WorkflowRunResult],
+        result: DownloadResult,
+    ) -> None:
+        history = RunHistory.from_config(self.config)
+        if history is None:
+            return
+        try:
+            history.record(workflow_name, workflow_result, result)
+        except (OSError, sqlite3.Error) as exc:
+            LOGGER.warning("Failed to record run history: %s", exc)
+
     @staticmethod
     def _create_session(aws_config: Dict[str, str]) -> boto3.session.Session:
         try:
@@ -1,14 +1,14 @@
 """S3 integration helpers."""
 
-from .file_collector import S3FileCollector, S3FileInfo
-from .file_matcher import FileMatcher
+from .file_collector import S3FileCollector
+from .file_info import FileSet, S3FileInfo
 from .downloader import FileDownloader, DownloadResult
 from .uploader import S3Uploader
 
 __all__ = [
     "S3FileCollector",
     "S3FileInfo",
-    "FileMatcher",
+    "FileSet",
     "FileDownloader",
     "DownloadResult",
     "S3Uploader",
@@ -2,20 +2,38 @@
 
 from __future__ import annotations
 
+import logging
+import queue
 import shutil
+import threading
 import time
 import zipfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
-from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
 
 from ..config import ConfigManager, LayerConfig
 from ..exceptions import DownloadError, S3AccessError
-from ..utils.progress import ProgressTracker
-from .file_collector import S3FileInfo
+from ..utils.progress import LayerTransferStats, ProgressTracker
+from ..utils.throttle import TokenBucket
+from .file_info import FileGroup, S3FileInfo, total_size
+from .sync_manifest import SyncManifest
+from .transfer import (
+    AdaptiveConcurrency,
+    RangedDownloader,
+    TransferSlots,
+    is_precondition_failed,
+    is_throttle_error,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
 
 
 @dataclass
@@ -29,6 +47,12 @@ class DownloadResult:
     total_size_mb: float
     duration_seconds: float
     failed_files: List[Tuple[S3FileInfo, str]]
+    stale_files: List[str] = field(default_factory=list)
+    bytes_transferred: int = 0
+    throughput_mb_per_sec: float = 0.0
+    layer_stats: Dict[str, LayerTransferStats] = field(default_factory=dict)
+    deleted_objects: int = 0
+    delete_duration_seconds: float = 0.0
 
     def get_success_rate(self) -> float:
         if self.total_files == 0:
@@ -36,91 +60,371 @@ class DownloadResult:
         return (self.successful / self.total_files) * 100
 
 
+class _DownloadTally:
+    """Thread-safe counters for the outcome of each download task."""
+
+    def __init__(self, progress_tracker: ProgressTracker) -> None:
+        self.progress_tracker = progress_tracker
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.failed_files: List[Tuple[S3FileInfo, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, file_info: S3FileInfo, status: str, progress: Optional["_FileProgress"] = None) -> None:
+        """Record a task status; anything other than success/skipped is a failure message."""
+        layer_name = file_info.layer_name
+        transferred = progress.transferred if progress is not None else 0
+        with self._lock:
+            if status == "skipped":
+                self.skipped += 1
+                self.progress_tracker.skip(layer_name, file_info.size, transferred)
+            elif status == "success":
+                self.successful += 1
+                self.progress_tracker.advance(
+                    layer_name,
+                    file_info.size,
+                    transferred,
+                    progress.seconds if progress is not None else None,
+                )
+            else:
+                self.failed += 1
+                self.failed_files.append((file_info, status))
+                self.progress_tracker.fail(layer_name, file_info.size, transferred)
+
+
+class _FileProgress:
+    """Byte callback for a single object that forwards chunks to the shared sink.
+
+    A failed attempt's bytes are taken back with ``rewind`` before the file is
+    retried; ranges the retry resumes from its checkpoint are counted again.
+    """
+
+    __slots__ = ("layer_name", "transferred", "seconds", "_sink", "_tracker", "_rewound")
+
+    def __init__(
+        self, sink: Callable[[int, Optional[str]], None], layer_name: str, tracker: ProgressTracker
+    ) -> None:
+        self.layer_name = layer_name
+        self.transferred = 0
+        self.seconds: Optional[float] = None
+        self._sink = sink
+        self._tracker = tracker
+        self._rewound = 0
+
+    def __call__(self, amount: int) -> None:
+        self.transferred += amount
+        self._sink(amount, self.layer_name)
+
+    def rewind(self) -> None:
+        """Forget the bytes of an attempt that failed."""
+        if self.transferred:
+            self._tracker.discard_bytes(self.transferred, self.layer_name)
+            self._rewound += self.transferred
+            self.transferred = 0
+
+    def resumed(self, amount: int) -> None:
+        """Count again bytes restored from a checkpoint, up to what was rewound."""
+        amount = min(amount, self._rewound)
+        if amount:
+            self._rewound -= amount
+            self.transferred += amount
+            self._tracker.add_bytes(amount, self.layer_name)
+
+
 class FileDownloader:
     """Handles downloading S3 objects to local storage."""
 
-    def __init__(self, s3_client, config: ConfigManager, progress_tracker: ProgressTracker):
+    def __init__(
+        self,
+        s3_client,
+        config: ConfigManager,
+        progress_tracker: ProgressTracker,
+        bandwidth: Optional[TokenBucket] = None,
+    ):
         self.s3_client = s3_client
         self.config = config
         self.progress_tracker = progress_tracker
+        self.bandwidth = bandwidth
+        self._bandwidth: Optional[TokenBucket] = None
+        self._slots: Optional[TransferSlots] = None
+        self._adaptive: Optional[AdaptiveConcurrency] = None
+        self._ranged_downloader: Optional[RangedDownloader] = None
+        self._multipart_threshold = 0
+        self._manifest: Optional[SyncManifest] = None
 
-    def download_files(self, files: Dict[str, List[S3FileInfo]]) -> DownloadResult:
-        """Download all files grouped by layer."""
-        tasks: List[Tuple[S3FileInfo, str, LayerConfig]] = []
-        for file_infos in files.values():
-            for file_info in file_infos:
-                local_path = self._get_local_path(file_info)
-                layer = self.config.get_layer_by_name(file_info.layer_name)
-                if layer is None:
-                    raise DownloadError(
-                        f"Unknown layer '{file_info.layer_name}' encountered during download."
-                    )
-                tasks.append((file_info, local_path, layer))
+    def download_files(self, files: Mapping[str, FileGroup]) -> DownloadResult:
+        """Download all files grouped by layer.
+
+        Each layer may be a list of S3FileInfo or a columnar FileSet. Tasks are
+        built lazily and at most a few per worker are in flight, so the number of
+        live task objects does not grow with the number of files.
+        """
+        download_cfg = self.config.get_download_config()
+        stale_files: List[str] = []
+        if download_cfg.get("sync"):
+            self._manifest = SyncManifest(self._get_manifest_path(download_cfg))
+            self._manifest.load()
+            stale_files = self._find_stale_files(
+                files.keys(),
+                (file_info.get_s3_uri() for file_infos in files.values() for file_info in file_infos),
+            )
 
-        total_files = len(tasks)
-        total_size_mb = sum(file_info.get_size_mb() for file_info, _, _ in tasks)
+        total_files = sum(len(file_infos) for file_infos in files.values())
+        layer_bytes = {name: total_size(file_infos) for name, file_infos in files.items()}
+        total_bytes = sum(layer_bytes.values())
         if total_files == 0:
-            return DownloadResult(0, 0, 0, 0, 0.0, 0.0, [])
+            self._save_manifest()
+            return DownloadResult(0, 0, 0, 0, 0.0, 0.0, [], stale_files=stale_files)
 
-        download_cfg = self.config.get_download_config()
         retry_count = int(download_cfg.get("retry_count", 3))
         retry_delay = float(download_cfg.get("retry_delay", 5))
-        max_workers = max(int(download_cfg.get("max_workers", 5)), 1)
-
-        successes = 0
-        failures = 0
-        skipped = 0
-        failed_files: List[Tuple[S3FileInfo, str]] = []
+        max_workers = self._pool_size(download_cfg)
 
+        tally = _DownloadTally(self.progress_tracker)
         start_time = time.time()
-        self.progress_tracker.start(total_files)
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_map = {
-                executor.submit(
-                    self._download_with_retry,
-                    file_info,
-                    local_path,
-                    layer,
-                    retry_count,
-                    retry_delay,
-                ): (file_info, local_path)
-                for file_info, local_path, layer in tasks
-            }
-            for future in as_completed(future_map):
-                file_info, _ = future_map[future]
+        self.progress_tracker.start(total_files, total_bytes=total_bytes, layer_bytes=layer_bytes)
+
+        def collect(done: Set[Future]) -> None:
+            for future in done:
+                file_info, progress = pending.pop(future)
                 try:
                     status = future.result()
                 except DownloadError as exc:
-                    failures += 1
-                    failed_files.append((file_info, str(exc)))
-                    self.progress_tracker.fail()
-                    continue
+                    status = str(exc)
+                tally.record(file_info, status, progress)
 
-                if status == "skipped":
-                    skipped += 1
-                    self.progress_tracker.skip()
-                elif status == "success":
-                    successes += 1
-                    self.progress_tracker.advance()
-                else:
-                    failures += 1
-                    failed_files.append((file_info, status))
-                    self.progress_tracker.fail()
+        pending: Dict[Future, Tuple[S3FileInfo, _FileProgress]] = {}
+        try:
+            with self._transfer_session(download_cfg), ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for file_infos in files.values():
+                    for file_info in file_infos:
+                        if len(pending) >= max_workers * 2:
+                            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                        _, local_path, layer = self._build_task(file_info)
+                        progress = _FileProgress(
+                            self._on_bytes, file_info.layer_name, self.progress_tracker
+                        )
+                        future = executor.submit(
+                            self._download_with_retry,
+                            file_info,
+                            local_path,
+                            layer,
+                            retry_count,
+                            retry_delay,
+                            progress,
+                        )
+                        pending[future] = (file_info, progress)
+                while pending:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        finally:
+            self.progress_tracker.finish()
+            self._save_manifest()
 
         duration_seconds = time.time() - start_time
-        self.progress_tracker.finish()
+        snapshot = self.progress_tracker.snapshot()
 
         return DownloadResult(
             total_files=total_files,
-            successful=successes,
-            failed=failures,
-            skipped=skipped,
-            total_size_mb=total_size_mb,
+            successful=tally.successful,
+            failed=tally.failed,
+            skipped=tally.skipped,
+            total_size_mb=total_bytes / _MB,
             duration_seconds=duration_seconds,
-            failed_files=failed_files,
+            failed_files=tally.failed_files,
+            stale_files=stale_files,
+            bytes_transferred=snapshot.bytes_transferred,
+            throughput_mb_per_sec=snapshot.throughput_mb_per_sec,
+            layer_stats=snapshot.layers,
         )
 
+    def download_stream(
+        self,
+        files: Iterable[S3FileInfo],
+        layer_names: Iterable[str] = (),
+        on_file: Optional[Callable[[S3FileInfo], None]] = None,
+    ) -> DownloadResult:
+        """Download files while ``files`` is still being produced.
+
+        A producer thread drains ``files`` (typically a live S3 listing) into a
+        bounded queue that the download workers consume, so transfers start with
+        the first listed page and memory does not grow with the prefix size. An
+        exception raised by ``files`` (e.g. a failed file-count check) is re-raised
+        once the already queued downloads have finished. ``layer_names`` scopes the
+        stale-file detection of the sync mode.
+        """
+        download_cfg = self.config.get_download_config()
+        retry_count = int(download_cfg.get("retry_count", 3))
+        retry_delay = float(download_cfg.get("retry_delay", 5))
+        max_workers = self._pool_size(download_cfg)
+        queue_size = max(int(download_cfg.get("stream_queue_size", 1000)), 1)
+
+        seen_uris: Optional[Set[str]] = None
+        if download_cfg.get("sync"):
+            self._manifest = SyncManifest(self._get_manifest_path(download_cfg))
+            self._manifest.load()
+            seen_uris = set()
+
+        task_queue: "queue.Queue[Optional[Tuple[S3FileInfo, str, LayerConfig]]]" = queue.Queue(queue_size)
+        errors: List[BaseException] = []
+        stop_event = threading.Event()
+        totals = {"files": 0, "bytes": 0}
+
+        def produce() -> None:
+            try:
+                for file_info in files:
+                    if stop_event.is_set():
+                        break
+                    task = self._build_task(file_info)
+                    totals["files"] += 1
+                    totals["bytes"] += file_info.size
+                    if seen_uris is not None:
+                        seen_uris.add(file_info.get_s3_uri())
+                    if on_file is not None:
+                        on_file(file_info)
+                    self.progress_tracker.add_total(1, file_info.size, file_info.layer_name)
+                    task_queue.put(task)
+            except BaseException as exc:  # re-raised on the calling thread
+                errors.append(exc)
+            finally:
+                for _ in range(max_workers):
+                    task_queue.put(None)
+
+        def consume() -> None:
+            while True:
+                task = task_queue.get()
+                if task is None:
+                    return
+                if stop_event.is_set():
+                    continue  # drain the queue so the producer can finish
+                file_info, local_path, layer = task
+                progress = _FileProgress(
+                    self._on_bytes, file_info.layer_name, self.progress_tracker
+                )
+                try:
+                    status = self._download_with_retry(
+                        file_info, local_path, layer, retry_count, retry_delay, progress
+                    )
+                except DownloadError as exc:
+                    status = str(exc)
+                except BaseException as exc:  # re-raised on the calling thread
+                    errors.append(exc)
+                    stop_event.set()
+                    continue
+                tally.record(file_info, status, progress)
+
+        tally = _DownloadTally(self.progress_tracker)
+        start_time = time.time()
+        self.progress_tracker.start(0)
+        producer = threading.Thread(target=produce, name="s3-listing", daemon=True)
+        stale_files: List[str] = []
+
+        try:
+            with self._transfer_session(download_cfg), ThreadPoolExecutor(max_workers=max_workers) as executor:
+                producer.start()
+                workers = [executor.submit(consume) for _ in range(max_workers)]
+                try:
+                    for worker in workers:
+                        worker.result()
+                except BaseException:
+                    stop_event.set()
+                    raise
+            producer.join()
+            if errors:
+                raise errors[0]
+        finally:
+            self.progress_tracker.finish()
+            if seen_uris is not None and not errors and not stop_event.is_set():
+                stale_files = self._find_stale_files(layer_names, seen_uris)
+            self._save_manifest()
+
+        snapshot = self.progress_tracker.snapshot()
+        return DownloadResult(
+            total_files=totals["files"],
+            successful=tally.successful,
+            failed=tally.failed,
+            skipped=tally.skipped,
+            total_size_mb=totals["bytes"] / _MB,
+            duration_seconds=time.time() - start_time,
+            failed_files=tally.failed_files,
+            stale_files=stale_files,
+            bytes_transferred=snapshot.bytes_transferred,
+            throughput_mb_per_sec=snapshot.throughput_mb_per_sec,
+            layer_stats=snapshot.layers,
+        )
+
+    @contextmanager
+    def _transfer_session(self, download_cfg: Dict[str, Any]) -> Iterator[None]:
+        """Set up the shared transfer budget and ranged engine for one batch."""
+        max_workers = max(int(download_cfg.get("max_workers", 5)), 1)
+        pool_size = self._pool_size(download_cfg)
+        self._slots = TransferSlots(max_workers)
+        self._bandwidth = self.bandwidth or TokenBucket.from_config(download_cfg)
+        retry_events = None
+        if download_cfg.get("adaptive_concurrency"):
+            self._adaptive = AdaptiveConcurrency(
+                self._slots,
+                min_limit=int(download_cfg.get("adaptive_min_workers", 1)),
+                max_limit=pool_size,
+            )
+            retry_events = getattr(getattr(self.s3_client, "meta", None), "events", None)
+            if retry_events is not None:
+                retry_events.register("needs-retry.s3", self._adaptive.on_retry)
+        self._multipart_threshold = int(float(download_cfg.get("multipart_threshold_mb", 64)) * _MB)
+        part_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="s3-part")
+        self._ranged_downloader = RangedDownloader(
+            self.s3_client,
+            self._slots,
+            part_executor,
+            part_size=int(float(download_cfg.get("part_size_mb", 16)) * _MB),
+            max_concurrency=int(download_cfg.get("max_concurrency_per_file", 4)),
+            resume=bool(download_cfg.get("resume", True)),
+            on_bytes=self._on_bytes,
+        )
+        try:
+            with part_executor:
+                yield
+        finally:
+            if retry_events is not None and self._adaptive is not None:
+                retry_events.unregister("needs-retry.s3", self._adaptive.on_retry)
+            self._slots = None
+            self._bandwidth = None
+            self._adaptive = None
+            self._ranged_downloader = None
+
+    @staticmethod
+    def _pool_size(download_cfg: Dict[str, Any]) -> int:
+        """Number of worker threads; adaptive mode starts below it and may grow up to it."""
+        max_workers = max(int(download_cfg.get("max_workers", 5)), 1)
+        if not download_cfg.get("adaptive_concurrency"):
+            return max_workers
+        upper = download_cfg.get("adaptive_max_workers") or max_workers * 4
+        return max(int(upper), max_workers)
+
+    def _on_bytes(self, amount: int, layer_name: Optional[str] = None) -> None:
+        """Byte callback for every transfer path: throttles, reports and feeds the controller."""
+        if self._bandwidth is not None:
+            self._bandwidth.consume(amount)
+        self.progress_tracker.add_bytes(amount, layer_name)
+        if self._adaptive is not None:
+            self._adaptive.record_bytes(amount)
+
+    def _build_task(self, file_info: S3FileInfo) -> Tuple[S3FileInfo, str, LayerConfig]:
+        layer = self.config.get_layer_by_name(file_info.layer_name)
+        if layer is None:
+            raise DownloadError(
+                f"Unknown layer '{file_info.layer_name}' encountered during download."
+            )
+        return file_info, self._get_local_path(file_info), layer
+
+    def _find_stale_files(self, layer_names: Iterable[str], current_uris: Iterable[str]) -> List[str]:
+        if self._manifest is None:
+            return []
+        stale_files = self._manifest.find_stale(layer_names, current_uris)
+        for stale_path in stale_files:
+            LOGGER.warning("Local file no longer exists in S3: %s", stale_path)
+        return stale_files
+
     def _download_with_retry(
         self,
         file_info: S3FileInfo,
@@ -128,19 +432,29 @@ class FileDownloader:
         layer: LayerConfig,
         retry_count: int,
         retry_delay: float,
+        progress: Optional[_FileProgress] = None,
     ) -> str:
         if not self._should_download(file_info, local_path):
             return "skipped"
 
+        started = time.monotonic()
+        if progress is not None:
+            self.progress_tracker.begin_file(progress.layer_name)
         attempts = 0
         while attempts <= retry_count:
             try:
-                self._download_single_file(file_info, local_path, layer)
+                self._download_single_file(file_info, local_path, layer, progress)
+                if progress is not None:
+                    progress.seconds = time.monotonic() - started
+                if self._manifest is not None:
+                    self._manifest.record(file_info, local_path)
                 return "success"
-            except (ClientError, OSError) as exc:
+            except (ClientError, BotoCoreError, OSError) as exc:
                 attempts += 1
                 if attempts > retry_count:
                     raise DownloadError(f"Failed to download {file_info.get_s3_uri()}: {exc}") from exc
+                if progress is not None:
+                    progress.rewind()
                 time.sleep(retry_delay)
         return "failed"
 
@@ -149,16 +463,72 @@ class FileDownloader:
         file_info: S3FileInfo,
         local_path: str,
         layer: Optional[LayerConfig],
+        callback: Optional[Callable[[int], None]] = None,
     ) -> None:
         """Download a single S3 object to the specified path."""
         destination = Path(local_path)
         destination.parent.mkdir(parents=True, exist_ok=True)
+        callback = callback or self._on_bytes
         try:
-            self.s3_client.download_file(file_info.bucket, file_info.key, str(destination))
+            if self._ranged_downloader is not None and file_info.size >= self._multipart_threshold:
+                self._download_ranged(file_info, destination, callback)
+            elif self._slots is not None:
+                with self._slots:
+                    self.s3_client.download_file(
+                        file_info.bucket,
+                        file_info.key,
+                        str(destination),
+                        Config=TransferConfig(
+                            multipart_threshold=max(self._multipart_threshold, 1),
+                            use_threads=False,
+                        ),
+                        Callback=callback,
+                    )
+            else:
+                self.s3_client.download_file(
+                    file_info.bucket, file_info.key, str(destination), Callback=callback
+                )
         except ClientError as exc:  # pragma: no cover - depends on AWS
+            if self._adaptive is not None and is_throttle_error(exc):
+                self._adaptive.record_throttle()
             raise S3AccessError(f"Unable to download {file_info.get_s3_uri()}: {exc}") from exc
         self._maybe_extract_zip(destination, layer)
 
+    def _download_ranged(
+        self, file_info: S3FileInfo, destination: Path, callback: Callable[[int], None]
+    ) -> None:
+        """Fetch a large object in parts, restarting once if it is rewritten meanwhile.
+
+        Any other S3 error on this path fails only this file.
+        """
+        for restarted in (False, True):
+            try:
+                self._ranged_downloader.download(
+                    file_info.bucket,
+                    file_info.key,
+                    file_info.size,
+                    destination,
+                    file_info.etag,
+                    on_bytes=callback,
+                    on_resumed=callback.resumed if isinstance(callback, _FileProgress) else None,
+                )
+                return
+            except ClientError as exc:
+                if self._adaptive is not None and is_throttle_error(exc):
+                    self._adaptive.record_throttle()
+                if restarted or not is_precondition_failed(exc):
+                    raise DownloadError(f"Unable to download {file_info.get_s3_uri()}: {exc}") from exc
+            LOGGER.warning("%s changed while downloading; restarting it", file_info.get_s3_uri())
+            if isinstance(callback, _FileProgress):
+                callback.rewind()
+            try:
+                head = self.s3_client.head_object(Bucket=file_info.bucket, Key=file_info.key)
+            except ClientError as exc:  # pragma: no cover - depends on AWS
+                raise DownloadError(f"Unable to download {file_info.get_s3_uri()}: {exc}") from exc
+            file_info.size = int(head.get("ContentLength", file_info.size))
+            etag = head.get("ETag")
+            file_info.etag = etag.strip('"') if etag else None
+
     def _maybe_extract_zip(self, destination: Path, layer: Optional[LayerConfig]) -> None:
         """Extract zip archives if the layer configuration requires it."""
         if layer is None or not layer.extract_zip_on_download:
@@ -189,7 +559,24 @@ class FileDownloader:
             local_path = base_dir / file_info.get_filename()
         return str(local_path)
 
+    def _get_manifest_path(self, download_cfg: Dict[str, Any]) -> Path:
+        manifest_path = download_cfg.get("sync_manifest")
+        if manifest_path:
+            return Path(manifest_path).resolve()
+        base_dir = Path(download_cfg.get("local_base_dir", "./downloads")).resolve()
+        return base_dir / ".sync_manifest.json"
+
+    def _save_manifest(self) -> None:
+        if self._manifest is None:
+            return
+        try:
+            self._manifest.save()
+        finally:
+            self._manifest = None
+
     def _should_download(self, file_info: S3FileInfo, local_path: str) -> bool:
+        if self._manifest is not None:
+            return not self._manifest.is_current(file_info, local_path)
         download_cfg = self.config.get_download_config()
         overwrite = bool(download_cfg.get("overwrite", False))
         destination = Path(local_path)
@@ -2,36 +2,28 @@
 
 from __future__ import annotations
 
-import os
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from botocore.exceptions import ClientError
 
-from ..config import ConfigManager, LayerConfig
+from ..config import ConfigManager, LayerConfig, ShardingConfig
 from ..exceptions import InsufficientFilesError, S3AccessError, TooManyFilesError
+from ..utils.concurrency import map_layers
+from .file_info import FileRow, FileSet, S3FileInfo
+from .file_matcher import narrow_prefixes
 
+# (prefix, lower, upper): keys under ``prefix`` in the half-open range [lower, upper).
+KeyRange = Tuple[str, Optional[str], Optional[str]]
 
-@dataclass
-class S3FileInfo:
-    """Represents metadata about an S3 object."""
+# Pages each in-flight shard may buffer ahead of the consumer.
+PAGE_BUFFER = 2
 
-    bucket: str
-    key: str
-    size: int
-    last_modified: datetime
-    layer_name: str
-    matched_pattern: Optional[str] = None
-
-    def get_s3_uri(self) -> str:
-        return f"s3://{self.bucket}/{self.key}"
-
-    def get_filename(self) -> str:
-        return os.path.basename(self.key)
-
-    def get_size_mb(self) -> float:
-        return self.size / (1024 * 1024)
+_END = object()
 
 
 class S3FileCollector:
@@ -43,35 +35,60 @@ class S3FileCollector:
 
     def collect_files_for_layer(self, layer: LayerConfig) -> List[S3FileInfo]:
         """Return S3 file metadata for files matching the layer configuration."""
-        objects = self._list_s3_objects(layer.s3_bucket, layer.s3_prefix)
-        matched: List[S3FileInfo] = []
+        matched = list(self.iter_layer_files(layer))
+        self.validate_layer_count(layer, len(matched))
+        return matched
+
+    def collect_file_set(self, layer: LayerConfig) -> FileSet:
+        """Return the layer's matching files as a columnar FileSet."""
+        file_set = FileSet(layer.s3_bucket, layer.name)
+        for row in self._iter_matched_rows(layer):
+            file_set.append(*row)
+        self.validate_layer_count(layer, len(file_set))
+        return file_set
 
-        for obj in objects:
+    def iter_layer_files(self, layer: LayerConfig) -> Iterator[S3FileInfo]:
+        """Yield matching files page by page as the layer prefix is listed."""
+        for key, size, timestamp, matched_pattern, etag in self._iter_matched_rows(layer):
+            yield S3FileInfo(
+                bucket=layer.s3_bucket,
+                key=key,
+                size=size,
+                last_modified=timestamp,
+                layer_name=layer.name,
+                matched_pattern=matched_pattern,
+                etag=etag,
+            )
+
+    def _iter_matched_rows(self, layer: LayerConfig) -> Iterator[FileRow]:
+        """Yield ``(key, size, epoch_seconds, pattern, etag)`` for each matching object."""
+        for obj in self._list_layer_objects(layer):
             key = obj.get("Key")
             if not key:
                 continue
-            filename = os.path.basename(key)
-            if not layer.matches_filename(filename):
+            matched_pattern = layer.match(key[key.rfind("/") + 1 :])
+            if matched_pattern is None:
                 continue
-            matched_pattern = layer.get_matched_pattern(filename)
+            etag = obj.get("ETag")
             last_modified = obj.get("LastModified")
             if isinstance(last_modified, datetime):
-                if last_modified.tzinfo is None:
-                    last_modified = last_modified.replace(tzinfo=timezone.utc)
+                timestamp = S3FileInfo.to_epoch(last_modified)
             else:
-                last_modified = datetime.now(timezone.utc)
-            matched.append(
-                S3FileInfo(
-                    bucket=layer.s3_bucket,
-                    key=key,
-                    size=obj.get("Size", 0),
-                    last_modified=last_modified,
-                    layer_name=layer.name,
-                    matched_pattern=matched_pattern,
-                )
-            )
+                timestamp = int(time.time())
+            yield key, obj.get("Size", 0), timestamp, matched_pattern, etag.strip('"') if etag else None
+
+    def stream_layers(self, layers: Iterable[LayerConfig]) -> Iterator[S3FileInfo]:
+        """Yield matching files for each layer in turn, checking counts as each listing ends."""
+        for layer in layers:
+            file_count = 0
+            for file_info in self.iter_layer_files(layer):
+                file_count += 1
+                yield file_info
+            self.validate_layer_count(layer, file_count)
 
-        file_count = len(matched)
+    @staticmethod
+    def validate_layer_count(layer: LayerConfig, file_count: int) -> None:
+        """Raise if ``file_count`` falls outside the layer's configured bounds."""
         if not layer.validate_file_count(file_count):
             if file_count < layer.min_files:
                 raise InsufficientFilesError(
@@ -82,28 +99,169 @@ class S3FileCollector:
                     f"Layer '{layer.name}' expected at most {layer.max_files} files, found {file_count}."
                 )
 
-        return matched
-
     def collect_all_layers(self) -> Dict[str, List[S3FileInfo]]:
         """Return a mapping of layer name to the files discovered for that layer."""
         return self.collect_layers(self.config.get_layers())
 
     def collect_layers(self, layers: List[LayerConfig]) -> Dict[str, List[S3FileInfo]]:
-        """Collect files only for the specified layers."""
-        result: Dict[str, List[S3FileInfo]] = {}
-        for layer in layers:
-            result[layer.name] = self.collect_files_for_layer(layer)
-        return result
+        """Collect files only for the specified layers, listing layers concurrently."""
+        max_workers = int(self.config.get_download_config().get("listing_workers", 4))
+        return map_layers(self.collect_files_for_layer, layers, max_workers)
+
+    def collect_layer_sets(self, layers: List[LayerConfig]) -> Dict[str, FileSet]:
+        """Like collect_layers, but return a columnar FileSet per layer."""
+        max_workers = int(self.config.get_download_config().get("listing_workers", 4))
+        return map_layers(self.collect_file_set, layers, max_workers)
 
-    def _list_s3_objects(self, bucket: str, prefix: str) -> List[Dict[str, Any]]:
-        """List S3 objects beneath the given bucket/prefix."""
+    def _list_layer_objects(self, layer: LayerConfig) -> Iterator[Dict[str, Any]]:
+        """Yield the layer's candidate objects in key order using the configured strategy."""
+        prefixes = [layer.s3_prefix]
+        if layer.pattern_pushdown:
+            prefixes = narrow_prefixes(layer.s3_prefix, layer.file_patterns)
+        if prefixes == [layer.s3_prefix]:
+            if layer.sharding is not None:
+                return self._list_sharded(layer.s3_bucket, layer.s3_prefix, layer.sharding)
+            return self._list_s3_objects(layer.s3_bucket, layer.s3_prefix)
+        return self._list_prefixes(layer.s3_bucket, prefixes)
+
+    def _list_prefixes(self, bucket: str, prefixes: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield objects under several disjoint, sorted prefixes listed in parallel."""
+        max_workers = int(self.config.get_download_config().get("listing_workers", 4))
+        ranges = [(prefix, None, None) for prefix in prefixes]
+        for _, objects in self._iter_ranges(bucket, ranges, max_workers):
+            yield from objects
+
+    def _list_s3_objects(self, bucket: str, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Yield S3 objects beneath the given bucket/prefix as each page arrives."""
         try:
             paginator = self.s3_client.get_paginator("list_objects_v2")
             pages = paginator.paginate(Bucket=bucket, Prefix=prefix)
         except ClientError as exc:  # pragma: no cover - depends on AWS
             raise S3AccessError(f"Unable to list objects for s3://{bucket}/{prefix}: {exc}") from exc
 
-        objects: List[Dict[str, Any]] = []
         for page in pages:
-            objects.extend(page.get("Contents", []))
-        return objects
+            yield from page.get("Contents", [])
+
+    def _list_sharded(
+        self, bucket: str, prefix: str, sharding: ShardingConfig
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield objects in key order, listing the prefix's shards in parallel."""
+        if sharding.mode == "ranges":
+            bounds = [prefix + boundary for boundary in sharding.boundaries]
+            ranges: List[KeyRange] = [
+                (prefix, lower, upper) for lower, upper in zip([None] + bounds, bounds + [None])
+            ]
+            for _, objects in self._iter_ranges(bucket, ranges, sharding.max_workers):
+                yield from objects
+            return
+
+        top_level, sub_prefixes = self._list_top_level(bucket, prefix, sharding.delimiter)
+        ranges = [(sub_prefix, None, None) for sub_prefix in sub_prefixes]
+        index = 0
+        for shard, objects in self._iter_ranges(bucket, ranges, sharding.max_workers):
+            # Keys directly under ``prefix`` sort either entirely before or entirely
+            # after each sub-prefix, so the shards can be interleaved without sorting.
+            while index < len(top_level) and top_level[index]["Key"] < sub_prefixes[shard]:
+                yield top_level[index]
+                index += 1
+            yield from objects
+        yield from top_level[index:]
+
+    def _iter_ranges(
+        self, bucket: str, ranges: List[KeyRange], max_workers: int
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yield ``(range_index, page)`` for each key range in order.
+
+        At most ``max_workers`` ranges are listed ahead of the consumer and each
+        buffers at most ``PAGE_BUFFER`` pages, so memory stays flat however many
+        shards or prefixes there are.
+        """
+        if not ranges:
+            return
+        workers = max(min(max_workers, len(ranges)), 1)
+        buffers: List[queue.Queue] = [queue.Queue(maxsize=PAGE_BUFFER) for _ in ranges]
+        stop = threading.Event()
+
+        def produce(index: int) -> None:
+            prefix, lower, upper = ranges[index]
+            item: Any = _END
+            try:
+                for page in self._iter_key_range(bucket, prefix, lower, upper):
+                    if not _offer(buffers[index], page, stop):
+                        return
+            except Exception as exc:  # handed to the consumer thread
+                item = exc
+            _offer(buffers[index], item, stop)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for index in range(workers):
+                    executor.submit(produce, index)
+                for index, buffer in enumerate(buffers):
+                    while True:
+                        item = buffer.get()
+                        if item is _END:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+                        yield index, item
+                    if index + workers < len(ranges):
+                        executor.submit(produce, index + workers)
+            finally:
+                stop.set()
+
+    def _list_top_level(
+        self, bucket: str, prefix: str, delimiter: str
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Return the objects directly under ``prefix`` and its sorted sub-prefixes."""
+        objects: List[Dict[str, Any]] = []
+        sub_prefixes: List[str] = []
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter=delimiter):
+                objects.extend(page.get("Contents", []))
+                sub_prefixes.extend(
+                    entry["Prefix"] for entry in page.get("CommonPrefixes", []) if entry.get("Prefix")
+                )
+        except ClientError as exc:  # pragma: no cover - depends on AWS
+            raise S3AccessError(f"Unable to list objects for s3://{bucket}/{prefix}: {exc}") from exc
+        return objects, sorted(sub_prefixes)
+
+    def _iter_key_range(
+        self, bucket: str, prefix: str, lower: Optional[str], upper: Optional[str]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of keys under ``prefix`` in the half-open range [lower, upper)."""
+        params: Dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+        if lower:
+            # StartAfter is exclusive; starting after the previous code point plus
+            # U+10FFFF skips the previous shard, and the filter below drops the rest.
+            last = ord(lower[-1])
+            params["StartAfter"] = lower[:-1] + chr(last - 1) + "\U0010ffff" if last else lower[:-1]
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(**params):
+                objects: List[Dict[str, Any]] = []
+                for obj in page.get("Contents", []):
+                    key = obj.get("Key", "")
+                    if lower and key < lower:
+                        continue
+                    if upper and key >= upper:
+                        if objects:
+                            yield objects
+                        return
+                    objects.append(obj)
+                if objects:
+                    yield objects
+        except ClientError as exc:  # pragma: no cover - depends on AWS
+            raise S3AccessError(f"Unable to list objects for s3://{bucket}/{prefix}: {exc}") from exc
+
+
+def _offer(buffer: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put ``item`` on ``buffer`` unless the consumer stops first."""
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
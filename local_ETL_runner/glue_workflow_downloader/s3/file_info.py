@@ -0,0 +1,234 @@
+"""Compact in-memory representations of listed S3 objects."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+_MB = 1024 * 1024
+
+Timestamp = Union[datetime, int, float]
+FileRow = Tuple[str, int, int, Optional[str], Optional[str]]
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class S3FileInfo:
+    """Represents metadata about an S3 object.
+
+    Instances are slotted, share interned bucket/layer/pattern strings and keep
+    ``last_modified`` as epoch seconds, so millions of them stay compact. The
+    ``last_modified`` property still returns a timezone-aware datetime.
+    """
+
+    __slots__ = ("bucket", "key", "size", "last_modified_ts", "layer_name", "matched_pattern", "etag")
+
+    def __init__(
+        self,
+        bucket: str,
+        key: str,
+        size: int,
+        last_modified: Timestamp,
+        layer_name: str,
+        matched_pattern: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        self.bucket = sys.intern(bucket)
+        self.key = key
+        self.size = size
+        self.last_modified_ts = self.to_epoch(last_modified)
+        self.layer_name = sys.intern(layer_name)
+        self.matched_pattern = _intern(matched_pattern)
+        self.etag = etag
+
+    @staticmethod
+    def to_epoch(value: Timestamp) -> int:
+        """Return epoch seconds for a datetime (naive values are taken as UTC) or number."""
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return int(value.timestamp())
+        return int(value)
+
+    @property
+    def last_modified(self) -> datetime:
+        return datetime.fromtimestamp(self.last_modified_ts, tz=timezone.utc)
+
+    def get_s3_uri(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+    def get_filename(self) -> str:
+        return os.path.basename(self.key)
+
+    def get_size_mb(self) -> float:
+        return self.size / _MB
+
+    def _astuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, S3FileInfo):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None  # type: ignore[assignment]  # mutable, like the former dataclass
+
+    def __repr__(self) -> str:
+        return (
+            f"S3FileInfo(bucket={self.bucket!r}, key={self.key!r}, size={self.size!r}, "
+            f"last_modified={self.last_modified!r}, layer_name={self.layer_name!r}, "
+            f"matched_pattern={self.matched_pattern!r}, etag={self.etag!r})"
+        )
+
+
+class FileSet:
+    """Columnar container for the files of one layer.
+
+    Keys, ETags and pattern indexes are kept in flat lists and sizes/timestamps in
+    ``array`` buffers, so no per-object Python instance is held. Iterating yields
+    transient S3FileInfo objects; ``rows`` yields plain tuples.
+    """
+
+    def __init__(self, bucket: str, layer_name: str) -> None:
+        self.bucket = sys.intern(bucket)
+        self.layer_name = sys.intern(layer_name)
+        self.keys: List[str] = []
+        self.sizes = array("q")
+        self.timestamps = array("q")
+        self.etags: List[Optional[str]] = []
+        self.patterns: List[Optional[str]] = []
+        self._pattern_ids = array("H")
+        self._pattern_index: Dict[Optional[str], int] = {}
+
+    def append(
+        self,
+        key: str,
+        size: int,
+        last_modified: Timestamp,
+        matched_pattern: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        """Add one object to the set."""
+        pattern_id = self._pattern_index.get(matched_pattern)
+        if pattern_id is None:
+            pattern_id = len(self.patterns)
+            self.patterns.append(_intern(matched_pattern))
+            self._pattern_index[matched_pattern] = pattern_id
+        self.keys.append(key)
+        self.sizes.append(size)
+        self.timestamps.append(S3FileInfo.to_epoch(last_modified))
+        self.etags.append(etag)
+        self._pattern_ids.append(pattern_id)
+
+    def add(self, file_info: S3FileInfo) -> None:
+        """Add an S3FileInfo, keeping only its columns."""
+        self.append(
+            file_info.key,
+            file_info.size,
+            file_info.last_modified_ts,
+            file_info.matched_pattern,
+            file_info.etag,
+        )
+
+    def rows(self) -> Iterator[FileRow]:
+        """Yield ``(key, size, epoch_seconds, matched_pattern, etag)`` tuples."""
+        patterns = self.patterns
+        for key, size, timestamp, etag, pattern_id in zip(
+            self.keys, self.sizes, self.timestamps, self.etags, self._pattern_ids
+        ):
+            yield key, size, timestamp, patterns[pattern_id], etag
+
+    def total_size(self) -> int:
+        """Return the combined size of all objects in bytes."""
+        return sum(self.sizes)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[S3FileInfo]:
+        for key, size, timestamp, pattern, etag in self.rows():
+            yield S3FileInfo(self.bucket, key, size, timestamp, self.layer_name, pattern, etag)
+
+
+class SpooledFileSet:
+    """Append-only file group that keeps its rows in a temporary file.
+
+    Only the count and total size stay in memory, so files streamed from a layer
+    of any size can still be listed in the report once the downloads finish.
+    """
+
+    def __init__(self, bucket: str, layer_name: str) -> None:
+        self.bucket = sys.intern(bucket)
+        self.layer_name = sys.intern(layer_name)
+        self._count = 0
+        self._size = 0
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8", newline="\n")
+
+    def add(self, file_info: S3FileInfo) -> None:
+        """Write an S3FileInfo's columns to the spool."""
+        row = [
+            file_info.key,
+            file_info.size,
+            file_info.last_modified_ts,
+            file_info.matched_pattern,
+            file_info.etag,
+        ]
+        self._spool.write(json.dumps(row) + "\n")
+        self._count += 1
+        self._size += file_info.size
+
+    def rows(self) -> Iterator[FileRow]:
+        """Yield ``(key, size, epoch_seconds, matched_pattern, etag)`` tuples from the spool."""
+        self._spool.flush()
+        self._spool.seek(0)
+        try:
+            for line in self._spool:
+                key, size, timestamp, pattern, etag = json.loads(line)
+                yield key, size, timestamp, pattern, etag
+        finally:
+            self._spool.seek(0, os.SEEK_END)
+
+    def total_size(self) -> int:
+        """Return the combined size of all objects in bytes."""
+        return self._size
+
+    def close(self) -> None:
+        self._spool.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[S3FileInfo]:
+        for key, size, timestamp, pattern, etag in self.rows():
+            yield S3FileInfo(self.bucket, key, size, timestamp, self.layer_name, pattern, etag)
+
+
+FileGroup = Union[List[S3FileInfo], FileSet, SpooledFileSet]
+
+
+def total_size(files: Iterable[S3FileInfo]) -> int:
+    """Return the combined size in bytes of a FileSet or any iterable of S3FileInfo."""
+    if isinstance(files, (FileSet, SpooledFileSet)):
+        return files.total_size()
+    return sum(file_info.size for file_info in files)
+
+
+def iter_rows(files: Iterable[S3FileInfo]) -> Iterator[FileRow]:
+    """Yield ``FileRow`` tuples without materialising S3FileInfo objects for a FileSet."""
+    if isinstance(files, (FileSet, SpooledFileSet)):
+        return files.rows()
+    return (
+        (info.key, info.size, info.last_modified_ts, info.matched_pattern, info.etag) for info in files
+    )
+
+
+def total_size_mb(files: Iterable[S3FileInfo]) -> float:
+    """Return the combined size in MB of a FileSet or any iterable of S3FileInfo."""
+    return total_size(files) / _MB
@@ -1,51 +1,93 @@
-"""File name matching helpers."""
+"""Helpers that narrow S3 listings to the literal heads of file name patterns."""
 
 from __future__ import annotations
 
-import re
-from typing import Dict, List, Optional
-
-
-class FileMatcher:
-    """Provides cached regular-expression based matching utilities."""
-
-    def __init__(self) -> None:
-        self._pattern_cache: Dict[str, re.Pattern[str]] = {}
-
-    def matches(self, filename: str, pattern: str) -> bool:
-        """Return True if the filename matches the supplied pattern."""
-        compiled = self._get_compiled_pattern(pattern)
-        return bool(compiled.match(filename))
-
-    def matches_any(self, filename: str, patterns: List[str]) -> bool:
-        """Return True if the filename matches any pattern in the list."""
-        return self.get_matched_pattern(filename, patterns) is not None
-
-    def get_matched_pattern(self, filename: str, patterns: List[str]) -> Optional[str]:
-        """Return the pattern that matches the filename, if any."""
-        for pattern in patterns:
-            if self.matches(filename, pattern):
-                return pattern
-        return None
-
-    def filter_files(self, files: List[str], pattern: str) -> List[str]:
-        """Filter file names to those matching the pattern."""
-        compiled = self._get_compiled_pattern(pattern)
-        return [name for name in files if compiled.match(name)]
-
-    def filter_files_multi_pattern(self, files: List[str], patterns: List[str]) -> Dict[str, List[str]]:
-        """Return a mapping of pattern to file names matching that pattern."""
-        result: Dict[str, List[str]] = {pattern: [] for pattern in patterns}
-        for name in files:
-            matched = self.get_matched_pattern(name, patterns)
-            if matched is not None:
-                result.setdefault(matched, []).append(name)
-        return result
-
-    def _get_compiled_pattern(self, pattern: str) -> re.Pattern[str]:
-        """Fetch or compile the regex pattern."""
-        compiled = self._pattern_cache.get(pattern)
-        if compiled is None:
-            compiled = re.compile(pattern)
-            self._pattern_cache[pattern] = compiled
-        return compiled
+from typing import Iterable, List
+
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def literal_prefix(pattern: str) -> str:
+    """Return the literal text every string matched by ``re.match(pattern, ...)`` starts with.
+
+    Returns an empty string when the pattern has no literal head, e.g. it starts
+    with a character class, a group, an inline flag or contains a top-level
+    alternation.
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    index = 1 if pattern.startswith("^") else 0
+    literal: List[str] = []
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            escaped = pattern[index + 1 : index + 2]
+            if not escaped or escaped.isalnum():
+                break  # character classes (\d, \w), anchors or back-references
+            char, step = escaped, 2
+        elif char in _REGEX_SPECIAL:
+            break
+        else:
+            step = 1
+        following = pattern[index + step : index + step + 1]
+        if following and following in "*?{":
+            break  # the character may be absent
+        literal.append(char)
+        if following == "+":
+            break
+        index += step
+    return "".join(literal)
+
+
+def narrow_prefixes(s3_prefix: str, patterns: Iterable[str]) -> List[str]:
+    """Return the sorted, non-overlapping S3 prefixes that can hold files matching ``patterns``.
+
+    Patterns match file names, so the literal head of each pattern is appended to
+    the directory part of ``s3_prefix``. Falls back to ``[s3_prefix]`` as soon as
+    one pattern has no literal head.
+    """
+    directory = s3_prefix[: s3_prefix.rfind("/") + 1]
+    candidates = set()
+    for pattern in patterns:
+        head = literal_prefix(pattern)
+        if not head:
+            return [s3_prefix]
+        narrowed = directory + head
+        if narrowed.startswith(s3_prefix):
+            candidates.add(narrowed)
+        elif s3_prefix.startswith(narrowed):
+            candidates.add(s3_prefix)
+        # otherwise no key under s3_prefix can match this pattern
+
+    prefixes: List[str] = []
+    for candidate in sorted(candidates):
+        if prefixes and candidate.startswith(prefixes[-1]):
+            continue
+        prefixes.append(candidate)
+    return prefixes
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            if pattern[index + 1 : index + 2] == "]":
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        index += 1
+    return False
@@ -0,0 +1,101 @@
+"""Local manifest of downloaded S3 objects used by the incremental sync mode."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .file_collector import S3FileInfo
+
+
+class SyncManifest:
+    """Records the S3 state of each downloaded object so unchanged objects can be skipped."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Read the manifest from disk, starting empty when it is missing or unreadable."""
+        self._entries = {}
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            entries = data.get("objects", {})
+            if isinstance(entries, dict):
+                self._entries = entries
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {"version": self.VERSION, "objects": dict(self._entries)}
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, file_info: S3FileInfo, local_path: str) -> bool:
+        """Return True if the local copy still reflects the listed S3 object."""
+        with self._lock:
+            entry = self._entries.get(file_info.get_s3_uri())
+        if entry is None or entry.get("local_path") != local_path:
+            return False
+        if entry.get("size") != file_info.size:
+            return False
+        if file_info.etag and entry.get("etag"):
+            if entry["etag"] != file_info.etag:
+                return False
+        elif entry.get("last_modified") != self._format_timestamp(file_info.last_modified):
+            return False
+        path = Path(local_path)
+        return path.is_file() and path.stat().st_size == file_info.size
+
+    def record(self, file_info: S3FileInfo, local_path: str) -> None:
+        """Remember the S3 state of a successfully downloaded object."""
+        entry = {
+            "layer": file_info.layer_name,
+            "etag": file_info.etag,
+            "size": file_info.size,
+            "last_modified": self._format_timestamp(file_info.last_modified),
+            "local_path": local_path,
+        }
+        with self._lock:
+            self._entries[file_info.get_s3_uri()] = entry
+
+    def find_stale(self, layer_names: Iterable[str], current_uris: Iterable[str]) -> List[str]:
+        """Return local paths of objects in ``layer_names`` that are no longer listed in S3.
+
+        Entries whose local file has also disappeared are dropped from the manifest.
+        """
+        layers = set(layer_names)
+        current = set(current_uris)
+        stale: List[str] = []
+        with self._lock:
+            for uri, entry in list(self._entries.items()):
+                if entry.get("layer") not in layers or uri in current:
+                    continue
+                local_path = entry.get("local_path")
+                if local_path and Path(local_path).exists():
+                    stale.append(local_path)
+                else:
+                    del self._entries[uri]
+        return sorted(stale)
+
+    @staticmethod
+    def _format_timestamp(value: Optional[datetime]) -> Optional[str]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
@@ -0,0 +1,351 @@
+"""Ranged multipart transfer helpers for large S3 objects."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+LOGGER = logging.getLogger(__name__)
+
+_STREAM_CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+CHECKPOINT_SUFFIX = ".part.json"
+THROTTLE_ERROR_CODES = frozenset({"SlowDown", "503", "ServiceUnavailable", "RequestLimitExceeded"})
+
+
+class TransferSlots:
+    """Global budget of concurrent S3 transfers shared by every download path.
+
+    The limit can be changed while transfers are running; lowering it lets the
+    active transfers finish and only blocks new ones.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(int(limit), 1)
+        self.active = 0
+        self._condition = threading.Condition()
+        self._held = threading.local()
+
+    def __enter__(self) -> "TransferSlots":
+        with self._condition:
+            while self.active >= self.limit:
+                self._condition.wait()
+            self.active += 1
+        self._held.count = getattr(self._held, "count", 0) + 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._held.count -= 1
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def held(self) -> bool:
+        """Return True if the calling thread is transferring inside one of these slots."""
+        return getattr(self._held, "count", 0) > 0
+
+    def resize(self, limit: int) -> None:
+        """Change the number of transfers allowed to run at once."""
+        with self._condition:
+            self.limit = max(int(limit), 1)
+            self._condition.notify_all()
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Return True if ``exc`` is S3 asking the client to slow down."""
+    if not isinstance(exc, ClientError):
+        return False
+    error = exc.response.get("Error", {})
+    status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return error.get("Code") in THROTTLE_ERROR_CODES or status == 503
+
+
+def is_precondition_failed(exc: BaseException) -> bool:
+    """Return True if ``exc`` is S3 rejecting an ``IfMatch`` because the object changed."""
+    if not isinstance(exc, ClientError):
+        return False
+    status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return exc.response.get("Error", {}).get("Code") in ("PreconditionFailed", "412") or status == 412
+
+
+class AdaptiveConcurrency:
+    """Grows or shrinks ``TransferSlots`` from observed throughput and throttling.
+
+    Every ``window`` seconds the per-slot throughput is compared with the previous
+    window: while adding a slot keeps per-slot throughput within 10% the link is
+    not saturated and another slot is added; a drop of more than 30% removes one.
+    A SlowDown/503 response halves the limit (at most once per window).
+    """
+
+    def __init__(
+        self,
+        slots: TransferSlots,
+        min_limit: int,
+        max_limit: int,
+        window: float = 5.0,
+    ) -> None:
+        self.slots = slots
+        self.min_limit = max(int(min_limit), 1)
+        self.max_limit = max(int(max_limit), self.min_limit)
+        self.window = window
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._last_per_slot: Optional[float] = None
+        self._last_throttle = 0.0
+
+    def record_bytes(self, amount: int) -> None:
+        """Account transferred bytes and re-evaluate the limit once per window."""
+        with self._lock:
+            self._window_bytes += amount
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed < self.window:
+                return
+            per_slot = self._window_bytes / elapsed / self.slots.limit
+            limit = self.slots.limit
+            if self._last_per_slot is None or per_slot >= self._last_per_slot * 0.9:
+                limit = min(limit + 1, self.max_limit)
+            elif per_slot < self._last_per_slot * 0.7:
+                limit = max(limit - 1, self.min_limit)
+            self._last_per_slot = per_slot
+            self._window_start = now
+            self._window_bytes = 0
+        self._apply(limit, f"per-slot throughput {per_slot / (1024 * 1024):.2f} MB/s")
+
+    def record_throttle(self) -> None:
+        """Halve the limit after S3 responded with SlowDown/503."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_throttle < self.window:
+                return
+            self._last_throttle = now
+            self._last_per_slot = None
+            self._window_start = now
+            self._window_bytes = 0
+            limit = max(self.slots.limit // 2, self.min_limit)
+        self._apply(limit, "S3 throttling")
+
+    def on_retry(self, response=None, **kwargs) -> None:
+        """botocore ``needs-retry`` hook that reacts to throttled responses.
+
+        The hook sees every request on the shared client, so only retries made
+        from inside this controller's slots (its own downloads) count.
+        """
+        if response is None or not self.slots.held():
+            return
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_ERROR_CODES or getattr(http_response, "status_code", None) == 503:
+            self.record_throttle()
+
+    def _apply(self, limit: int, reason: str) -> None:
+        if limit != self.slots.limit:
+            LOGGER.info("Adjusting concurrent transfers %s -> %s (%s)", self.slots.limit, limit, reason)
+            self.slots.resize(limit)
+
+
+def split_ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """Return inclusive (start, end) byte ranges covering an object of ``size`` bytes."""
+    part_size = max(int(part_size), 1)
+    return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+
+class DownloadCheckpoint:
+    """Sidecar record of the byte ranges already written to a ``.part`` file."""
+
+    def __init__(self, path: Path, etag: Optional[str], size: int, part_size: int) -> None:
+        self.path = path
+        self.etag = etag
+        self.size = size
+        self.part_size = part_size
+        self.completed: Set[Tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Restore completed ranges if the sidecar describes the same object version."""
+        if not self.etag or not self.path.exists():
+            return False
+        try:
+            data: Dict[str, Any] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if (
+            data.get("etag") != self.etag
+            or data.get("size") != self.size
+            or data.get("part_size") != self.part_size
+        ):
+            return False
+        self.completed = {(int(start), int(end)) for start, end in data.get("completed", [])}
+        return True
+
+    def mark_done(self, byte_range: Tuple[int, int]) -> None:
+        """Record a finished range and persist the sidecar atomically."""
+        with self._lock:
+            self.completed.add(byte_range)
+            payload = {
+                "etag": self.etag,
+                "size": self.size,
+                "part_size": self.part_size,
+                "completed": sorted(self.completed),
+            }
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+    def discard(self) -> None:
+        """Remove the sidecar file."""
+        self.completed = set()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class RangedDownloader:
+    """Downloads an object as concurrent byte-range GETs into a preallocated file.
+
+    Data is written to ``<destination>.part`` and renamed into place once every
+    range has arrived. When ``resume`` is enabled, finished ranges are tracked in a
+    ``<destination>.part.json`` sidecar so a retry or a later run only fetches
+    the ranges that are still missing.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        slots: TransferSlots,
+        part_executor: ThreadPoolExecutor,
+        part_size: int,
+        max_concurrency: int,
+        resume: bool = True,
+        on_bytes: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.s3_client = s3_client
+        self.slots = slots
+        self.part_executor = part_executor
+        self.part_size = max(int(part_size), 1)
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.resume = resume
+        self.on_bytes = on_bytes
+
+    def download(
+        self,
+        bucket: str,
+        key: str,
+        size: int,
+        destination: Path,
+        etag: Optional[str] = None,
+        on_bytes: Optional[Callable[[int], None]] = None,
+        on_resumed: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """Fetch ``size`` bytes of ``bucket/key`` into ``destination``.
+
+        ``on_bytes`` replaces the engine-wide byte callback for this object.
+        ``on_resumed`` receives the number of bytes restored from a checkpoint.
+        """
+        on_bytes = on_bytes or self.on_bytes
+        part_path = destination.with_name(destination.name + PART_SUFFIX)
+        checkpoint = DownloadCheckpoint(
+            destination.with_name(destination.name + CHECKPOINT_SUFFIX),
+            etag if self.resume else None,
+            size,
+            self.part_size,
+        )
+        resumed = checkpoint.load() and part_path.exists() and part_path.stat().st_size == size
+        if not resumed:
+            checkpoint.discard()
+            with part_path.open("wb") as fh:
+                fh.truncate(size)
+        elif on_resumed is not None:
+            on_resumed(sum(end - start + 1 for start, end in checkpoint.completed))
+
+        remaining = [r for r in split_ranges(size, self.part_size) if r not in checkpoint.completed]
+        pending: Set[Future] = set()
+        try:
+            for byte_range in remaining:
+                if len(pending) >= self.max_concurrency:
+                    pending = self._wait(pending, FIRST_COMPLETED)
+                pending.add(
+                    self.part_executor.submit(
+                        self._download_part,
+                        bucket,
+                        key,
+                        byte_range,
+                        part_path,
+                        etag,
+                        checkpoint,
+                        on_bytes,
+                    )
+                )
+            self._wait(pending)
+        except ClientError as exc:
+            self._cancel(pending)
+            if is_precondition_failed(exc):
+                # The object changed while downloading; saved ranges are no longer valid.
+                checkpoint.discard()
+            raise
+        except BaseException:
+            self._cancel(pending)
+            raise
+
+        os.replace(part_path, destination)
+        checkpoint.discard()
+
+    @staticmethod
+    def _cancel(pending: Set[Future]) -> None:
+        for future in pending:
+            future.cancel()
+        wait(pending)
+
+    @staticmethod
+    def _wait(pending: Set[Future], return_when: str = "ALL_COMPLETED") -> Set[Future]:
+        done, not_done = wait(pending, return_when=return_when)
+        for future in done:
+            future.result()
+        return not_done
+
+    def _download_part(
+        self,
+        bucket: str,
+        key: str,
+        byte_range: Tuple[int, int],
+        destination: Path,
+        etag: Optional[str],
+        checkpoint: DownloadCheckpoint,
+        on_bytes: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        start, end = byte_range
+        expected = end - start + 1
+        written = 0
+        request: Dict[str, Any] = {"Bucket": bucket, "Key": key, "Range": f"bytes={start}-{end}"}
+        if etag:
+            request["IfMatch"] = f'"{etag}"'
+        with self.slots:
+            response = self.s3_client.get_object(**request)
+            body = response["Body"]
+            try:
+                with destination.open("r+b") as fh:
+                    fh.seek(start)
+                    for chunk in body.iter_chunks(_STREAM_CHUNK_SIZE):
+                        fh.write(chunk)
+                        written += len(chunk)
+                        if on_bytes is not None:
+                            on_bytes(len(chunk))
+            finally:
+                body.close()
+        if written != expected:
+            raise OSError(
+                f"Incomplete range bytes={start}-{end} for s3://{bucket}/{key}: "
+                f"received {written} of {expected} bytes"
+            )
+        if self.resume:
+            checkpoint.mark_done(byte_range)
@@ -0,0 +1,134 @@
+"""Content comparison helpers used by the upload sync mode."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_MB = 1024 * 1024
+_READ_SIZE = 8 * _MB
+
+
+def etag_part_count(etag: str) -> int:
+    """Return the number of parts encoded in a multipart ETag, or 0 for a single-part ETag."""
+    _, _, count = etag.strip('"').partition("-")
+    return int(count) if count.isdigit() else 0
+
+
+def guess_part_size(size: int, part_count: int, configured_part_size: int) -> int:
+    """Return the part size that splits ``size`` bytes into ``part_count`` parts.
+
+    The configured size is preferred; otherwise the smallest whole number of MiB
+    that yields the right count is used, which matches the AWS CLI and boto3.
+    """
+    if part_count <= 1:
+        return max(configured_part_size, size, 1)
+    if -(-size // configured_part_size) == part_count:
+        return configured_part_size
+    per_part = -(-size // part_count)
+    return -(-per_part // _MB) * _MB
+
+
+def compute_etags(path: str, part_size: Optional[int]) -> Dict[str, str]:
+    """Read ``path`` once and return its plain MD5 and, if requested, its multipart ETag."""
+    whole = hashlib.md5()
+    part_digests: List[bytes] = []
+    part = hashlib.md5()
+    part_filled = 0
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(_READ_SIZE)
+            if not chunk:
+                break
+            whole.update(chunk)
+            if not part_size:
+                continue
+            view = memoryview(chunk)
+            while view:
+                take = min(part_size - part_filled, len(view))
+                part.update(view[:take])
+                part_filled += take
+                view = view[take:]
+                if part_filled == part_size:
+                    part_digests.append(part.digest())
+                    part = hashlib.md5()
+                    part_filled = 0
+    result = {"md5": whole.hexdigest()}
+    if part_size:
+        if part_filled:
+            part_digests.append(part.digest())
+        combined = hashlib.md5(b"".join(part_digests)).hexdigest()
+        result[str(part_size)] = f"{combined}-{len(part_digests)}"
+    return result
+
+
+class LocalHashIndex:
+    """Cache of local file hashes keyed by path and invalidated by size and mtime."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self) -> None:
+        """Read the index from disk, starting empty when it is missing or unreadable."""
+        self._entries = {}
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            entries = data.get("files", {})
+            if isinstance(entries, dict):
+                self._entries = entries
+
+    def save(self) -> None:
+        """Atomically write the index to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": self.VERSION, "files": dict(self._entries)}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def etag(self, path: str, stat: os.stat_result, part_size: Optional[int] = None) -> str:
+        """Return the S3 ETag ``path`` would get: plain MD5, or multipart for ``part_size``."""
+        field = str(part_size) if part_size else "md5"
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.get("size"), entry.get("mtime_ns")) != (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                entry = None
+            if entry is not None and field in entry:
+                return entry[field]
+        computed = compute_etags(path, part_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or (entry.get("size"), entry.get("mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                self._entries[path] = entry
+            entry.update(computed)
+            self._dirty = True
+        return computed[field]
+
+    def matches(self, path: str, stat: os.stat_result, remote_etag: str, part_size: int) -> bool:
+        """Return True if the local file has the same content as an object with ``remote_etag``."""
+        remote_etag = remote_etag.strip('"')
+        parts = etag_part_count(remote_etag)
+        if parts == 0:
+            return self.etag(path, stat) == remote_etag
+        return self.etag(path, stat, guess_part_size(stat.st_size, parts, part_size)) == remote_etag
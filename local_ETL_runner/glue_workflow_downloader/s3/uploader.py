@@ -3,28 +3,69 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
 
-from ..config import LayerConfig
+from ..config import ConfigManager, LayerConfig
 from ..exceptions import LocalOverrideError, S3AccessError
+from ..utils.throttle import TokenBucket
 from .file_collector import S3FileInfo
+from .upload_sync import LocalHashIndex
 
 
 LOGGER = logging.getLogger(__name__)
 
+_MB = 1024 * 1024
+_MAX_REPORTED_FAILURES = 5
+_DELETE_BATCH_SIZE = 1000
+_DELETE_RETRY_DELAY = 0.5
+_RETRYABLE_DELETE_ERRORS = frozenset({"InternalError", "SlowDown", "ServiceUnavailable", "RequestTimeout"})
+
+
+@dataclass
+class DeleteStats:
+    """Counts and time spent deleting objects from S3."""
+
+    deleted: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+
+    def add(self, other: "DeleteStats") -> None:
+        self.deleted += other.deleted
+        self.failed += other.failed
+        self.duration_seconds += other.duration_seconds
+
 
 class S3Uploader:
     """Uploads local files to S3 for layers configured with overrides."""
 
-    def __init__(self, s3_client) -> None:
+    def __init__(
+        self,
+        s3_client,
+        config: Optional[ConfigManager] = None,
+        bandwidth: Optional[TokenBucket] = None,
+    ) -> None:
         self.s3_client = s3_client
+        self.config = config
+        self.bandwidth = bandwidth
+        self.delete_stats = DeleteStats()
 
     def upload_layer(self, layer: LayerConfig) -> List[S3FileInfo]:
-        """Upload files from the local override path to the layer's S3 location."""
+        """Upload files from the local override path to the layer's S3 location.
+
+        Files are uploaded concurrently; the returned list is sorted by S3 key.
+        Failures do not stop the other uploads and are reported together in a
+        single LocalOverrideError. With ``upload.sync`` only new or changed files
+        are uploaded, and ``clear_destination_before_upload`` deletes just the
+        keys that no longer exist locally, after the uploads have finished.
+        """
         if not layer.local_override_path:
             return []
 
@@ -38,52 +79,173 @@ class S3Uploader:
                 f"Local override path must be a directory for layer '{layer.name}': {base_path}"
             )
 
-        uploaded: List[S3FileInfo] = []
         prefix = layer.s3_prefix.rstrip("/")
         list_prefix = layer.s3_prefix
         if list_prefix and not list_prefix.endswith("/"):
             list_prefix = f"{list_prefix}/"
 
-        if layer.clear_destination_before_upload:
+        upload_cfg = self.config.get_upload_config() if self.config is not None else {}
+        sync = bool(upload_cfg.get("sync", False))
+        remote: Optional[Dict[str, Tuple[int, Optional[str]]]] = None
+        if sync:
+            remote = self._list_destination(layer, list_prefix)
+        elif layer.clear_destination_before_upload:
             self._clear_destination(layer, list_prefix)
 
-        for file_path in base_path.rglob("*"):
-            if not file_path.is_file():
-                continue
-
-            filename = file_path.name
-            if not layer.matches_filename(filename):
-                continue
+        candidates: List[Tuple[S3FileInfo, str, os.stat_result]] = []
+        for path, relative_key, stat, matched_pattern in self._scan_local_files(base_path, layer):
+            file_info = S3FileInfo(
+                bucket=layer.s3_bucket,
+                key=f"{prefix}/{relative_key}" if prefix else relative_key,
+                size=stat.st_size,
+                last_modified=int(stat.st_mtime),
+                layer_name=layer.name,
+                matched_pattern=matched_pattern,
+            )
+            candidates.append((file_info, path, stat))
+        candidates.sort(key=lambda candidate: candidate[0].key)
+        if not candidates:
+            raise LocalOverrideError(
+                f"No files in local override path matched layer '{layer.name}' patterns: {base_path}"
+            )
 
-            relative_key = file_path.relative_to(base_path).as_posix()
-            key = f"{prefix}/{relative_key}" if prefix else relative_key
+        index: Optional[LocalHashIndex] = None
+        if remote is not None:
+            index = LocalHashIndex(self._get_hash_index_path(upload_cfg))
+            index.load()
+        try:
+            uploaded = self._upload_files(layer, candidates, upload_cfg, remote, index)
+        finally:
+            if index is not None:
+                index.save()
 
-            try:
-                self.s3_client.upload_file(str(file_path), layer.s3_bucket, key)
-            except ClientError as exc:  # pragma: no cover - depends on AWS
-                raise S3AccessError(
-                    f"Unable to upload {file_path} to s3://{layer.s3_bucket}/{key}: {exc}"
-                ) from exc
-
-            stat = file_path.stat()
-            uploaded.append(
-                S3FileInfo(
-                    bucket=layer.s3_bucket,
-                    key=key,
-                    size=stat.st_size,
-                    last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                    layer_name=layer.name,
-                    matched_pattern=layer.get_matched_pattern(filename),
+        deleted = 0
+        if remote is not None and layer.clear_destination_before_upload:
+            local_keys = {file_info.key for file_info, _, _ in candidates}
+            gone = sorted(key for key in remote if key not in local_keys)
+            if gone:
+                LOGGER.info(
+                    "Deleting %s object(s) under s3://%s/%s that no longer exist locally",
+                    len(gone),
+                    layer.s3_bucket,
+                    list_prefix,
                 )
+                deleted = self._delete_keys(layer, list_prefix, gone).deleted
+        if remote is not None:
+            LOGGER.info(
+                "Layer '%s' upload sync: %s uploaded, %s unchanged, %s deleted",
+                layer.name,
+                uploaded,
+                len(candidates) - uploaded,
+                deleted,
             )
 
-        if not uploaded:
+        return [file_info for file_info, _, _ in candidates]
+
+    @staticmethod
+    def _scan_local_files(
+        base_path: Path, layer: LayerConfig
+    ) -> Iterator[Tuple[str, str, os.stat_result, str]]:
+        """Yield (path, relative key, stat, pattern) for matching files, statting each file once."""
+        stack = [(str(base_path), "")]
+        while stack:
+            directory, relative_dir = stack.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative = f"{relative_dir}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{relative}/"))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    matched_pattern = layer.match(entry.name)
+                    if matched_pattern is None:
+                        continue
+                    yield entry.path, relative, entry.stat(), matched_pattern
+
+    def _upload_files(
+        self,
+        layer: LayerConfig,
+        candidates: List[Tuple[S3FileInfo, str, os.stat_result]],
+        upload_cfg: Dict[str, Any],
+        remote: Optional[Dict[str, Tuple[int, Optional[str]]]] = None,
+        index: Optional[LocalHashIndex] = None,
+    ) -> int:
+        """Upload candidates concurrently and return how many were transferred.
+
+        With ``remote`` (sync mode) files whose size and content hash match the
+        listed object are left alone.
+        """
+        part_size = int(float(upload_cfg.get("part_size_mb", 16)) * _MB)
+        transfer_config = TransferConfig(
+            multipart_threshold=int(float(upload_cfg.get("multipart_threshold_mb", 64)) * _MB),
+            multipart_chunksize=part_size,
+            max_concurrency=int(upload_cfg.get("max_concurrency_per_file", 4)),
+        )
+        extra: Dict[str, Any] = {"Config": transfer_config}
+        if self.bandwidth is not None:
+            extra["Callback"] = self.bandwidth.consume
+
+        def transfer(file_info: S3FileInfo, path: str, stat: os.stat_result) -> bool:
+            if remote is not None and index is not None:
+                size, etag = remote.get(file_info.key, (None, None))
+                if size == file_info.size and etag and index.matches(path, stat, etag, part_size):
+                    file_info.etag = etag.strip('"')
+                    return False
+            self.s3_client.upload_file(path, layer.s3_bucket, file_info.key, **extra)
+            return True
+
+        uploaded = 0
+        failures: Dict[str, str] = {}
+        max_workers = max(min(int(upload_cfg.get("max_workers", 8)), len(candidates)), 1)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload") as executor:
+            future_map = {
+                executor.submit(transfer, file_info, path, stat): (file_info, path)
+                for file_info, path, stat in candidates
+            }
+            for future in as_completed(future_map):
+                file_info, path = future_map[future]
+                try:
+                    if future.result():
+                        uploaded += 1
+                except (ClientError, BotoCoreError, OSError) as exc:
+                    failures[file_info.key] = f"{path}: {exc}"
+
+        if failures:
+            details = "; ".join(failures[key] for key in sorted(failures)[:_MAX_REPORTED_FAILURES])
+            more = len(failures) - _MAX_REPORTED_FAILURES
+            if more > 0:
+                details += f"; ... and {more} more"
             raise LocalOverrideError(
-                f"No files in local override path matched layer '{layer.name}' patterns: {base_path}"
+                f"Failed to upload {len(failures)} of {len(candidates)} file(s) for layer "
+                f"'{layer.name}' to s3://{layer.s3_bucket}/{layer.s3_prefix}: {details}"
             )
-
         return uploaded
 
+    def _get_hash_index_path(self, upload_cfg: Dict[str, Any]) -> Path:
+        index_path = upload_cfg.get("hash_index")
+        if index_path:
+            return Path(index_path).resolve()
+        download_cfg = self.config.get_download_config() if self.config is not None else {}
+        base_dir = Path(download_cfg.get("local_base_dir", "./downloads")).resolve()
+        return base_dir / ".upload_hash_index.json"
+
+    def _list_destination(self, layer: LayerConfig, prefix: str) -> Dict[str, Tuple[int, Optional[str]]]:
+        """Return ``{key: (size, etag)}`` for the objects currently under the layer prefix."""
+        remote: Dict[str, Tuple[int, Optional[str]]] = {}
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=layer.s3_bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    key = obj.get("Key")
+                    if key:
+                        remote[key] = (obj.get("Size", 0), obj.get("ETag"))
+        except ClientError as exc:  # pragma: no cover - depends on AWS
+            raise S3AccessError(
+                f"Unable to list objects for s3://{layer.s3_bucket}/{prefix}: {exc}"
+            ) from exc
+        return remote
+
     def _clear_destination(self, layer: LayerConfig, prefix: str) -> None:
         """Remove existing objects beneath the layer's configured prefix before upload."""
         if not prefix:
@@ -97,28 +259,103 @@ class S3Uploader:
             prefix,
         )
 
+        self._delete_keys(layer, prefix, self._iter_keys(layer, prefix))
+
+    def _iter_keys(self, layer: LayerConfig, prefix: str) -> Iterator[str]:
         try:
             paginator = self.s3_client.get_paginator("list_objects_v2")
-            pages = paginator.paginate(Bucket=layer.s3_bucket, Prefix=prefix)
+            for page in paginator.paginate(Bucket=layer.s3_bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    if obj.get("Key"):
+                        yield obj["Key"]
         except ClientError as exc:  # pragma: no cover - depends on AWS
             raise S3AccessError(
                 f"Unable to list objects for s3://{layer.s3_bucket}/{prefix}: {exc}"
             ) from exc
 
-        for page in pages:
-            objects = page.get("Contents", [])
-            keys: List[Dict[str, str]] = [
-                {"Key": obj["Key"]} for obj in objects if obj.get("Key")
-            ]
-            if not keys:
-                continue
+    def _delete_keys(self, layer: LayerConfig, prefix: str, keys: Iterable[str]) -> DeleteStats:
+        """Delete ``keys`` in 1000-key DeleteObjects batches, several in flight at once.
+
+        Batches are submitted while ``keys`` is still being produced, so a live
+        listing and the deletes overlap. Keys reported in the response ``Errors``
+        are retried with backoff when the error is transient; any key that still
+        fails is reported in one S3AccessError once every batch has finished.
+        """
+        upload_cfg = self.config.get_upload_config() if self.config is not None else {}
+        workers = max(int(upload_cfg.get("delete_workers", 4)), 1)
+        retries = max(int(upload_cfg.get("delete_retries", 3)), 0)
+        stats = DeleteStats()
+        failures: Dict[str, str] = {}
+        started = time.monotonic()
+
+        def collect(done: Set[Future]) -> None:
+            for future in done:
+                pending.discard(future)
+                deleted, failed = future.result()
+                stats.deleted += deleted
+                failures.update(failed)
+
+        pending: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-delete") as executor:
+            batch: List[str] = []
+            for key in keys:
+                batch.append(key)
+                if len(batch) < _DELETE_BATCH_SIZE:
+                    continue
+                if len(pending) >= workers * 2:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                pending.add(executor.submit(self._delete_batch, layer.s3_bucket, batch, retries))
+                batch = []
+            if batch:
+                pending.add(executor.submit(self._delete_batch, layer.s3_bucket, batch, retries))
+            collect(wait(pending).done)
+
+        stats.failed = len(failures)
+        stats.duration_seconds = time.monotonic() - started
+        self.delete_stats.add(stats)
+        LOGGER.info(
+            "Deleted %s object(s) under s3://%s/%s in %.2fs",
+            stats.deleted,
+            layer.s3_bucket,
+            prefix,
+            stats.duration_seconds,
+        )
+        if failures:
+            details = "; ".join(
+                f"{key}: {failures[key]}" for key in sorted(failures)[:_MAX_REPORTED_FAILURES]
+            )
+            raise S3AccessError(
+                f"Unable to delete {len(failures)} object(s) for s3://{layer.s3_bucket}/{prefix}: {details}"
+            )
+        return stats
+
+    def _delete_batch(self, bucket: str, keys: List[str], retries: int) -> Tuple[int, Dict[str, str]]:
+        """Delete one batch; return the number deleted and ``{key: error}`` for keys that failed."""
+        remaining = keys
+        permanent: Dict[str, str] = {}  # non-retryable errors, kept across attempts
+        transient: Dict[str, str] = {}  # errors from the latest attempt that may still clear
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(min(_DELETE_RETRY_DELAY * 2 ** (attempt - 1), 10.0))
             try:
-                self.s3_client.delete_objects(
-                    Bucket=layer.s3_bucket,
-                    Delete={"Objects": keys, "Quiet": True},
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={"Objects": [{"Key": key} for key in remaining], "Quiet": True},
                 )
-            except ClientError as exc:  # pragma: no cover - depends on AWS
-                raise S3AccessError(
-                    "Unable to delete objects for "
-                    f"s3://{layer.s3_bucket}/{prefix}: {exc}"
-                ) from exc
+            except (ClientError, BotoCoreError) as exc:
+                transient = {key: str(exc) for key in remaining}
+                continue
+            transient = {}
+            for error in response.get("Errors", []):
+                key = error.get("Key", "")
+                code = error.get("Code", "")
+                message = f"{code} {error.get('Message', '')}".strip()
+                if code in _RETRYABLE_DELETE_ERRORS:
+                    transient[key] = message
+                else:
+                    permanent[key] = message
+            if not transient:
+                break
+            remaining = list(transient)
+        failed = {**permanent, **transient}
+        return len(keys) - len(failed), failed
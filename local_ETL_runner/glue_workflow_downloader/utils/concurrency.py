@@ -0,0 +1,44 @@
+"""Helpers for running per-layer work concurrently."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, TypeVar
+
+from ..exceptions import LayerCollectionError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_layers(
+    func: Callable[[T], R],
+    layers: Iterable[T],
+    max_workers: int,
+    name: Callable[[T], str] = lambda layer: getattr(layer, "name"),
+) -> Dict[str, R]:
+    """Apply ``func`` to every layer on a bounded pool, keyed by layer name in input order.
+
+    Every layer is processed even if some fail. A single failure is re-raised
+    unchanged; several failures are reported together as a LayerCollectionError.
+    """
+    items: List[T] = list(layers)
+    if not items:
+        return {}
+    workers = max(min(int(max_workers), len(items)), 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="layer") as executor:
+        futures = [(name(item), executor.submit(func, item)) for item in items]
+
+    results: Dict[str, R] = {}
+    errors: Dict[str, Exception] = {}
+    for layer_name, future in futures:
+        try:
+            results[layer_name] = future.result()
+        except Exception as exc:  # collected and reported together below
+            errors[layer_name] = exc
+
+    if len(errors) == 1:
+        raise next(iter(errors.values()))
+    if errors:
+        raise LayerCollectionError(errors)
+    return results
@@ -0,0 +1,398 @@
+"""Append-only local history of workflow runs and transfer figures."""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .progress import percentile
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    workflow_name TEXT NOT NULL,
+    run_id TEXT,
+    status TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    duration_seconds REAL,
+    total_files INTEGER,
+    successful INTEGER,
+    failed INTEGER,
+    skipped INTEGER,
+    bytes_transferred INTEGER,
+    download_seconds REAL,
+    throughput_mb_per_sec REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    run_pk INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    node_type TEXT,
+    run_state TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    duration_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (workflow_name, id);
+CREATE INDEX IF NOT EXISTS jobs_by_run ON jobs (run_pk);
+"""
+
+_COUNT_COLUMNS = ("total_files", "successful", "failed", "skipped", "bytes_transferred")
+
+
+@dataclass
+class RunRecord:
+    """One recorded run as read back from the history."""
+
+    id: int
+    recorded_at: str
+    workflow_name: str
+    run_id: Optional[str]
+    status: Optional[str]
+    started_at: Optional[str]
+    completed_at: Optional[str]
+    duration_seconds: Optional[float]
+    total_files: int
+    successful: int
+    failed: int
+    skipped: int
+    bytes_transferred: int
+    download_seconds: Optional[float]
+    throughput_mb_per_sec: Optional[float]
+
+
+@dataclass
+class JobTiming:
+    """Duration figures for one job across the runs considered."""
+
+    name: str
+    runs: int
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    max_seconds: Optional[float]
+    latest_seconds: Optional[float]
+
+
+@dataclass
+class Regression:
+    """A job (or the whole workflow) whose latest duration exceeds its baseline."""
+
+    name: str
+    latest_seconds: float
+    baseline_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.latest_seconds / self.baseline_seconds if self.baseline_seconds else float("inf")
+
+
+@dataclass
+class PathStep:
+    """A job on the critical path of a run."""
+
+    name: str
+    started_at: str
+    completed_at: str
+    duration_seconds: float
+
+
+class RunHistory:
+    """SQLite store of workflow runs, their job durations and download figures.
+
+    Rows are only ever inserted; analytics read the most recent runs of a
+    workflow. Each call opens its own connection so the store can be used from
+    worker threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    @classmethod
+    def from_config(cls, config) -> Optional["RunHistory"]:
+        """Return the history configured under ``history``, or None when disabled."""
+        history_cfg = config.get_history_config()
+        if not history_cfg.get("enabled"):
+            return None
+        path = history_cfg.get("path")
+        if not path:
+            base_dir = Path(config.get_download_config().get("local_base_dir", "./downloads"))
+            path = base_dir / ".run_history.sqlite"
+        return cls(Path(path).resolve())
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the database, committing on success and always closing it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path))
+        try:
+            connection.row_factory = sqlite3.Row
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def record(self, workflow_name: str, workflow_result=None, download_result=None) -> int:
+        """Append a run and its job timings; return the new row id."""
+        run_values: Dict[str, Any] = {
+            "recorded_at": _iso(datetime.now(timezone.utc)),
+            "workflow_name": workflow_name,
+        }
+        jobs: List[Dict[str, Any]] = []
+        if workflow_result is not None:
+            run_values.update(
+                run_id=workflow_result.run_id,
+                status=workflow_result.status,
+                started_at=_iso(workflow_result.start_time),
+                completed_at=_iso(workflow_result.end_time),
+                duration_seconds=workflow_result.duration_seconds,
+            )
+            jobs = [detail for detail in workflow_result.job_details if detail.get("name")]
+        if download_result is not None:
+            run_values.update(
+                total_files=download_result.total_files,
+                successful=download_result.successful,
+                failed=download_result.failed,
+                skipped=download_result.skipped,
+                bytes_transferred=download_result.bytes_transferred,
+                download_seconds=download_result.duration_seconds,
+                throughput_mb_per_sec=download_result.throughput_mb_per_sec,
+            )
+
+        columns = ", ".join(run_values)
+        placeholders = ", ".join("?" for _ in run_values)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})", tuple(run_values.values())
+            )
+            run_pk = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO jobs (run_pk, name, node_type, run_state, started_at, completed_at, duration_seconds)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_pk,
+                        job["name"],
+                        job.get("type"),
+                        job.get("run_state"),
+                        _iso(job.get("started_on")),
+                        _iso(job.get("completed_on")),
+                        job.get("duration_seconds"),
+                    )
+                    for job in jobs
+                ],
+            )
+        return run_pk
+
+    def workflow_names(self) -> List[str]:
+        """Names of every workflow with recorded runs."""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT DISTINCT workflow_name FROM runs ORDER BY workflow_name").fetchall()
+        return [row["workflow_name"] for row in rows]
+
+    def recent_runs(self, workflow_name: str, limit: int = 20) -> List[RunRecord]:
+        """Return up to ``limit`` runs of the workflow, oldest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM runs WHERE workflow_name = ? ORDER BY id DESC LIMIT ?",
+                (workflow_name, limit),
+            ).fetchall()
+        return [
+            RunRecord(**{**dict(row), **{key: row[key] or 0 for key in _COUNT_COLUMNS}})
+            for row in reversed(rows)
+        ]
+
+    def job_durations(self, run_pks: Iterable[int]) -> Dict[int, List[sqlite3.Row]]:
+        """Return the job rows of each run, keyed by run row id."""
+        run_pks = list(run_pks)
+        if not run_pks:
+            return {}
+        placeholders = ", ".join("?" for _ in run_pks)
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT * FROM jobs WHERE run_pk IN ({placeholders}) ORDER BY started_at", run_pks
+            ).fetchall()
+        grouped: Dict[int, List[sqlite3.Row]] = {pk: [] for pk in run_pks}
+        for row in rows:
+            grouped[row["run_pk"]].append(row)
+        return grouped
+
+    def job_timings(self, workflow_name: str, limit: int = 20) -> List[JobTiming]:
+        """p50/p95/max duration per job over the last ``limit`` runs, slowest p95 first."""
+        runs = self.recent_runs(workflow_name, limit)
+        per_job: Dict[str, List[float]] = {}
+        latest: Dict[str, float] = {}
+        for run_pk, jobs in self.job_durations(run.id for run in runs).items():
+            for job in jobs:
+                if job["duration_seconds"] is None:
+                    continue
+                per_job.setdefault(job["name"], []).append(job["duration_seconds"])
+                if runs and run_pk == runs[-1].id:
+                    latest[job["name"]] = job["duration_seconds"]
+        timings = []
+        for name, durations in per_job.items():
+            durations.sort()
+            timings.append(
+                JobTiming(
+                    name=name,
+                    runs=len(durations),
+                    p50_seconds=percentile(durations, 50),
+                    p95_seconds=percentile(durations, 95),
+                    max_seconds=durations[-1],
+                    latest_seconds=latest.get(name),
+                )
+            )
+        timings.sort(key=lambda timing: timing.p95_seconds or 0.0, reverse=True)
+        return timings
+
+    def regressions(
+        self, workflow_name: str, baseline_runs: int = 10, threshold: float = 1.25
+    ) -> List[Regression]:
+        """Compare the latest run with the median of the ``baseline_runs`` before it.
+
+        The workflow itself is reported under its own name alongside its jobs.
+        """
+        runs = self.recent_runs(workflow_name, baseline_runs + 1)
+        if len(runs) < 2:
+            return []
+        latest, baseline = runs[-1], runs[:-1]
+        found: List[Regression] = []
+
+        workflow_baseline = [run.duration_seconds for run in baseline if run.duration_seconds is not None]
+        if latest.duration_seconds is not None and workflow_baseline:
+            found.append(Regression(workflow_name, latest.duration_seconds, statistics.median(workflow_baseline)))
+
+        jobs = self.job_durations(run.id for run in runs)
+        baseline_jobs: Dict[str, List[float]] = {}
+        for run in baseline:
+            for job in jobs[run.id]:
+                if job["duration_seconds"] is not None:
+                    baseline_jobs.setdefault(job["name"], []).append(job["duration_seconds"])
+        for job in jobs[latest.id]:
+            history = baseline_jobs.get(job["name"])
+            if job["duration_seconds"] is not None and history:
+                found.append(Regression(job["name"], job["duration_seconds"], statistics.median(history)))
+
+        regressions = [item for item in found if item.ratio >= threshold]
+        regressions.sort(key=lambda item: item.latest_seconds - item.baseline_seconds, reverse=True)
+        return regressions
+
+    def critical_path(self, workflow_name: str) -> List[PathStep]:
+        """Reconstruct the chain of jobs that determined the latest run's end time.
+
+        The graph edges are not stored, so the path is inferred from timestamps:
+        starting at the job that finished last, each step goes back to the job
+        that finished most recently before the current one started.
+        """
+        runs = self.recent_runs(workflow_name, 1)
+        if not runs:
+            return []
+        jobs = [
+            job
+            for job in self.job_durations([runs[-1].id])[runs[-1].id]
+            if job["started_at"] and job["completed_at"]
+        ]
+        if not jobs:
+            return []
+        current = max(jobs, key=lambda job: job["completed_at"])
+        path = [current]
+        visited = {id(current)}
+        while True:
+            # A zero-length job finishes when it starts, so exclude jobs already on the path.
+            earlier = [
+                job for job in jobs if id(job) not in visited and job["completed_at"] <= current["started_at"]
+            ]
+            if not earlier:
+                break
+            current = max(earlier, key=lambda job: job["completed_at"])
+            path.append(current)
+            visited.add(id(current))
+        return [
+            PathStep(
+                name=job["name"],
+                started_at=job["started_at"],
+                completed_at=job["completed_at"],
+                duration_seconds=job["duration_seconds"] or 0.0,
+            )
+            for job in reversed(path)
+        ]
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """UTC ISO-8601 text, which sorts chronologically in SQLite."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}s"
+
+
+def format_history(
+    history: RunHistory,
+    workflow_name: str,
+    limit: int = 20,
+    baseline_runs: int = 10,
+    threshold: float = 1.25,
+) -> List[str]:
+    """Render trends, per-job percentiles, regressions and the critical path as text lines."""
+    runs = history.recent_runs(workflow_name, limit)
+    lines = [f"Workflow: {workflow_name} ({len(runs)} recent runs)", ""]
+    if not runs:
+        return lines + ["No runs recorded."]
+
+    lines.append("Recent Runs:")
+    for run in runs:
+        size_mb = run.bytes_transferred / (1024 * 1024)
+        throughput = run.throughput_mb_per_sec or 0.0
+        lines.append(
+            f"  {run.started_at or run.recorded_at}  {run.status or '-':<10} "
+            f"duration={_seconds(run.duration_seconds)}  files={run.total_files}  "
+            f"downloaded={size_mb:.1f} MB  throughput={throughput:.2f} MB/s"
+        )
+    durations = sorted(run.duration_seconds for run in runs if run.duration_seconds is not None)
+    if durations:
+        lines.append(
+            f"  Workflow duration p50={_seconds(percentile(durations, 50))} "
+            f"p95={_seconds(percentile(durations, 95))}"
+        )
+
+    lines.extend(["", "Job Durations (slowest p95 first):"])
+    timings = history.job_timings(workflow_name, limit)
+    if not timings:
+        lines.append("  No job timings recorded.")
+    for timing in timings:
+        lines.append(
+            f"  {timing.name:<40} runs={timing.runs:<4} p50={_seconds(timing.p50_seconds):<9} "
+            f"p95={_seconds(timing.p95_seconds):<9} max={_seconds(timing.max_seconds):<9} "
+            f"latest={_seconds(timing.latest_seconds)}"
+        )
+
+    lines.extend(["", f"Regressions (latest vs median of previous {baseline_runs}, >= {threshold:.2f}x):"])
+    regressions = history.regressions(workflow_name, baseline_runs, threshold)
+    if not regressions:
+        lines.append("  None.")
+    for item in regressions:
+        lines.append(
+            f"  {item.name:<40} latest={_seconds(item.latest_seconds):<9} "
+            f"baseline={_seconds(item.baseline_seconds):<9} ({item.ratio:.2f}x)"
+        )
+
+    lines.extend(["", "Critical Path (latest run):"])
+    path = history.critical_path(workflow_name)
+    if not path:
+        lines.append("  Not available.")
+    total = sum(step.duration_seconds for step in path)
+    for step in path:
+        share = step.duration_seconds / total * 100 if total else 0.0
+        lines.append(f"  {step.name:<40} {_seconds(step.duration_seconds):<9} ({share:.0f}% of path)")
+    return lines
@@ -2,14 +2,87 @@
 
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence, TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover - typing helper
     from tqdm import tqdm as _Tqdm
 
+_MB = 1024 * 1024
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(pct * len(sorted_values) / 100) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+@dataclass
+class LayerTransferStats:
+    """Achieved transfer figures for one layer."""
+
+    layer_name: str
+    files: int = 0
+    total_bytes: int = 0
+    bytes_transferred: int = 0
+    duration_seconds: float = 0.0
+    throughput_mb_per_sec: float = 0.0
+    latency_p50_seconds: Optional[float] = None
+    latency_p95_seconds: Optional[float] = None
+
+
+@dataclass
+class ProgressSnapshot:
+    """Point-in-time view of a ProgressTracker."""
+
+    total_files: int
+    completed: int
+    failed: int
+    skipped: int
+    total_bytes: int
+    bytes_transferred: int
+    elapsed_seconds: float
+    throughput_mb_per_sec: float
+    rate_mb_per_sec: float
+    latency_p50_seconds: Optional[float]
+    latency_p95_seconds: Optional[float]
+    layers: Dict[str, LayerTransferStats] = field(default_factory=dict)
+
+
+class _LayerProgress:
+    """Mutable per-layer counters kept by the tracker."""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.total_bytes = 0
+        self.bytes_transferred = 0
+        self.first_activity: Optional[float] = None
+        self.last_activity: Optional[float] = None
+        self.latencies = array("d")
+        self.bar: Optional["_Tqdm"] = None
+
+    def touch(self, now: float) -> None:
+        if self.first_activity is None:
+            self.first_activity = now
+        self.last_activity = now
+
 
 class ProgressTracker:
-    """Provides lightweight progress tracking with optional tqdm integration."""
+    """Provides lightweight progress tracking with optional tqdm integration.
+
+    Progress is measured in bytes: the main bar advances with every chunk
+    reported through ``add_bytes`` and each layer gets its own sub-bar. Files
+    that are skipped or fail settle their remaining bytes so the bars still
+    reach their totals. ``snapshot`` exposes the same figures programmatically.
+    """
+
+    RATE_INTERVAL = 1.0
 
     def __init__(self, description: str = "Downloading") -> None:
         self.description = description
@@ -17,8 +90,17 @@ class ProgressTracker:
         self.completed = 0
         self.failed = 0
         self.skipped = 0
+        self.total_bytes = 0
+        self.bytes_transferred = 0
+        self.rate_mb_per_sec = 0.0
         self._bar: Optional["_Tqdm"] = None
         self._tqdm_factory = self._lazy_load_tqdm()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._rate_window_start = self._started
+        self._rate_window_bytes = 0
+        self._layers: Dict[str, _LayerProgress] = {}
+        self._latencies = array("d")
 
     @staticmethod
     def _lazy_load_tqdm():
@@ -29,31 +111,197 @@ class ProgressTracker:
         except ImportError:  # pragma: no cover - optional dependency
             return None
 
-    def start(self, total: int) -> None:
+    def start(
+        self,
+        total: int,
+        total_bytes: int = 0,
+        layer_bytes: Optional[Mapping[str, int]] = None,
+    ) -> None:
         self.total = total
         self.completed = 0
         self.failed = 0
         self.skipped = 0
+        self.total_bytes = total_bytes
+        self.bytes_transferred = 0
+        self.rate_mb_per_sec = 0.0
+        self._started = time.monotonic()
+        self._rate_window_start = self._started
+        self._rate_window_bytes = 0
+        self._layers = {}
+        self._latencies = array("d")
         if self._tqdm_factory is not None:
-            self._bar = self._tqdm_factory(total=total, desc=self.description, unit="file")
+            self._bar = self._tqdm_factory(
+                total=total_bytes,
+                desc=self.description,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+            )
+        for layer_name, size in (layer_bytes or {}).items():
+            self._layer(layer_name).total_bytes = size
+            self._refresh_layer_total(layer_name)
+
+    def add_total(self, count: int, size: int = 0, layer_name: Optional[str] = None) -> None:
+        """Grow the expected totals while work is still being discovered."""
+        with self._lock:
+            self.total += count
+            self.total_bytes += size
+            if self._bar is not None:
+                self._bar.total = self.total_bytes
+            if layer_name is not None:
+                self._layer(layer_name).total_bytes += size
+                self._refresh_layer_total(layer_name)
+
+    def begin_file(self, layer_name: str) -> None:
+        """Note that a transfer for ``layer_name`` started; layer durations count from here."""
+        with self._lock:
+            self._layer(layer_name).touch(time.monotonic())
 
-    def advance(self) -> None:
-        self.completed += 1
-        self._advance_bar()
+    def add_bytes(self, count: int, layer_name: Optional[str] = None) -> None:
+        """Record transferred bytes and refresh the live MB/s rate about once per second."""
+        with self._lock:
+            now = time.monotonic()
+            self.bytes_transferred += count
+            self._update_bars(count, layer_name, now)
+            self._rate_window_bytes += count
+            elapsed = now - self._rate_window_start
+            if elapsed < self.RATE_INTERVAL:
+                return
+            self.rate_mb_per_sec = self._rate_window_bytes / elapsed / _MB
+            self._rate_window_start = now
+            self._rate_window_bytes = 0
+            if self._bar is not None:
+                self._bar.set_postfix_str(self._postfix(), refresh=False)
 
-    def skip(self) -> None:
-        self.skipped += 1
-        self._advance_bar()
+    def discard_bytes(self, count: int, layer_name: Optional[str] = None) -> None:
+        """Take back bytes of a failed attempt that will be transferred again."""
+        with self._lock:
+            self.bytes_transferred -= count
+            self._rate_window_bytes = max(self._rate_window_bytes - count, 0)
+            self._update_bars(-count, layer_name, time.monotonic())
 
-    def fail(self) -> None:
-        self.failed += 1
-        self._advance_bar()
+    def advance(
+        self,
+        layer_name: Optional[str] = None,
+        size: int = 0,
+        transferred: int = 0,
+        seconds: Optional[float] = None,
+    ) -> None:
+        """Mark a file as downloaded, recording its latency when known."""
+        with self._lock:
+            self.completed += 1
+            self._settle(layer_name, size, transferred)
+            if seconds is not None:
+                self._latencies.append(seconds)
+                if layer_name is not None:
+                    self._layer(layer_name).latencies.append(seconds)
+
+    def skip(self, layer_name: Optional[str] = None, size: int = 0, transferred: int = 0) -> None:
+        with self._lock:
+            self.skipped += 1
+            self._settle(layer_name, size, transferred)
+
+    def fail(self, layer_name: Optional[str] = None, size: int = 0, transferred: int = 0) -> None:
+        with self._lock:
+            self.failed += 1
+            self._settle(layer_name, size, transferred)
 
     def finish(self) -> None:
+        with self._lock:
+            for layer in self._layers.values():
+                if layer.bar is not None:
+                    layer.bar.close()
+                    layer.bar = None
+            if self._bar is not None:
+                self._bar.set_postfix_str(self._postfix(), refresh=False)
+                self._bar.close()
+                self._bar = None
+
+    def snapshot(self) -> ProgressSnapshot:
+        """Return the current counters, throughput and latency percentiles."""
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            layers = {name: self._layer_stats(name, layer) for name, layer in self._layers.items()}
+            return ProgressSnapshot(
+                total_files=self.total,
+                completed=self.completed,
+                failed=self.failed,
+                skipped=self.skipped,
+                total_bytes=self.total_bytes,
+                bytes_transferred=self.bytes_transferred,
+                elapsed_seconds=elapsed,
+                throughput_mb_per_sec=self.bytes_transferred / elapsed / _MB if elapsed > 0 else 0.0,
+                rate_mb_per_sec=self.rate_mb_per_sec,
+                latency_p50_seconds=percentile(latencies, 50),
+                latency_p95_seconds=percentile(latencies, 95),
+                layers=layers,
+            )
+
+    @staticmethod
+    def _layer_stats(name: str, layer: _LayerProgress) -> LayerTransferStats:
+        duration = 0.0
+        if layer.first_activity is not None and layer.last_activity is not None:
+            duration = layer.last_activity - layer.first_activity
+        latencies = sorted(layer.latencies)
+        return LayerTransferStats(
+            layer_name=name,
+            files=layer.files,
+            total_bytes=layer.total_bytes,
+            bytes_transferred=layer.bytes_transferred,
+            duration_seconds=duration,
+            throughput_mb_per_sec=layer.bytes_transferred / duration / _MB if duration > 0 else 0.0,
+            latency_p50_seconds=percentile(latencies, 50),
+            latency_p95_seconds=percentile(latencies, 95),
+        )
+
+    def _layer(self, layer_name: str) -> _LayerProgress:
+        layer = self._layers.get(layer_name)
+        if layer is None:
+            layer = self._layers[layer_name] = _LayerProgress()
+        return layer
+
+    def _refresh_layer_total(self, layer_name: str) -> None:
+        if self._tqdm_factory is None or self._bar is None:
+            return
+        layer = self._layers[layer_name]
+        if layer.bar is None:
+            layer.bar = self._tqdm_factory(
+                total=layer.total_bytes,
+                desc=f"  {layer_name}",
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                position=len(self._layers),
+                leave=False,
+            )
+        else:
+            layer.bar.total = layer.total_bytes
+
+    def _settle(self, layer_name: Optional[str], size: int, transferred: int) -> None:
+        """Count a finished file and move the bars past bytes that were never transferred."""
+        now = time.monotonic()
+        if layer_name is not None:
+            layer = self._layer(layer_name)
+            layer.files += 1
+            layer.touch(now)
+            if layer.bar is not None and size > transferred:
+                layer.bar.update(size - transferred)
         if self._bar is not None:
-            self._bar.close()
-            self._bar = None
+            if size > transferred:
+                self._bar.update(size - transferred)
+            self._bar.set_postfix_str(self._postfix(), refresh=False)
 
-    def _advance_bar(self) -> None:
+    def _update_bars(self, count: int, layer_name: Optional[str], now: float) -> None:
+        if layer_name is not None:
+            layer = self._layer(layer_name)
+            layer.bytes_transferred += count
+            layer.touch(now)
+            if layer.bar is not None:
+                layer.bar.update(count)
         if self._bar is not None:
-            self._bar.update(1)
+            self._bar.update(count)
+
+    def _postfix(self) -> str:
+        done = self.completed + self.skipped + self.failed
+        return f"{done}/{self.total} files, {self.rate_mb_per_sec:.1f} MB/s"
@@ -2,61 +2,180 @@
 
 from __future__ import annotations
 
+import csv
+import gzip
 import json
 import logging
+import os
+from contextlib import ExitStack
+from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, TextIO
 
 from ..config import ConfigManager, LayerConfig
-from ..s3.file_collector import S3FileInfo
 from ..s3.downloader import DownloadResult
+from ..s3.file_info import FileGroup, iter_rows, total_size
 from ..workflow.workflow_executor import WorkflowRunResult
 
 LOGGER = logging.getLogger(__name__)
 
+_MB = 1024 * 1024
+_MANIFEST_COLUMNS = ["layer", "s3_uri", "filename", "size_bytes", "last_modified", "matched_pattern", "etag"]
+_PARQUET_BATCH_ROWS = 65536
+
 
 class ReportGenerator:
-    """Produces human-readable and JSON reports summarising a run."""
+    """Produces human-readable and JSON reports summarising a run.
+
+    Reports are streamed: each layer's files are visited once and written to the
+    text report, the JSON (or JSON Lines) report and the optional manifest as
+    they are read, so memory use does not grow with the number of files.
+    """
 
     def generate(
         self,
         download_result: DownloadResult,
         workflow_result: Optional[WorkflowRunResult],
         config: ConfigManager,
-        files: Dict[str, List[S3FileInfo]],
+        files: Mapping[str, FileGroup],
         config_path: Optional[str] = None,
+        name_suffix: Optional[str] = None,
     ) -> Dict[str, Path]:
         output_dir = Path(config.get_download_config().get("local_base_dir", "./downloads")).resolve()
         output_dir.mkdir(parents=True, exist_ok=True)
+        report_cfg = config.get_report_config()
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         base_name = f"report_{timestamp}"
-        text_path = output_dir / f"{base_name}.txt"
-        json_path = output_dir / f"{base_name}.json"
+        if name_suffix:
+            base_name = f"{base_name}_{name_suffix}"
+        json_lines = report_cfg.get("format") == "jsonl"
+        paths = {
+            "text": output_dir / f"{base_name}.txt",
+            "json": output_dir / f"{base_name}.{'jsonl' if json_lines else 'json'}",
+        }
 
         layers = {layer.name: layer for layer in config.get_layers()}
+        summary_only = bool(report_cfg.get("summary_only"))
 
-        text_content = self._build_text_report(
-            download_result, workflow_result, layers, files, config_path
-        )
-        json_content = self._build_json_report(
-            download_result, workflow_result, layers, files, config_path, str(output_dir)
-        )
+        with ExitStack() as stack:
+            text = _TextWriter(stack.enter_context(paths["text"].open("w", encoding="utf-8")))
+            json_file = stack.enter_context(paths["json"].open("w", encoding="utf-8"))
+            json_writer = _JsonLinesWriter(json_file) if json_lines else _JsonWriter(json_file)
+            manifest = _open_manifest(report_cfg.get("manifest"), output_dir / f"{base_name}_manifest")
+            if manifest is not None:
+                stack.callback(manifest.close)
+                paths["manifest"] = manifest.path
 
-        text_path.write_text(text_content, encoding="utf-8")
-        json_path.write_text(json.dumps(json_content, default=self._json_serializer, indent=2), encoding="utf-8")
+            self._write_text_header(text, download_result, workflow_result, config_path)
+            json_writer.begin(
+                {
+                    "generated_at": datetime.now(timezone.utc),
+                    "config_file": config_path,
+                    "output_directory": str(output_dir),
+                    "summary": self._summary(download_result),
+                },
+                self._workflow(workflow_result),
+            )
+
+            text.lines(["Per Layer Details", "-" * 80])
+            for layer_name, layer_config in layers.items():
+                layer_files = files.get(layer_name, [])
+                self._write_layer(
+                    text,
+                    json_writer,
+                    manifest,
+                    layer_config,
+                    layer_files,
+                    download_result,
+                    summary_only,
+                )
+
+            self._write_text_footer(text, download_result)
+            json_writer.finish(
+                [
+                    {"s3_uri": info.get_s3_uri(), "message": message}
+                    for info, message in download_result.failed_files
+                ],
+                list(download_result.stale_files),
+            )
 
-        LOGGER.info("Generated reports: %s, %s", text_path, json_path)
-        return {"text": text_path, "json": json_path}
+        LOGGER.info("Generated reports: %s", ", ".join(str(path) for path in paths.values()))
+        return paths
 
-    def _build_text_report(
+    def _write_layer(
         self,
+        text: "_TextWriter",
+        json_writer: "_JsonWriter",
+        manifest: Optional["_Manifest"],
+        layer_config: LayerConfig,
+        layer_files: FileGroup,
+        download_result: DownloadResult,
+        summary_only: bool,
+    ) -> None:
+        layer_name = layer_config.name
+        size_mb = total_size(layer_files) / _MB
+        stats = download_result.layer_stats.get(layer_name)
+
+        lines = [
+            f"[{layer_config.display_name}]",
+            f"Bucket: {layer_config.s3_bucket}",
+            f"Prefix: {layer_config.s3_prefix}",
+            f"File Count: {len(layer_files)}",
+            f"Total Size (MB): {size_mb:.2f}",
+        ]
+        if stats is not None:
+            lines.append(f"Throughput (MB/s): {stats.throughput_mb_per_sec:.2f}")
+            if stats.latency_p50_seconds is not None:
+                lines.append(
+                    f"Latency p50/p95 (s): {stats.latency_p50_seconds:.3f} / "
+                    f"{stats.latency_p95_seconds:.3f}"
+                )
+        if not summary_only:
+            lines.append("Files:")
+        text.lines(lines)
+
+        json_writer.begin_layer(
+            {
+                "name": layer_name,
+                "display_name": layer_config.display_name,
+                "s3_bucket": layer_config.s3_bucket,
+                "s3_prefix": layer_config.s3_prefix,
+                "file_count": len(layer_files),
+                "total_size_mb": size_mb,
+                "transfer": asdict(stats) if stats is not None else None,
+            }
+        )
+        uri_prefix = f"s3://{layer_config.s3_bucket}/"
+        for idx, (key, size, timestamp, pattern, etag) in enumerate(iter_rows(layer_files), start=1):
+            filename = os.path.basename(key)
+            s3_uri = uri_prefix + key
+            file_mb = size / _MB
+            last_modified = datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+            if not summary_only:
+                text.line(f"  {idx}. {filename} ({file_mb:.2f} MB) -> {s3_uri}")
+            json_writer.file(
+                layer_name,
+                {
+                    "filename": filename,
+                    "s3_uri": s3_uri,
+                    "size_mb": file_mb,
+                    "last_modified": last_modified,
+                    "matched_pattern": pattern,
+                },
+            )
+            if manifest is not None:
+                manifest.write([layer_name, s3_uri, filename, size, last_modified, pattern, etag])
+        json_writer.end_layer()
+        text.line("")
+
+    @staticmethod
+    def _write_text_header(
+        text: "_TextWriter",
         download_result: DownloadResult,
         workflow_result: Optional[WorkflowRunResult],
-        layers: Dict[str, LayerConfig],
-        files: Dict[str, List[S3FileInfo]],
         config_path: Optional[str],
-    ) -> str:
+    ) -> None:
         lines: List[str] = []
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         lines.append("=" * 80)
@@ -84,27 +203,18 @@ class ReportGenerator:
         lines.append(f"Skipped: {download_result.skipped}")
         lines.append(f"Total Size (MB): {download_result.total_size_mb:.2f}")
         lines.append(f"Duration (s): {download_result.duration_seconds:.2f}")
+        lines.append(f"Transferred (MB): {download_result.bytes_transferred / _MB:.2f}")
+        lines.append(f"Throughput (MB/s): {download_result.throughput_mb_per_sec:.2f}")
         lines.append(f"Success Rate (%): {download_result.get_success_rate():.2f}")
+        if download_result.deleted_objects:
+            lines.append(f"Deleted S3 Objects: {download_result.deleted_objects}")
+            lines.append(f"Delete Duration (s): {download_result.delete_duration_seconds:.2f}")
         lines.append("")
+        text.lines(lines)
 
-        lines.append("Per Layer Details")
-        lines.append("-" * 80)
-        for layer_name, layer_config in layers.items():
-            layer_files = files.get(layer_name, [])
-            total_size = sum(file_info.get_size_mb() for file_info in layer_files)
-            lines.append(f"[{layer_config.display_name}]")
-            lines.append(f"Bucket: {layer_config.s3_bucket}")
-            lines.append(f"Prefix: {layer_config.s3_prefix}")
-            lines.append(f"File Count: {len(layer_files)}")
-            lines.append(f"Total Size (MB): {total_size:.2f}")
-            lines.append("Files:")
-            for idx, file_info in enumerate(layer_files, start=1):
-                lines.append(
-                    f"  {idx}. {file_info.get_filename()} ({file_info.get_size_mb():.2f} MB) "
-                    f"-> {file_info.get_s3_uri()}"
-                )
-            lines.append("")
-
+    @staticmethod
+    def _write_text_footer(text: "_TextWriter", download_result: DownloadResult) -> None:
+        lines: List[str] = []
         if download_result.failed_files:
             lines.append("Failed Downloads")
             lines.append("-" * 80)
@@ -112,77 +222,48 @@ class ReportGenerator:
                 lines.append(f"- {file_info.get_s3_uri()} :: {message}")
             lines.append("")
 
-        return "\n".join(lines)
+        if download_result.stale_files:
+            lines.append("Local Files Missing From S3")
+            lines.append("-" * 80)
+            for local_path in download_result.stale_files:
+                lines.append(f"- {local_path}")
+            lines.append("")
+        text.lines(lines)
 
-    def _build_json_report(
-        self,
-        download_result: DownloadResult,
-        workflow_result: Optional[WorkflowRunResult],
-        layers: Dict[str, LayerConfig],
-        files: Dict[str, List[S3FileInfo]],
-        config_path: Optional[str],
-        output_directory: str,
-    ) -> Dict[str, object]:
-        report: Dict[str, object] = {
-            "generated_at": datetime.now(timezone.utc),
-            "config_file": config_path,
-            "output_directory": output_directory,
-            "summary": {
-                "total_files": download_result.total_files,
-                "successful": download_result.successful,
-                "failed": download_result.failed,
-                "skipped": download_result.skipped,
-                "total_size_mb": download_result.total_size_mb,
-                "duration_seconds": download_result.duration_seconds,
-                "success_rate": download_result.get_success_rate(),
-            },
-            "layers": [],
-            "failed_files": [
-                {"s3_uri": info.get_s3_uri(), "message": message}
-                for info, message in download_result.failed_files
-            ],
+    @staticmethod
+    def _summary(download_result: DownloadResult) -> Dict[str, object]:
+        return {
+            "total_files": download_result.total_files,
+            "successful": download_result.successful,
+            "failed": download_result.failed,
+            "skipped": download_result.skipped,
+            "total_size_mb": download_result.total_size_mb,
+            "duration_seconds": download_result.duration_seconds,
+            "bytes_transferred": download_result.bytes_transferred,
+            "throughput_mb_per_sec": download_result.throughput_mb_per_sec,
+            "success_rate": download_result.get_success_rate(),
+            "deleted_objects": download_result.deleted_objects,
+            "delete_duration_seconds": download_result.delete_duration_seconds,
         }
 
-        if workflow_result is not None:
-            report["workflow"] = {
-                "name": workflow_result.workflow_name,
-                "run_id": workflow_result.run_id,
-                "status": workflow_result.status,
-                "start_time": workflow_result.start_time,
-                "end_time": workflow_result.end_time,
-                "duration_seconds": workflow_result.duration_seconds,
-                "completed_jobs": workflow_result.completed_jobs,
-                "failed_jobs": workflow_result.failed_jobs,
-                "total_jobs": workflow_result.total_jobs,
-                "success_rate": workflow_result.get_success_rate(),
-                "error_message": workflow_result.error_message,
-                "job_details": workflow_result.job_details,
-            }
-
-        for layer_name, layer_config in layers.items():
-            layer_files = files.get(layer_name, [])
-            report["layers"].append(
-                {
-                    "name": layer_name,
-                    "display_name": layer_config.display_name,
-                    "s3_bucket": layer_config.s3_bucket,
-                    "s3_prefix": layer_config.s3_prefix,
-                    "file_count": len(layer_files),
-                    "total_size_mb": sum(file_info.get_size_mb() for file_info in layer_files),
-                    "files": [
-                        {
-                            "filename": file_info.get_filename(),
-                            "s3_uri": file_info.get_s3_uri(),
-                            "size_mb": file_info.get_size_mb(),
-                            "last_modified": file_info.last_modified,
-                            "matched_pattern": file_info.matched_pattern,
-                        }
-                        for file_info in layer_files
-                    ],
-                }
-            )
-
-        return report
+    @staticmethod
+    def _workflow(workflow_result: Optional[WorkflowRunResult]) -> Optional[Dict[str, object]]:
+        if workflow_result is None:
+            return None
+        return {
+            "name": workflow_result.workflow_name,
+            "run_id": workflow_result.run_id,
+            "status": workflow_result.status,
+            "start_time": workflow_result.start_time,
+            "end_time": workflow_result.end_time,
+            "duration_seconds": workflow_result.duration_seconds,
+            "completed_jobs": workflow_result.completed_jobs,
+            "failed_jobs": workflow_result.failed_jobs,
+            "total_jobs": workflow_result.total_jobs,
+            "success_rate": workflow_result.get_success_rate(),
+            "error_message": workflow_result.error_message,
+            "job_details": workflow_result.job_details,
+        }
 
     @staticmethod
     def _json_serializer(value):
@@ -193,3 +274,160 @@ class ReportGenerator:
         if isinstance(value, Path):
             return str(value)
         raise TypeError(f"Object of type {type(value)!r} is not JSON serialisable")
+
+
+_COMPACT_ENCODER = json.JSONEncoder(default=ReportGenerator._json_serializer)
+
+
+def _dumps(value: Any, indent: Optional[int] = None) -> str:
+    if indent is None:
+        return _COMPACT_ENCODER.encode(value)  # reused: json.dumps builds an encoder per call
+    return json.dumps(value, default=ReportGenerator._json_serializer, indent=indent)
+
+
+class _TextWriter:
+    """Writes lines separated by newlines, matching ``"\\n".join`` of the same lines."""
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+        self._separator = ""
+
+    def line(self, value: str) -> None:
+        self.out.write(self._separator + value)
+        self._separator = "\n"
+
+    def lines(self, values: List[str]) -> None:
+        for value in values:
+            self.line(value)
+
+
+class _JsonWriter:
+    """Writes the JSON report incrementally, one line per file entry.
+
+    The document has the same structure as a fully built report; only the file
+    entries are written compactly instead of pretty-printed.
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+        self._first_layer = True
+        self._first_file = True
+
+    def begin(self, head: Dict[str, object], workflow: Optional[Dict[str, object]]) -> None:
+        if workflow is not None:
+            head = {**head, "workflow": workflow}
+        body = _dumps(head, indent=2)
+        self.out.write(body[:-2] + ',\n  "layers": [')
+
+    def begin_layer(self, layer: Dict[str, object]) -> None:
+        prefix = "\n    " if self._first_layer else ",\n    "
+        self._first_layer = False
+        self._first_file = True
+        self.out.write(prefix + _dumps(layer)[:-1] + ', "files": [')
+
+    def file(self, layer_name: str, entry: Dict[str, object]) -> None:
+        prefix = "\n      " if self._first_file else ",\n      "
+        self._first_file = False
+        self.out.write(prefix + _dumps(entry))
+
+    def end_layer(self) -> None:
+        self.out.write("]}" if self._first_file else "\n    ]}")
+
+    def finish(self, failed_files: List[Dict[str, object]], stale_files: List[str]) -> None:
+        closing = "]" if self._first_layer else "\n  ]"
+        tail = _dumps({"failed_files": failed_files, "stale_files": stale_files}, indent=2)
+        self.out.write(closing + ",\n" + tail[2:] + "\n")
+
+
+class _JsonLinesWriter(_JsonWriter):
+    """Writes the report as JSON Lines: one typed record per line."""
+
+    def begin(self, head: Dict[str, object], workflow: Optional[Dict[str, object]]) -> None:
+        self._record("report", head)
+        if workflow is not None:
+            self._record("workflow", workflow)
+
+    def begin_layer(self, layer: Dict[str, object]) -> None:
+        self._record("layer", layer)
+
+    def file(self, layer_name: str, entry: Dict[str, object]) -> None:
+        self._record("file", {"layer": layer_name, **entry})
+
+    def end_layer(self) -> None:
+        return None
+
+    def finish(self, failed_files: List[Dict[str, object]], stale_files: List[str]) -> None:
+        for entry in failed_files:
+            self._record("failed_file", entry)
+        for local_path in stale_files:
+            self._record("stale_file", {"local_path": local_path})
+
+    def _record(self, record_type: str, payload: Dict[str, object]) -> None:
+        self.out.write(_dumps({"type": record_type, **payload}) + "\n")
+
+
+class _Manifest:
+    """Gzip-compressed CSV listing of every reported file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(_MANIFEST_COLUMNS)
+
+    def write(self, row: List[object]) -> None:
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetManifest(_Manifest):
+    """Parquet listing of every reported file, written in row batches."""
+
+    def __init__(self, path: Path, pa, pq) -> None:
+        self.path = path
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("layer", pa.string()),
+                ("s3_uri", pa.string()),
+                ("filename", pa.string()),
+                ("size_bytes", pa.int64()),
+                ("last_modified", pa.string()),
+                ("matched_pattern", pa.string()),
+                ("etag", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema, compression="snappy")
+        self._batch: List[List[object]] = []
+
+    def write(self, row: List[object]) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= _PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        columns = list(zip(*self._batch))
+        self._writer.write_table(self._pa.Table.from_arrays([list(column) for column in columns], schema=self._schema))
+        self._batch = []
+
+
+def _open_manifest(manifest_format: Optional[str], base_path: Path) -> Optional[_Manifest]:
+    if not manifest_format:
+        return None
+    if manifest_format == "parquet":
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError:  # pragma: no cover - optional dependency
+            LOGGER.warning("pyarrow is not installed; writing the manifest as gzip CSV instead")
+        else:
+            return _ParquetManifest(base_path.with_name(base_path.name + ".parquet"), pa, pq)
+    return _Manifest(base_path.with_name(base_path.name + ".csv.gz"))
@@ -0,0 +1,48 @@
+"""Bandwidth throttling helpers shared by uploads and downloads."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_MB = 1024 * 1024
+
+
+class TokenBucket:
+    """Process-wide byte budget refilled at a fixed rate.
+
+    ``consume`` never rejects a request: it takes the tokens immediately and, if
+    that leaves the bucket in debt, sleeps until the debt would have been repaid.
+    Threads transferring in parallel therefore share the rate between them.
+    """
+
+    def __init__(self, rate_bytes_per_sec: float, burst_bytes: Optional[float] = None) -> None:
+        if rate_bytes_per_sec <= 0:
+            raise ValueError("rate_bytes_per_sec must be positive")
+        self.rate = float(rate_bytes_per_sec)
+        self.capacity = float(burst_bytes) if burst_bytes else self.rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, download_cfg: Dict[str, Any]) -> Optional["TokenBucket"]:
+        """Build a bucket from ``max_bandwidth_mb_per_sec``; None means unlimited."""
+        limit = download_cfg.get("max_bandwidth_mb_per_sec")
+        if not limit:
+            return None
+        return cls(float(limit) * _MB)
+
+    def consume(self, amount: int) -> None:
+        """Block until ``amount`` bytes may be transferred."""
+        if amount <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
@@ -3,5 +3,14 @@
 from .workflow_validator import WorkflowValidator
 from .workflow_executor import WorkflowExecutor, WorkflowRunResult
 from .workflow_manager import WorkflowManager
+from .orchestrator import WorkflowOrchestrator, WorkflowOutcome, WorkflowTarget
 
-__all__ = ["WorkflowValidator", "WorkflowExecutor", "WorkflowRunResult", "WorkflowManager"]
+__all__ = [
+    "WorkflowValidator",
+    "WorkflowExecutor",
+    "WorkflowRunResult",
+    "WorkflowManager",
+    "WorkflowOrchestrator",
+    "WorkflowOutcome",
+    "WorkflowTarget",
+]
@@ -0,0 +1,133 @@
+"""Running several Glue workflows side by side."""
+
+from __future__ import annotations
+
+import logging
+import queue
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..exceptions import GlueWorkflowDownloaderError, WorkflowTimeoutError
+from .status_poller import RESULT_GRACE_SECONDS
+from .workflow_executor import WorkflowExecutor, WorkflowRunResult
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowTarget:
+    """A workflow to run and the post-execution layers that belong to it."""
+
+    name: str
+    layers: Optional[List[str]] = None  # None means every post-execution layer
+
+    @classmethod
+    def from_entry(cls, entry: Any) -> "WorkflowTarget":
+        """Build a target from a ``workflow.workflows`` entry (a name or a mapping)."""
+        if isinstance(entry, str):
+            return cls(name=entry)
+        layers = entry.get("layers")
+        return cls(name=entry["name"], layers=list(layers) if layers is not None else None)
+
+
+@dataclass
+class WorkflowOutcome:
+    """How one orchestrated workflow ended."""
+
+    target: WorkflowTarget
+    run_id: Optional[str] = None
+    result: Optional[WorkflowRunResult] = None
+    error: Optional[GlueWorkflowDownloaderError] = None
+
+    def is_successful(self) -> bool:
+        return self.error is None
+
+
+class WorkflowOrchestrator:
+    """Starts workflows under a concurrency limit and waits on them through one shared poller.
+
+    ``on_complete`` is called from the calling thread as soon as each run reaches a
+    terminal state (or fails to start or times out), so callers can hand follow-up
+    work to their own pool without waiting for the rest of the batch.
+    ``polling_interval`` is the longest gap between status polls of a run.
+    """
+
+    def __init__(
+        self,
+        executor: WorkflowExecutor,
+        *,
+        max_concurrent: int = 4,
+        timeout: int = 3600,
+        polling_interval: int = 30,
+    ) -> None:
+        self.executor = executor
+        self.max_concurrent = max(int(max_concurrent), 1)
+        self.timeout = timeout
+        self.polling_interval = polling_interval
+
+    def run(
+        self,
+        targets: Iterable[WorkflowTarget],
+        on_complete: Optional[Callable[[WorkflowOutcome], None]] = None,
+    ) -> List[WorkflowOutcome]:
+        """Run every target and return their outcomes in completion order."""
+        pending: Deque[WorkflowTarget] = deque(targets)
+        active: Dict[str, Tuple[WorkflowOutcome, Future]] = {}
+        done: "queue.Queue[str]" = queue.Queue()
+        outcomes: List[WorkflowOutcome] = []
+
+        def finish(outcome: WorkflowOutcome) -> None:
+            outcomes.append(outcome)
+            if on_complete is not None:
+                on_complete(outcome)
+
+        while pending or active:
+            while pending and len(active) < self.max_concurrent:
+                target = pending.popleft()
+                try:
+                    run_id = self.executor.execute_workflow(target.name)
+                except GlueWorkflowDownloaderError as exc:
+                    LOGGER.error("Workflow '%s' could not be started: %s", target.name, exc)
+                    finish(WorkflowOutcome(target, error=exc))
+                    continue
+                LOGGER.info("Workflow '%s' started with run id %s", target.name, run_id)
+                future = self.executor.poller.watch(
+                    target.name, run_id, self.timeout, max_interval=max(self.polling_interval, 1)
+                )
+                active[run_id] = (WorkflowOutcome(target, run_id=run_id), future)
+                future.add_done_callback(lambda _, run_id=run_id: done.put(run_id))
+            if not active:
+                continue
+
+            try:
+                run_id = done.get(timeout=max(self.timeout, 0) + RESULT_GRACE_SECONDS)
+            except queue.Empty:
+                # The poller stopped resolving runs; give up on everything still active.
+                for outcome, _ in active.values():
+                    outcome.error = WorkflowTimeoutError(
+                        f"Workflow '{outcome.target.name}' run '{outcome.run_id}' did not complete "
+                        f"within {self.timeout} seconds."
+                    )
+                    LOGGER.error("%s", outcome.error)
+                    finish(outcome)
+                active.clear()
+                continue
+            outcome, future = active.pop(run_id)
+            self._resolve(outcome, future)
+            finish(outcome)
+        return outcomes
+
+    def _resolve(self, outcome: WorkflowOutcome, future: Future) -> None:
+        """Fill in the result or error of a run whose poller future has settled."""
+        name, run_id = outcome.target.name, outcome.run_id
+        try:
+            outcome.result = self.executor.build_result(name, run_id, future.result())
+        except GlueWorkflowDownloaderError as exc:
+            LOGGER.error("Workflow '%s' failed: %s", name, exc)
+            if isinstance(exc, WorkflowTimeoutError) and exc.result is None:
+                exc.result = self.executor.timeout_result(name, run_id)
+            outcome.error = exc
+            return
+        LOGGER.info("Workflow '%s' completed successfully", name)
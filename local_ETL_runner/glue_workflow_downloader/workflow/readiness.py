@@ -0,0 +1,251 @@
+"""Incremental readiness watching for required input layers."""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote_plus
+
+from botocore.exceptions import ClientError
+
+from ..config import LayerConfig
+from ..exceptions import ConfigurationError, S3AccessError
+from ..utils.concurrency import map_layers
+
+LOGGER = logging.getLogger(__name__)
+
+S3Event = Tuple[str, str, bool]  # (bucket, key, created)
+
+
+def parse_s3_events(payload: Any) -> Iterator[S3Event]:
+    """Yield ``(bucket, key, created)`` from an S3 event notification.
+
+    Accepts the notification document itself, an SNS envelope around it, or a
+    JSON string of either. ``s3:TestEvent`` messages and unknown shapes yield nothing.
+    """
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return
+    if not isinstance(payload, dict):
+        return
+    if "Records" not in payload and isinstance(payload.get("Message"), str):
+        yield from parse_s3_events(payload["Message"])
+        return
+    for record in payload.get("Records", []):
+        s3 = record.get("s3", {})
+        bucket = s3.get("bucket", {}).get("name")
+        key = s3.get("object", {}).get("key")
+        if not bucket or key is None:
+            continue
+        event_name = record.get("eventName", "")
+        yield bucket, unquote_plus(key), not event_name.startswith("ObjectRemoved")
+
+
+class FileDropEventSource:
+    """Reads S3 event notification JSON files dropped into a local directory.
+
+    A stand-in for SQS in local runs and tests: each ``*.json`` file is parsed
+    and then deleted.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 0.5) -> None:
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+
+    def poll(self, timeout: float) -> List[S3Event]:
+        """Return pending events, waiting up to ``timeout`` seconds for the first one."""
+        deadline = time.monotonic() + max(timeout, 0)
+        while True:
+            events = self._drain()
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _drain(self) -> List[S3Event]:
+        if not self.directory.is_dir():
+            return []
+        events: List[S3Event] = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                payload = path.read_text(encoding="utf-8")
+                path.unlink()
+            except OSError:
+                continue  # still being written or taken by another reader
+            events.extend(parse_s3_events(payload))
+        return events
+
+
+class SqsEventSource:
+    """Long-polls an SQS queue that receives S3 event notifications."""
+
+    def __init__(self, sqs_client, queue_url: str) -> None:
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+
+    def poll(self, timeout: float) -> List[S3Event]:
+        """Return events from one receive call, long-polling up to ``timeout`` seconds."""
+        try:
+            response = self.sqs_client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=int(min(max(timeout, 0), 20)),
+            )
+        except ClientError as exc:  # pragma: no cover - depends on AWS
+            raise S3AccessError(f"Unable to receive messages from {self.queue_url}: {exc}") from exc
+        events: List[S3Event] = []
+        messages = response.get("Messages", [])
+        for message in messages:
+            events.extend(parse_s3_events(message.get("Body", "")))
+        if messages:
+            try:
+                self.sqs_client.delete_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[
+                        {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+                        for index, message in enumerate(messages)
+                    ],
+                )
+            except ClientError as exc:  # pragma: no cover - depends on AWS
+                LOGGER.warning("Unable to delete consumed messages from %s: %s", self.queue_url, exc)
+        return events
+
+
+def build_event_source(readiness_cfg: Dict[str, Any], session=None):
+    """Create the event source described by ``workflow.readiness.event_source``, if any."""
+    source_cfg = readiness_cfg.get("event_source")
+    if not source_cfg:
+        return None
+    source_type = source_cfg.get("type")
+    if source_type == "file":
+        return FileDropEventSource(source_cfg["path"])
+    if source_type == "sqs":
+        if session is None:
+            raise ConfigurationError("An AWS session is required for the SQS event source.")
+        return SqsEventSource(session.client("sqs"), source_cfg["queue_url"])
+    raise ConfigurationError(f"Unsupported readiness event source type: {source_type!r}")
+
+
+class _LayerState:
+    """Matched keys seen so far for one layer and where the next listing resumes."""
+
+    def __init__(self) -> None:
+        self.keys: Set[str] = set()
+        self.last_key: Optional[str] = None
+
+
+class ReadinessWatcher:
+    """Waits until every layer satisfies its file-count rules.
+
+    The first pass lists each prefix in full; later passes only list keys after
+    the last key already seen (``StartAfter``), so unchanged prefixes cost one
+    short request. Because keys that sort before the resume point or deletions
+    are invisible to incremental listing, every ``full_rescan_every`` passes a
+    layer is listed in full again. Between passes the watcher backs off
+    exponentially with jitter, resetting whenever new keys appear. With an event
+    source the wait is spent receiving S3 notifications, and the check runs as
+    soon as one arrives.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        layers: Iterable[LayerConfig],
+        max_workers: int = 4,
+        event_source=None,
+        initial_interval: float = 1.0,
+        max_interval: float = 30.0,
+        multiplier: float = 2.0,
+        full_rescan_every: int = 10,
+    ) -> None:
+        self.s3_client = s3_client
+        self.layers = list(layers)
+        self.max_workers = max_workers
+        self.event_source = event_source
+        self.initial_interval = max(float(initial_interval), 0.0)
+        self.max_interval = max(float(max_interval), self.initial_interval)
+        self.multiplier = max(float(multiplier), 1.0)
+        self.full_rescan_every = max(int(full_rescan_every), 1)
+        self._states: Dict[str, _LayerState] = {layer.name: _LayerState() for layer in self.layers}
+
+    def wait(self, timeout: float) -> bool:
+        """Return True as soon as all layers are ready, or False once ``timeout`` expires."""
+        deadline = time.monotonic() + max(timeout, 0)
+        interval = self.initial_interval
+        passes = 0
+        while True:
+            pending = [layer for layer in self.layers if not self.is_ready(layer)]
+            if not pending:
+                return True
+            full = passes % self.full_rescan_every == 0
+            found = sum(map_layers(lambda layer: self._refresh(layer, full), pending, self.max_workers).values())
+            passes += 1
+            if all(self.is_ready(layer) for layer in self.layers):
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            interval = self.initial_interval if found else min(interval * self.multiplier, self.max_interval)
+            delay = min(interval / 2 + random.uniform(0, interval / 2), remaining)
+            if self.event_source is None:
+                time.sleep(delay)
+                continue
+            if self._apply_events(self.event_source.poll(delay)):
+                interval = self.initial_interval
+                if all(self.is_ready(layer) for layer in self.layers):
+                    return True
+
+    def is_ready(self, layer: LayerConfig) -> bool:
+        count = len(self._states[layer.name].keys)
+        return count > 0 and layer.validate_file_count(count)
+
+    def matched_keys(self, layer_name: str) -> List[str]:
+        """Return the matching keys currently known for ``layer_name``, sorted."""
+        return sorted(self._states[layer_name].keys)
+
+    def _refresh(self, layer: LayerConfig, full: bool) -> int:
+        """List the layer (incrementally unless ``full``) and return the number of new keys."""
+        state = self._states[layer.name]
+        request: Dict[str, Any] = {"Bucket": layer.s3_bucket, "Prefix": layer.s3_prefix}
+        if state.last_key and not full:
+            request["StartAfter"] = state.last_key
+        keys: Set[str] = set() if full else state.keys
+        before = len(state.keys)
+        last_key = None if full else state.last_key
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(**request):
+            for obj in page.get("Contents", []):
+                key = obj.get("Key", "")
+                if last_key is None or key > last_key:
+                    last_key = key
+                if layer.match(key[key.rfind("/") + 1 :]) is not None:
+                    keys.add(key)
+        state.keys = keys
+        state.last_key = last_key
+        return max(len(keys) - before, 0)
+
+    def _apply_events(self, events: List[S3Event]) -> bool:
+        """Update known keys from notifications; return True if any layer changed."""
+        changed = False
+        for bucket, key, created in events:
+            filename = key[key.rfind("/") + 1 :]
+            for layer in self.layers:
+                if layer.s3_bucket != bucket or not key.startswith(layer.s3_prefix):
+                    continue
+                if layer.match(filename) is None:
+                    continue
+                keys = self._states[layer.name].keys
+                if created and key not in keys:
+                    keys.add(key)
+                    changed = True
+                elif not created and key in keys:
+                    keys.discard(key)
+                    changed = True
+        return changed
@@ -0,0 +1,211 @@
+"""Adaptive status polling shared by every workflow run being waited on."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from ..exceptions import WorkflowTimeoutError
+
+if TYPE_CHECKING:  # pragma: no cover - typing helper
+    from .workflow_executor import WorkflowExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+_THROTTLE_ERROR_CODES = frozenset({"ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded"})
+
+# How long past a run's own timeout a caller waits for the poller before giving up on it.
+RESULT_GRACE_SECONDS = 60.0
+
+
+class _WatchedRun:
+    """Scheduling state for one run."""
+
+    def __init__(self, workflow_name: str, run_id: str, deadline: float, timeout: int, max_interval: float) -> None:
+        self.workflow_name = workflow_name
+        self.run_id = run_id
+        self.deadline = deadline
+        self.timeout = timeout
+        self.max_interval = max_interval
+        self.future: Future = Future()
+        self.overdue_polls = 0
+        self.throttle_delay = 0.0
+
+
+class RunStatusPoller:
+    """Polls many workflow runs from a single background thread.
+
+    After each poll the next one is scheduled from the predicted remaining time:
+    half of the smaller of (typical past duration - elapsed) and the time implied
+    by the run's action ``Statistics``, clamped to ``[min_interval, max_interval]``.
+    Runs that are overdue, or that have nothing to predict from yet, start at
+    ``min_interval`` and back off by ``backoff`` per poll. Glue throttling
+    doubles a run's delay. Past durations come from ``get_workflow_runs`` once
+    per workflow name.
+    """
+
+    def __init__(
+        self,
+        executor: "WorkflowExecutor",
+        *,
+        min_interval: float = 5.0,
+        max_interval: float = 30.0,
+        history_runs: int = 10,
+        backoff: float = 2.0,
+    ) -> None:
+        self.executor = executor
+        self.min_interval = max(float(min_interval), 0.1)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.history_runs = history_runs
+        self.backoff = max(float(backoff), 1.0)
+        self._schedule: List[Tuple[float, int, _WatchedRun]] = []
+        self._counter = itertools.count()
+        self._history: Dict[str, Optional[float]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, workflow_name: str, run_id: str, timeout: int, max_interval: Optional[float] = None) -> Future:
+        """Start watching a run; the future resolves to its terminal status.
+
+        The future raises WorkflowTimeoutError after ``timeout`` seconds, or the
+        executor's error if the status cannot be read.
+        """
+        run = _WatchedRun(
+            workflow_name,
+            run_id,
+            time.monotonic() + max(timeout, 0),
+            timeout,
+            max(float(max_interval or self.max_interval), self.min_interval),
+        )
+        with self._condition:
+            heapq.heappush(self._schedule, (time.monotonic(), next(self._counter), run))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="glue-status-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return run.future
+
+    def wait(self, workflow_name: str, run_id: str, timeout: int, max_interval: Optional[float] = None) -> str:
+        """Block until the run is terminal and return its status."""
+        future = self.watch(workflow_name, run_id, timeout, max_interval)
+        try:
+            return future.result(timeout=max(timeout, 0) + RESULT_GRACE_SECONDS)
+        except FutureTimeoutError as exc:
+            raise WorkflowTimeoutError(
+                f"Workflow '{workflow_name}' run '{run_id}' did not complete within {timeout} seconds."
+            ) from exc
+
+    def expected_duration(self, workflow_name: str) -> Optional[float]:
+        """Median duration of recent completed runs of ``workflow_name``, if any."""
+        if workflow_name not in self._history:
+            self._history[workflow_name] = self._load_history(workflow_name)
+        return self._history[workflow_name]
+
+    def next_delay(self, run: _WatchedRun, status_info: Dict[str, Any]) -> float:
+        """Seconds until ``run`` should be polled again given its latest status."""
+        estimates: List[float] = []
+        started = status_info.get("start_time")
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds() if started else None
+        expected = self.expected_duration(run.workflow_name)
+        if expected is not None and elapsed is not None:
+            estimates.append(expected - elapsed)
+        total = status_info.get("total_jobs") or 0
+        done = (status_info.get("completed_jobs") or 0) + (status_info.get("failed_jobs") or 0)
+        if elapsed is not None and total and 0 < done < total:
+            estimates.append(elapsed * (total - done) / done)
+
+        if estimates and min(estimates) > 0:
+            run.overdue_polls = 0
+            delay = min(estimates) / 2
+        else:
+            delay = self.min_interval * self.backoff**run.overdue_polls
+            run.overdue_polls += 1
+        return min(max(delay, self.min_interval, run.throttle_delay), run.max_interval)
+
+    def _loop(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    while True:
+                        if not self._schedule:
+                            self._thread = None
+                            return
+                        due, _, run = self._schedule[0]
+                        remaining = due - time.monotonic()
+                        if remaining <= 0:
+                            heapq.heappop(self._schedule)
+                            break
+                        self._condition.wait(remaining)
+                try:
+                    delay = self._poll(run)
+                except Exception as exc:  # resolved into the caller's future
+                    LOGGER.debug("Polling workflow '%s' failed: %s", run.workflow_name, exc)
+                    if not run.future.done():
+                        run.future.set_exception(exc)
+                    continue
+                if delay is None:
+                    continue
+                with self._condition:
+                    heapq.heappush(self._schedule, (time.monotonic() + delay, next(self._counter), run))
+        finally:
+            with self._condition:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll(self, run: _WatchedRun) -> Optional[float]:
+        """Poll one run; return the next delay, or None once its future is resolved."""
+        try:
+            status_info = self.executor.get_workflow_run_status(run.workflow_name, run.run_id)
+        except Exception as exc:  # resolved into the caller's future
+            if self._is_throttle(exc) and time.monotonic() < run.deadline:
+                run.throttle_delay = min(max(run.throttle_delay * 2, self.min_interval * 2), run.max_interval)
+                LOGGER.debug("Status polling throttled; next poll in %.1f seconds", run.throttle_delay)
+                return run.throttle_delay
+            run.future.set_exception(exc)
+            return None
+        run.throttle_delay /= 2
+        status = status_info["status"]
+        if status in self.executor.TERMINAL_STATUSES:
+            run.future.set_result(status)
+            return None
+        now = time.monotonic()
+        if now >= run.deadline:
+            run.future.set_exception(
+                WorkflowTimeoutError(
+                    f"Workflow '{run.workflow_name}' run '{run.run_id}' did not complete within {run.timeout} seconds."
+                )
+            )
+            return None
+        delay = min(self.next_delay(run, status_info), max(run.deadline - now, 0))
+        LOGGER.debug("Workflow '%s' is %s; next poll in %.1f seconds", run.workflow_name, status, delay)
+        return delay
+
+    def _load_history(self, workflow_name: str) -> Optional[float]:
+        try:
+            response = self.executor.glue_client.get_workflow_runs(Name=workflow_name, MaxResults=self.history_runs)
+        except (BotoCoreError, ClientError) as exc:  # pragma: no cover - depends on AWS
+            LOGGER.debug("Unable to read run history for '%s': %s", workflow_name, exc)
+            return None
+        durations = []
+        for run in response.get("Runs", []):
+            started, completed = run.get("StartedOn"), run.get("CompletedOn")
+            if run.get("Status") == "COMPLETED" and isinstance(started, datetime) and isinstance(completed, datetime):
+                durations.append((completed - started).total_seconds())
+        return statistics.median(durations) if durations else None
+
+    @staticmethod
+    def _is_throttle(exc: BaseException) -> bool:
+        cause = exc if isinstance(exc, ClientError) else exc.__cause__
+        if not isinstance(cause, ClientError):
+            return False
+        return cause.response.get("Error", {}).get("Code") in _THROTTLE_ERROR_CODES
@@ -2,18 +2,23 @@
 
 from __future__ import annotations
 
+import logging
 import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
 from ..exceptions import (
     WorkflowExecutionError,
     WorkflowFailedError,
     WorkflowTimeoutError,
 )
+from .status_poller import RESULT_GRACE_SECONDS, RunStatusPoller
+
+LOGGER = logging.getLogger(__name__)
 
 
 @dataclass
@@ -49,6 +54,24 @@ class WorkflowExecutor:
     def __init__(self, glue_client, config):
         self.glue_client = glue_client
         self.config = config
+        self._poller: Optional[RunStatusPoller] = None
+
+    @property
+    def poller(self) -> RunStatusPoller:
+        """Shared poller that waits on every run started through this executor."""
+        if self._poller is None:
+            workflow_cfg = self.config.get_workflow_config()
+            max_interval = float(workflow_cfg.get("polling_interval", 30))
+            min_interval = float(workflow_cfg.get("min_polling_interval", 5))
+            if not workflow_cfg.get("adaptive_polling", True):
+                min_interval = max_interval
+            self._poller = RunStatusPoller(
+                self,
+                min_interval=min(min_interval, max_interval),
+                max_interval=max_interval,
+                history_runs=int(workflow_cfg.get("polling_history_runs", 10)),
+            )
+        return self._poller
 
     def execute_workflow(self, workflow_name: str) -> str:
         """Trigger a workflow run and return the run identifier."""
@@ -68,9 +91,64 @@ class WorkflowExecutor:
         run_id: str,
         timeout: int = 3600,
         polling_interval: int = 30,
+        watch_nodes: Iterable[str] = (),
+        on_node_succeeded: Optional[Callable[[str], None]] = None,
     ) -> WorkflowRunResult:
-        """Wait for a workflow run to finish, returning the run result."""
-        status = self._poll_workflow_status(workflow_name, run_id, timeout, polling_interval)
+        """Wait for a workflow run to finish, returning the run result.
+
+        While waiting, the run graph is checked every ``min_polling_interval``
+        seconds and ``on_node_succeeded`` is called once for each node in
+        ``watch_nodes`` as soon as it reaches SUCCEEDED.
+        """
+        pending = set(watch_nodes)
+        if not pending or on_node_succeeded is None:
+            status = self._poll_workflow_status(workflow_name, run_id, timeout, polling_interval)
+            return self.build_result(workflow_name, run_id, status)
+
+        future = self.poller.watch(workflow_name, run_id, timeout, max_interval=max(polling_interval, 1))
+        node_interval = float(self.config.get_workflow_config().get("min_polling_interval", 5))
+        deadline = time.monotonic() + max(timeout, 0) + RESULT_GRACE_SECONDS
+
+        def notify() -> None:
+            for node_name, state in self.get_node_states(workflow_name, run_id).items():
+                if node_name in pending and state == "SUCCEEDED":
+                    pending.discard(node_name)
+                    on_node_succeeded(node_name)
+
+        while True:
+            try:
+                status = future.result(timeout=node_interval)
+                break
+            except FutureTimeoutError:
+                if time.monotonic() >= deadline:
+                    raise WorkflowTimeoutError(
+                        f"Workflow '{workflow_name}' run '{run_id}' did not complete within {timeout} seconds."
+                    ) from None
+                notify()
+        notify()
+        return self.build_result(workflow_name, run_id, status)
+
+    def build_result(self, workflow_name: str, run_id: str, status: str) -> WorkflowRunResult:
+        """Fetch the details of a finished run; raise WorkflowFailedError if it did not succeed."""
+        result = self.describe_run(workflow_name, run_id, status)
+        if not result.is_successful():
+            raise WorkflowFailedError(
+                f"Workflow '{workflow_name}' failed with status {result.status} "
+                f"and {result.failed_jobs} failed jobs.",
+                result=result,
+            )
+        return result
+
+    def timeout_result(self, workflow_name: str, run_id: str) -> Optional[WorkflowRunResult]:
+        """Details of a run that was given up on, with status TIMEOUT, or None if unavailable."""
+        try:
+            return self.describe_run(workflow_name, run_id, "TIMEOUT")
+        except (WorkflowExecutionError, BotoCoreError) as exc:
+            LOGGER.debug("Unable to read details of timed-out run '%s': %s", run_id, exc)
+            return None
+
+    def describe_run(self, workflow_name: str, run_id: str, status: str) -> WorkflowRunResult:
+        """Fetch the current details of a run, reporting it with ``status``."""
         run_status = self.get_workflow_run_status(workflow_name, run_id)
         job_details = self.get_job_run_details(workflow_name, run_id)
 
@@ -87,13 +165,6 @@ class WorkflowExecutor:
             job_details=job_details,
             error_message=run_status.get("error_message"),
         )
-
-        if not result.is_successful():
-            raise WorkflowFailedError(
-                f"Workflow '{workflow_name}' failed with status {result.status} "
-                f"and {result.failed_jobs} failed jobs."
-            )
-
         return result
 
     def get_workflow_run_status(self, workflow_name: str, run_id: str) -> Dict[str, Any]:
@@ -140,7 +211,7 @@ class WorkflowExecutor:
 
         for node in nodes:
             node_name = node.get("Name") or node.get("Node", {}).get("Name")
-            run_details = node.get("RunDetails", {})
+            run_details = self._run_details(node)
             entry: Dict[str, Any] = {
                 "name": node_name,
                 "type": node.get("NodeType"),
@@ -164,6 +235,49 @@ class WorkflowExecutor:
 
         return details
 
+    def get_node_states(self, workflow_name: str, run_id: str) -> Dict[str, str]:
+        """Return the latest run state of each job and crawler node in the run graph."""
+        try:
+            response = self.glue_client.get_workflow_run(
+                Name=workflow_name, RunId=run_id, IncludeGraph=True
+            )
+        except ClientError:
+            return {}  # pragma: no cover - degraded mode
+
+        states: Dict[str, str] = {}
+        for node in response.get("Run", {}).get("Graph", {}).get("Nodes", []):
+            node_name = node.get("Name") or node.get("Node", {}).get("Name")
+            run_details = self._run_details(node)
+            state = run_details.get("State") or run_details.get("Status")
+            if node_name and state:
+                states[node_name] = state
+        return states
+
+    @classmethod
+    def _run_details(cls, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the node's latest attempt as a RunDetails-style mapping.
+
+        Job and crawler nodes report attempts under ``JobDetails.JobRuns`` and
+        ``CrawlerDetails.Crawls``; those are normalised to the same keys.
+        """
+        if node.get("RunDetails"):
+            return node["RunDetails"]
+        job_runs = node.get("JobDetails", {}).get("JobRuns") or []
+        if job_runs:
+            job_run = cls._latest(job_runs)
+            return {**job_run, "State": job_run.get("JobRunState")}
+        crawls = node.get("CrawlerDetails", {}).get("Crawls") or []
+        if crawls:
+            return cls._latest(crawls)
+        return {}
+
+    @staticmethod
+    def _latest(attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = [attempt for attempt in attempts if isinstance(attempt.get("StartedOn"), datetime)]
+        if started:
+            return max(started, key=lambda attempt: attempt["StartedOn"])
+        return attempts[-1]
+
     def _poll_workflow_status(
         self,
         workflow_name: str,
@@ -171,18 +285,12 @@ class WorkflowExecutor:
         timeout: int,
         polling_interval: int,
     ) -> str:
-        """Poll workflow status until a terminal state is reached or timeout."""
-        deadline = time.time() + max(timeout, 0)
-        while time.time() <= deadline:
-            status_info = self.get_workflow_run_status(workflow_name, run_id)
-            status = status_info["status"]
-            if status in self.TERMINAL_STATUSES:
-                return status
-            time.sleep(max(polling_interval, 1))
-
-        raise WorkflowTimeoutError(
-            f"Workflow '{workflow_name}' run '{run_id}' did not complete within {timeout} seconds."
-        )
+        """Poll workflow status until a terminal state is reached or timeout.
+
+        ``polling_interval`` is the longest gap between polls; the shared poller
+        polls sooner as the run approaches its expected completion.
+        """
+        return self.poller.wait(workflow_name, run_id, timeout, max_interval=max(polling_interval, 1))
 
     @staticmethod
     def _ensure_datetime(value: Optional[Any]) -> Optional[datetime]:
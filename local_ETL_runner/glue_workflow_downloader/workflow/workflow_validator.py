@@ -2,9 +2,8 @@
 
 from __future__ import annotations
 
-import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
 from botocore.exceptions import ClientError
 
@@ -16,17 +15,17 @@ from ..exceptions import (
     ValidationError,
     WorkflowNotFoundError,
 )
+from .readiness import ReadinessWatcher
 
 
 class WorkflowValidator:
     """Validates Glue workflow prerequisites."""
 
-    _POLL_INTERVAL_SECONDS = 5
-
-    def __init__(self, glue_client, s3_client, config: ConfigManager):
+    def __init__(self, glue_client, s3_client, config: ConfigManager, event_source=None):
         self.glue_client = glue_client
         self.s3_client = s3_client
         self.config = config
+        self.event_source = event_source
 
     def validate_workflow_exists(self, workflow_name: str) -> bool:
         """Return True if the workflow exists; raise otherwise."""
@@ -46,25 +45,13 @@ class WorkflowValidator:
         if not required_layers:
             return True
 
-        deadline = time.time() + max(timeout, 0)
-        last_counts: Dict[str, Tuple[int, List[str]]] = {}
-
-        while time.time() <= deadline:
-            all_ok = True
-            last_counts.clear()
-            for layer in required_layers:
-                files = self._list_matching_files(layer)
-                count = len(files)
-                last_counts[layer.name] = (count, files)
-                if count == 0 or not layer.validate_file_count(count):
-                    all_ok = False
-            if all_ok:
-                return True
-            time.sleep(self._POLL_INTERVAL_SECONDS)
-
-        # Determine root cause from last collected counts
+        watcher = self._create_watcher(required_layers)
+        if watcher.wait(timeout):
+            return True
+
+        # Determine root cause from the last known counts
         for layer in required_layers:
-            count, files = last_counts.get(layer.name, (0, []))
+            count = len(watcher.matched_keys(layer.name))
             if count == 0:
                 raise InitialLayerFileNotFoundError(
                     f"No files found for required layer '{layer.name}' within {timeout} seconds."
@@ -98,18 +85,18 @@ class WorkflowValidator:
             "completed_on": self._coerce_datetime(completed_on),
         }
 
-    def _list_matching_files(self, layer: LayerConfig) -> List[str]:
-        """Return keys in S3 that satisfy the layer's file patterns."""
-        paginator = self.s3_client.get_paginator("list_objects_v2")
-        page_iterator = paginator.paginate(Bucket=layer.s3_bucket, Prefix=layer.s3_prefix)
-        matched: List[str] = []
-        for page in page_iterator:
-            for obj in page.get("Contents", []):
-                key = obj.get("Key", "")
-                filename = key.rsplit("/", 1)[-1]
-                if layer.matches_filename(filename):
-                    matched.append(key)
-        return matched
+    def _create_watcher(self, layers: List[LayerConfig]) -> ReadinessWatcher:
+        readiness_cfg = self.config.get_workflow_config()["readiness"]
+        return ReadinessWatcher(
+            self.s3_client,
+            layers,
+            max_workers=int(self.config.get_download_config().get("listing_workers", 4)),
+            event_source=self.event_source,
+            initial_interval=readiness_cfg["initial_interval"],
+            max_interval=readiness_cfg["max_interval"],
+            multiplier=readiness_cfg["backoff_multiplier"],
+            full_rescan_every=readiness_cfg["full_rescan_every"],
+        )
 
     @staticmethod
     def _coerce_datetime(value: Optional[Any]) -> Optional[datetime]: